@@ -0,0 +1,92 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("AuthCache")
+
+MISSING = object()  # Sentinel: distinguishes "not cached" from cached falsy values
+
+# =============================================================================
+# BOUNDED TTL CACHE (LRU Eviction)
+# =============================================================================
+
+class TTLCache:
+    """
+    Small in-process LRU with per-entry expiry (monotonic clock).
+    Not thread-safe by design: only touched from the event loop.
+    """
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """O(n) sweep. Only for rare events like account deletion."""
+        stale = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+        for k in stale:
+            del self._data[k]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+# =============================================================================
+# INSTANCES
+# =============================================================================
+
+# sha256(token) -> verified claims (TTL also capped at the token's own 'exp')
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+# (user_id, chat_id) -> chat participants doc, or False when access is denied
+chat_access_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+# =============================================================================
+# INVALIDATION
+# =============================================================================
+
+def invalidate_user(user_id: str) -> None:
+    """
+    Call on account deletion / deactivation.
+    Drops cached tokens and every chat grant for the user.
+    Account status lives in core.user_status and is invalidated there.
+    """
+    tokens = token_cache.discard_where(lambda _, claims: claims.get("id") == user_id)
+    chats = chat_access_cache.discard_where(lambda key, _: key[0] == user_id)
+    logger.info(f"Auth cache invalidated for user {user_id} (tokens={tokens}, chats={chats})")
+
+
+def invalidate_chat(chat_id: str) -> None:
+    """Call when a chat is deleted so the other participant loses access too."""
+    chat_access_cache.discard_where(lambda key, _: key[1] == chat_id)
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import List, Optional
 from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -24,6 +24,11 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # Short-lived (15 mins)
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30    # Long-lived (30 Days)
+    AUTH_CACHE_TTL_SECONDS: int = 30       # Verified claims / active users / chat grants
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    USER_STATUS_LOCAL_TTL_SECONDS: int = 5    # Per-worker L1 (bounds cross-worker staleness)
+    USER_STATUS_REDIS_TTL_SECONDS: int = 300  # Shared L2 (Redis key per user, expires)
+    USER_STATUS_STRICT_SCOPE: str = "admin"   # "admin": only admin routes hit Mongo | "all" | "none"
 
     # --- Database ---
     MONGO_URL: str = "mongodb://localhost:27017"
@@ -33,6 +38,114 @@ class Settings(BaseSettings):
     # --- CORS ---
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
 
+    # --- Metrics ---
+    METRICS_AUTH_TOKEN: str = ""                # /metrics requires "Bearer <token>"; unset => not mounted outside DEBUG
+    METRICS_MULTIPROC_DIR: Optional[str] = None # Shared dir => aggregate across uvicorn workers
+    METRICS_FLUSH_SECONDS: float = 5.0
+
+    # --- AI Extraction (Worker Pool + Circuit Breaker) ---
+    EXTRACTION_LLM: str = "gemini"                  # "gemini" | "fake" (local stub) | "off"
+    EXTRACTION_WORKERS: int = 4                     # Concurrent blocking LLM calls
+    EXTRACTION_MAX_PENDING: int = 16                # Backlog beyond that => rule-based right away
+    EXTRACTION_TIMEOUT_SECONDS: float = 15.0
+    EXTRACTION_BREAKER_FAILURES: int = 5            # Consecutive failures/timeouts before tripping
+    EXTRACTION_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    EXTRACTION_ASYNC_THRESHOLD_CHARS: int = 8000    # Longer transcripts become polled jobs
+    EXTRACTION_JOB_TTL_SECONDS: int = 3600
+    EXTRACTION_LLM_BATCH_SIZE: int = 8              # Transcripts per batched LLM prompt
+    EXTRACTION_BATCH_MAX_ITEMS: int = 200           # Per process-interviews:batch request
+    EXTRACTION_CACHE_LOCAL_ENTRIES: int = 1000
+    EXTRACTION_CACHE_LOCAL_TTL_SECONDS: int = 600
+    EXTRACTION_CACHE_REDIS_TTL_SECONDS: int = 86400
+    EXTRACTION_CACHE_MONGO_TTL_SECONDS: int = 30 * 86400   # TTL index on last_used_at
+    EXTRACTION_CACHE_MAX_DOCS: int = 100000                # Trimmed by the cleanup loop
+    FAKE_LLM_LATENCY_MS: int = 800                  # EXTRACTION_LLM="fake" only
+    FAKE_LLM_FAILURE_RATE: float = 0.0
+
+    # --- Uploads ---
+    UPLOAD_MAX_BYTES: int = 100 * 1024 * 1024       # Per video, single-request or resumable
+    UPLOAD_SESSION_TTL_SECONDS: int = 86400         # Idle resumable uploads are purged after this
+    UPLOAD_MAX_OPEN_SESSIONS: int = 3               # Per user: each one reserves up to UPLOAD_MAX_BYTES of disk
+    UPLOAD_LOCK_SECONDS: int = 60                   # Writer lease on a session, renewed while the PATCH streams
+    UPLOAD_FINALIZE_STALE_SECONDS: int = 3600       # A finalize stuck this long (crashed worker) is purged
+
+    # --- Video Processing Queue ---
+    VIDEO_TRANSCRIBER: str = "stub"                 # "stub" (canned text) | "whisper" (optional package)
+    WHISPER_MODEL: str = "base"
+    VIDEO_WORKER_IN_PROCESS: bool = True            # False => run scripts/video_worker.py separately
+    VIDEO_WORKER_CONCURRENCY: int = 2               # Jobs one worker process runs at once
+    VIDEO_WORKER_POLL_SECONDS: float = 2.0
+    VIDEO_JOB_LEASE_SECONDS: int = 120              # Unrenewed claims are picked up by other workers
+    VIDEO_JOB_MAX_ATTEMPTS: int = 3
+    VIDEO_JOB_RETRY_BASE_SECONDS: float = 10.0      # Doubles per attempt
+    VIDEO_MAX_DURATION_SECONDS: int = 600
+
+    # --- Preview Renditions (ffmpeg, optional) ---
+    VIDEO_PREVIEW_ENABLED: bool = True              # Also needs ffmpeg on PATH
+    TRANSCODE_WORKERS: int = 2                      # ffmpeg processes per video worker host
+    VIDEO_PREVIEW_HEIGHT: int = 360
+    VIDEO_PREVIEW_VIDEO_KBPS: int = 400
+    VIDEO_PREVIEW_AUDIO_KBPS: int = 48
+    VIDEO_POSTER_WIDTH: int = 480
+    VIDEO_PREVIEW_TIMEOUT_SECONDS: int = 300
+
+    # --- Blob Storage (Content-Addressed Uploads) ---
+    BLOB_BACKEND: str = "local"                     # Only "local" today; object stores plug in later
+    BLOB_ROOT: str = "uploads/blobs"
+    BLOB_GC_GRACE_SECONDS: int = 24 * 3600          # Unreferenced this long => deleted
+    VIDEO_FAILED_RETENTION_DAYS: int = 7            # Failed video jobs (and their references) kept this long
+
+    # --- Media Serving ---
+    MEDIA_MAX_STREAMS_PER_USER: int = 4             # Concurrent video streams per viewer, per process
+    MEDIA_CACHE_MAX_AGE_SECONDS: int = 86400
+    MEDIA_URL_TTL_SECONDS: int = 3600               # Signed playback URLs (<video src> can't send a Bearer header)
+
+    # --- Rate Limiting ---
+    RATE_LIMIT_ENABLED: bool = True  # Redis limits + per-route limits. Set false per environment (local dev, load tests)
+    RATE_LIMIT_LOCAL_MAX_IDENTIFIERS: int = 100000  # In-process token buckets per limiter (LRU-evicted past this)
+    RATE_LIMIT_LOCAL_SHARDS: int = 16               # Independently locked partitions
+    RATE_LIMIT_PRUNE_INTERVAL_SECONDS: int = 60     # Background drop of idle buckets
+
+    # --- Load Shedding (Per Worker; Expensive Routes Only) ---
+    LOAD_SHED_ENABLED: bool = True
+    LOAD_SHED_MAX_IN_FLIGHT: int = 256       # Concurrent API requests before expensive ones get 503
+    LOAD_SHED_MAX_LOOP_LAG_MS: int = 200     # Event-loop lag (needs LOOP_MONITOR_ENABLED)
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = 5
+
+    # --- Query Instrumentation ---
+    DB_SLOW_QUERY_MS: int = 100          # Mongo commands slower than this are logged
+    REDIS_SLOW_COMMAND_MS: int = 20      # Same for Redis commands / pipelines
+    SLOW_QUERY_SAMPLES: int = 100        # Recent slow queries kept for /metrics/json
+
+    # --- Sampling Profiler (Admin Only) ---
+    PROFILER_MAX_SECONDS: int = 120             # Upper bound for on-demand sessions
+    PROFILER_DEFAULT_INTERVAL_MS: float = 5.0   # 200 Hz
+    PROFILER_TOKEN_TTL_SECONDS: int = 300       # Per-request profile tokens are one-shot
+    PROFILER_RESULT_TTL_SECONDS: int = 3600
+
+    # --- Event Loop Monitor ---
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_MS: int = 250      # Heartbeat period
+    LOOP_BLOCK_THRESHOLD_MS: int = 100   # Stall length that triggers a stack sample
+
+    # --- Structured Logging ---
+    LOG_ASYNC: bool = True        # Queue log_event output to a writer thread
+    LOG_QUEUE_SIZE: int = 10000   # Full queue => info/warning dropped, errors written inline
+
+    # --- WebSockets ---
+    WS_SEND_QUEUE_SIZE: int = 64                 # Max pending outbound frames per connection
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest" # "drop_oldest" | "disconnect"
+    WS_SLOW_CONSUMER_TIMEOUT_MS: int = 5000      # "disconnect": max time the queue may stay full (and one send may take)
+
+    # --- Presence / Typing / Read Receipts ---
+    PRESENCE_BACKEND: str = "auto"  # "auto" (redis if WEB_CONCURRENCY > 1) | "redis" | "local"
+    PRESENCE_TTL_SECONDS: int = 60  # Clients send {"type": "ping"} to stay online
+    TYPING_TTL_SECONDS: int = 5
+
+    # --- Chat Persistence (Write-Behind Group Commit) ---
+    CHAT_WRITE_BATCH_SIZE: int = 100
+    CHAT_WRITE_FLUSH_MS: int = 20
+
     # --- Pydantic Config ---
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,66 @@
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+# =============================================================================
+# REQUEST CONTEXT (Propagated via contextvars)
+# =============================================================================
+# Set once per request by ObservabilityMiddleware. contextvars follow the request
+# through awaits, background tasks spawned from it, and Motor's executor threads
+# (Motor copies the context), so log lines and DB hooks can find their request.
+
+class RequestContext:
+    __slots__ = ("request_id", "method", "scope", "started_at",
+                 "db_calls", "redis_calls", "db_seconds", "redis_seconds", "rate_limit")
+
+    def __init__(self, request_id: str, method: str = "", scope: Optional[Dict[str, Any]] = None):
+        self.request_id = request_id
+        self.method = method
+        self.scope = scope
+        self.started_at = time.perf_counter()
+        self.db_calls = 0
+        self.redis_calls = 0
+        self.db_seconds = 0.0
+        self.redis_seconds = 0.0
+        self.rate_limit: Optional[Tuple[int, int, int]] = None  # (limit, remaining, reset_seconds)
+
+    @property
+    def route(self) -> Optional[str]:
+        """Route template; only known once the router has matched."""
+        if self.scope is None:
+            return None
+        from app.core.metrics import route_label  # Avoid import cycle at module load
+        return route_label(self.scope)
+
+
+request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_request_id() -> Optional[str]:
+    ctx = request_context.get()
+    return ctx.request_id if ctx else None
+
+
+def note_db_call() -> None:
+    ctx = request_context.get()
+    if ctx is not None:
+        ctx.db_calls += 1
+
+
+def note_redis_call(seconds: float = 0.0) -> None:
+    ctx = request_context.get()
+    if ctx is not None:
+        ctx.redis_calls += 1
+        ctx.redis_seconds += seconds
+
+
+def note_rate_limit(limit: int, remaining: int, reset_seconds: int) -> None:
+    """Keep the tightest limit the request was checked against, for the RateLimit-* headers."""
+    ctx = request_context.get()
+    if ctx is not None and (ctx.rate_limit is None or remaining < ctx.rate_limit[1]):
+        ctx.rate_limit = (limit, remaining, reset_seconds)
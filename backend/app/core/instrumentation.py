@@ -0,0 +1,174 @@
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.core.context import RequestContext, request_context, note_db_call, note_redis_call
+from app.core.logging import log_event
+from app.core.metrics import (
+    db_command_duration, db_documents_returned, db_command_errors_total,
+    redis_command_duration, redis_pipeline_commands, slow_queries_total
+)
+
+logger = logging.getLogger("Instrumentation")
+
+# Recent slow commands (newest last), surfaced on /metrics/json
+_slow_queries: deque = deque(maxlen=max(1, settings.SLOW_QUERY_SAMPLES))
+
+# Commands whose first field is not a collection name
+_CURSOR_COMMANDS = {"getMore"}
+_NO_COLLECTION = "-"
+
+
+def recent_slow_queries() -> List[Dict[str, Any]]:
+    return list(_slow_queries)
+
+
+def _record_slow(backend: str, collection: str, command: str, duration_ms: float,
+                 ctx: Optional[RequestContext], **extra: Any) -> None:
+    slow_queries_total.labels(backend, collection, command).inc()
+    entry = {
+        "backend": backend,
+        "collection": collection,
+        "command": command,
+        "duration_ms": round(duration_ms, 2),
+        "request_id": ctx.request_id if ctx else None,
+        "route": ctx.route if ctx else None,
+        **extra,
+    }
+    _slow_queries.append(entry)
+    log_event("slow_query", level="warning", **entry)
+
+# =============================================================================
+# MONGO (pymongo CommandListener)
+# =============================================================================
+
+def _collection_of(event) -> str:
+    if event.command_name in _CURSOR_COMMANDS:
+        return event.command.get("collection", _NO_COLLECTION)
+    target = event.command.get(event.command_name)
+    return target if isinstance(target, str) else _NO_COLLECTION
+
+
+def _query_shape(command_name: str, command: Dict[str, Any]) -> List[str]:
+    """Top-level filter keys only: enough to find the missing index, no values logged."""
+    query = None
+    if command_name in ("find", "count", "findAndModify", "distinct"):
+        query = command.get("filter", command.get("query"))
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or []
+        query = statements[0].get("q") if statements else None
+    elif command_name == "aggregate":
+        for stage in command.get("pipeline", []):
+            if "$match" in stage:
+                query = stage["$match"]
+                break
+    return sorted(query) if isinstance(query, dict) else []
+
+
+def _documents_in(command_name: str, reply: Dict[str, Any]) -> Optional[int]:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else None
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    if command_name == "distinct":
+        return len(reply.get("values", []))
+    if "n" in reply:
+        return reply["n"]  # insert/update/delete/count
+    return None
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Runs on Motor's executor threads; Motor copies the caller's context,
+    so the current request is visible here. started() stashes what succeeded()
+    needs, keyed by (connection, request id), since the reply event may fire
+    without the context.
+    """
+    def __init__(self):
+        self._inflight: Dict[Tuple[Any, int], tuple] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        note_db_call()
+        self._inflight[(event.connection_id, event.request_id)] = (
+            request_context.get(),
+            _collection_of(event),
+            _query_shape(event.command_name, event.command),
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        ctx, collection, shape = self._finish(event)
+        command = event.command_name
+        db_command_duration.labels(collection, command).observe(event.duration_micros / 1e6)
+        documents = _documents_in(command, event.reply or {})
+        if documents is not None:
+            db_documents_returned.labels(collection, command).observe(documents)
+
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= settings.DB_SLOW_QUERY_MS:
+            _record_slow("mongo", collection, command, duration_ms, ctx,
+                         filter_keys=shape, documents=documents)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        _, collection, _ = self._finish(event)
+        db_command_errors_total.labels(collection, event.command_name).inc()
+        db_command_duration.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def _finish(self, event) -> tuple:
+        ctx, collection, shape = self._inflight.pop(
+            (event.connection_id, event.request_id), (None, _NO_COLLECTION, [])
+        )
+        if ctx is not None:
+            ctx.db_seconds += event.duration_micros / 1e6
+        return ctx, collection, shape
+
+# =============================================================================
+# REDIS (Client + Pipeline subclasses)
+# =============================================================================
+
+def _observe_redis(command: str, elapsed: float, **extra: Any) -> None:
+    note_redis_call(elapsed)
+    redis_command_duration.labels(command).observe(elapsed)
+    if elapsed * 1000 >= settings.REDIS_SLOW_COMMAND_MS:
+        _record_slow("redis", _NO_COLLECTION, command, elapsed * 1000, request_context.get(), **extra)
+
+
+class InstrumentedPipeline(Pipeline):
+    """One round trip, recorded once as PIPELINE (or MULTI when transactional)."""
+
+    async def execute(self, raise_on_error: bool = True):
+        size = len(self.command_stack)
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            if size:
+                redis_pipeline_commands.observe(size)
+                _observe_redis("MULTI" if self.is_transaction else "PIPELINE",
+                               time.perf_counter() - start, commands=size)
+
+
+class InstrumentedRedis(redis.Redis):
+    """Drop-in redis.asyncio.Redis that times every command against the current request."""
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            command = args[0] if args else "UNKNOWN"
+            if isinstance(command, bytes):
+                command = command.decode("latin-1")
+            _observe_redis(str(command).upper(), time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
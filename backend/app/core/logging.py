@@ -1,64 +1,74 @@
 import json
-import logging
 import time
+import queue
+import logging
+import logging.handlers
+from functools import lru_cache
 from datetime import datetime, timezone
-from typing import Any, Optional, Dict, Union
-from collections import defaultdict
+from typing import Any, Optional, Dict
 from contextlib import asynccontextmanager
 
+from app.core.config import settings
+from app.core.context import current_request_id
+from app.core.metrics import events_total, operation_duration, bucket_quantile, collect as collect_metrics
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 logger = logging.getLogger("HireAppLogger")
 
 # PII Keywords (Case-insensitive) - Anything matching these is scrubbed
-SENSITIVE_KEYS = {
+SENSITIVE_KEYS = frozenset({
     "password", "token", "access_token", "refresh_token", 
     "otp", "secret", "identifier", "email", "phone", 
     "mobile", "credit_card", "ssn", "authorization", 
     "api_key", "cookie"
-}
+})
 
 # =============================================================================
-# METRICS STORAGE (IN-MEMORY COUNTERS)
+# METRICS (Thin shims over core.metrics registry)
 # =============================================================================
-# Note: For production, export these to Prometheus/Datadog/CloudWatch
-_metrics: Dict[str, int] = defaultdict(int)
-_latencies: Dict[str, list] = defaultdict(list)
+# Kept for the many existing call sites. New code can use core.metrics directly.
 
 def increment_metric(metric_name: str, value: int = 1) -> None:
     """
     Increment a counter metric.
     Examples: 'otp.sent', 'auth.refresh.success', 'rate_limit.hit'
     """
-    _metrics[metric_name] += value
+    events_total.labels(metric_name).inc(value)
     
 def record_latency(metric_name: str, duration_ms: float) -> None:
     """
-    Record latency measurement.
+    Record latency measurement (O(1): one bucket increment, no sample list).
     Examples: 'jobs.response_time', 'match.compute_time'
     """
-    _latencies[metric_name].append(duration_ms)
-    # Keep only last 1000 samples to prevent memory bloat
-    if len(_latencies[metric_name]) > 1000:
-        _latencies[metric_name] = _latencies[metric_name][-1000:]
+    operation_duration.labels(metric_name).observe(duration_ms / 1000)
 
 def get_metrics() -> Dict[str, Any]:
     """
-    Export current metrics snapshot (for /metrics endpoint or logging).
+    Export current metrics snapshot as JSON (legacy shape).
+    Percentiles are estimated from histogram buckets across all workers.
     """
-    metrics_snapshot = dict(_metrics)
-    
-    # Calculate latency stats
+    snapshot = collect_metrics()
+
+    counters = {}
+    events = snapshot.get(events_total.name, {"series": []})
+    for labels, value in events["series"]:
+        counters[labels[0]] = int(value)
+
     latency_stats = {}
-    for key, values in _latencies.items():
-        if values:
-            latency_stats[f"{key}.p50"] = sorted(values)[len(values) // 2]
-            latency_stats[f"{key}.p95"] = sorted(values)[int(len(values) * 0.95)]
-            latency_stats[f"{key}.avg"] = sum(values) / len(values)
+    durations = snapshot.get(operation_duration.name, {"series": [], "buckets": []})
+    bounds = durations["buckets"]
+    for labels, value in durations["series"]:
+        if not value["count"]:
+            continue
+        key = labels[0]
+        latency_stats[f"{key}.p50"] = round(bucket_quantile(0.50, bounds, value["counts"]) * 1000, 2)
+        latency_stats[f"{key}.p95"] = round(bucket_quantile(0.95, bounds, value["counts"]) * 1000, 2)
+        latency_stats[f"{key}.avg"] = round(value["sum"] / value["count"] * 1000, 2)
     
     return {
-        "counters": metrics_snapshot,
+        "counters": counters,
         "latencies": latency_stats,
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
@@ -78,8 +88,10 @@ async def measure_latency(operation: str):
     finally:
         duration_ms = (time.perf_counter() - start) * 1000
         record_latency(operation, duration_ms)
+        # Debug level: the histogram already has it; shed first under load
         log_event(
             "latency_measured",
+            level="debug",
             operation=operation,
             duration_ms=round(duration_ms, 2)
         )
@@ -88,23 +100,30 @@ async def measure_latency(operation: str):
 # SANITIZATION ENGINE (Recursive & Safe)
 # =============================================================================
 
+_PRIMITIVES = (bool, int, float)
+_REDACTED = "[REDACTED]"
+_MAX_FIELD_CHARS = 1024  # Cap logs at 1KB per field
+
+@lru_cache(maxsize=4096)
+def _is_sensitive(key: Any) -> bool:
+    """Key verdicts are memoized: field names repeat, so this is a dict hit after warmup."""
+    return isinstance(key, str) and key.lower() in SENSITIVE_KEYS
+
 def _sanitize_value(key: str, value: Any) -> Any:
     """
     Scrub individual values based on key name or content type.
     """
     # 1. Key-based Redaction
-    if key.lower() in SENSITIVE_KEYS:
-        return "[REDACTED]"
+    if _is_sensitive(key):
+        return _REDACTED
     
     # 2. Type-based Safety
-    if value is None:
-        return None
-    if isinstance(value, (bool, int, float)):
+    if value is None or isinstance(value, _PRIMITIVES):
         return value
     
     # 3. String Truncation (Prevent massive log bloat)
     if isinstance(value, str):
-        if len(value) > 1024: # Cap logs at 1KB per field
+        if len(value) > _MAX_FIELD_CHARS:
             return value[:64] + "...[TRUNCATED]"
         return value
     
@@ -115,15 +134,138 @@ def _sanitize_payload(data: Any) -> Any:
     """
     Recursively traverse dictionaries and lists to scrub PII.
     Cook Operational Discipline: Never trust nested data.
+    Always returns fresh containers, so the result is safe to hand to another thread.
     """
     if isinstance(data, dict):
-        return {k: _sanitize_payload(v) if k.lower() not in SENSITIVE_KEYS else "[REDACTED]" 
+        return {k: _REDACTED if _is_sensitive(k) else _sanitize_payload(v)
                 for k, v in data.items()}
-    elif isinstance(data, list):
+    elif isinstance(data, (list, tuple)):
         return [_sanitize_payload(item) for item in data]
     else:
         return _sanitize_value("generic", data)
 
+# =============================================================================
+# SERIALIZATION (orjson if installed, stdlib otherwise)
+# =============================================================================
+
+try:
+    import orjson
+
+    def _dumps(payload: Dict[str, Any]) -> str:
+        return orjson.dumps(payload, default=str).decode()
+except ImportError:
+    _encoder = json.JSONEncoder(default=str, separators=(",", ":"), check_circular=False)
+    _dumps = _encoder.encode
+
+def _format_timestamp(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+# =============================================================================
+# ASYNC PIPELINE (Bounded Queue -> QueueListener -> Configured Handlers)
+# =============================================================================
+# The request path only sanitizes, builds a LogRecord and enqueues it. Timestamp
+# formatting and JSON encoding are deferred to the listener thread, which hands
+# each record to the same handlers logger.log would reach, so queued and inline
+# events come out identically. If the output stalls, the queue fills and we shed
+# low-value events instead of blocking.
+
+_LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "warning": logging.WARNING,
+           "error": logging.ERROR, "critical": logging.CRITICAL}
+
+class _JsonMessage:
+    """A record's msg whose JSON is built when a handler formats it (on the listener thread)."""
+    __slots__ = ("payload", "_text")
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self._text: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._text is None:  # Several handlers may format the same record
+            try:
+                self.payload["timestamp"] = _format_timestamp(self.payload["timestamp"])
+                self._text = _dumps(self.payload)
+            except Exception as e:
+                self._text = f"LOGGING FAILURE: {self.payload.get('event')} - {e}"
+        return self._text
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)  # Blocking: a full queue must still get the stop marker
+
+
+def _effective_handlers(source: logging.Logger):
+    """The handlers a record logged on `source` would reach via propagation."""
+    handlers = []
+    current: Optional[logging.Logger] = source
+    while current is not None:
+        handlers.extend(current.handlers)
+        if not current.propagate:
+            break
+        current = current.parent
+    if not handlers and logging.lastResort is not None:
+        handlers.append(logging.lastResort)
+    return handlers
+
+
+class _LogPipeline:
+    def __init__(self, maxsize: int):
+        self.maxsize = max(1, maxsize)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.maxsize)
+        self._listener: Optional[_Listener] = None
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        # Handlers are resolved once: logging configuration happens before the lifespan starts
+        self._listener = _Listener(self._queue, *_effective_handlers(logger), respect_handler_level=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._listener.stop()  # Drains everything queued before the sentinel
+        self._listener = None
+
+    def submit(self, levelno: int, payload: Dict[str, Any]) -> bool:
+        """Non-blocking. Returns False when the event was shed."""
+        depth = self._queue.qsize()
+        # Under load (queue half full) debug events are the first to go
+        if levelno <= logging.DEBUG and depth >= self.maxsize // 2:
+            self.dropped += 1
+            return False
+        record = logger.makeRecord(logger.name, levelno, "(log_event)", 0, _JsonMessage(payload), None, None)
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+_pipeline: Optional[_LogPipeline] = None
+
+def start_log_pipeline(maxsize: int = 10000) -> None:
+    """Called from the app lifespan. Scripts that never call it log synchronously."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = _LogPipeline(maxsize)
+    _pipeline.start()
+
+def stop_log_pipeline() -> None:
+    """Flushes everything still queued."""
+    global _pipeline
+    if _pipeline:
+        _pipeline.stop()
+        if _pipeline.dropped:
+            logger.warning(f"Structured logger shed {_pipeline.dropped} events under load")
+        _pipeline = None
+
 # =============================================================================
 # LOGGING INTERFACE
 # =============================================================================
@@ -140,21 +282,26 @@ def log_event(
     
     Args:
         event: The name of the event (e.g., "job_created", "auth_failed")
-        request_id: Tracing ID for correlation
-        level: "info", "warning", "error", "critical"
+        request_id: Tracing ID for correlation (defaults to the current request's)
+        level: "debug", "info", "warning", "error", "critical"
         error: Optional Exception object (will be formatted)
         **kwargs: Additional context data
     """
     try:
-        # 1. Base Payload
+        levelno = _LEVELS.get(level.lower(), logging.INFO)
+        if not logger.isEnabledFor(levelno):
+            return  # Filtered out: skip all the work below
+
+        # 1. Base Payload (timestamp formatted later, off the request path)
         payload = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": time.time(),
             "event": event,
-            "level": level.upper(),
-            "environment": "production", # In real app, pull from settings
+            "level": logging.getLevelName(levelno),
+            "environment": settings.ENVIRONMENT,
         }
 
         # 2. Context Injection
+        request_id = request_id or current_request_id()
         if request_id:
             payload["request_id"] = request_id
             
@@ -163,17 +310,26 @@ def log_event(
             payload["error_message"] = str(error)
 
         # 3. Data Sanitization
-        sanitized_context = _sanitize_payload(kwargs)
-        payload.update(sanitized_context)
+        for key, value in kwargs.items():
+            if _is_sensitive(key):
+                payload[key] = _REDACTED
+            elif value is None or isinstance(value, _PRIMITIVES):
+                payload[key] = value
+            else:
+                payload[key] = _sanitize_payload(value)
 
-        # 4. Serialization
-        log_entry = json.dumps(payload, default=str)
+        # 4. Emit (async pipeline if running, else synchronous)
+        if _pipeline is not None and _pipeline.running:
+            if not _pipeline.submit(levelno, payload) and levelno >= logging.ERROR:
+                # Never lose errors: fall back to a synchronous write
+                payload["timestamp"] = _format_timestamp(payload["timestamp"])
+                logger.log(levelno, _dumps(payload))
+            return
 
-        # 5. Emit
-        method = getattr(logger, level.lower(), logger.info)
-        method(log_entry)
+        payload["timestamp"] = _format_timestamp(payload["timestamp"])
+        logger.log(levelno, _dumps(payload))
 
     except Exception as e:
         # Emergency Fallback: If logging fails, print raw string so we don't lose data
         # This prevents the logging system itself from crashing the app
-        print(f"LOGGING FAILURE: {event} - {str(e)}")
\ No newline at end of file
+        print(f"LOGGING FAILURE: {event} - {str(e)}")
@@ -0,0 +1,174 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import log_event
+from app.core.metrics import registry
+from app.core.profiler import collapse_stack, top_functions
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("LoopMonitor")
+
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds", "Delay between a timer's due time and when the loop ran it."
+)
+event_loop_blocked_total = registry.counter(
+    "event_loop_blocked_total", "Stalls longer than LOOP_BLOCK_THRESHOLD_MS."
+)
+
+# =============================================================================
+# MONITOR (Heartbeat Task + Watchdog Thread)
+# =============================================================================
+
+class LoopLagMonitor:
+    """
+    Two halves:
+    - A task on the loop sleeps for a fixed interval and records how late it woke
+      up (lag). Each wake-up is also a heartbeat.
+    - A watchdog thread checks the heartbeat. When it goes stale past the threshold
+      the loop is stuck in synchronous code, so the watchdog grabs the loop thread's
+      stack *while it is still blocked* and logs it, once per stall.
+    Blocking stacks are also tallied, so the worst offenders surface without guessing.
+    The watchdog inserts into that tally while stats() reads it on the loop: both go
+    through _offenders_lock, and readers work on a copy.
+    """
+    def __init__(self, interval_ms: float, threshold_ms: float):
+        self.interval = max(10.0, interval_ms) / 1000
+        self.threshold = max(10.0, threshold_ms) / 1000
+        self.offenders: Counter = Counter()
+        self._offenders_lock = threading.Lock()
+        self.stalls = 0
+        self.last_lag = 0.0
+        self._heartbeat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Call from the event loop thread."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"⏱️ Loop monitor started (threshold {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            "stalls": self.stalls,
+            "current_lag_ms": round(self.current_lag() * 1000, 1),
+            "threshold_ms": self.threshold * 1000,
+            "top_blocking": top_functions(self.offenders_snapshot(), top),
+        }
+
+    def offenders_snapshot(self) -> Counter:
+        with self._offenders_lock:
+            return Counter(self.offenders)
+
+    def current_lag(self) -> float:
+        """
+        Seconds: the last heartbeat's lag, or how overdue the next one already is
+        (a loop that is busy right now). 0 when the monitor isn't running.
+        """
+        if not self.running:
+            return 0.0
+        overdue = time.monotonic() - self._heartbeat - self.interval
+        return max(self.last_lag, overdue, 0.0)
+
+    # --- Loop side ---
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.last_lag = max(0.0, now - expected)
+            event_loop_lag.observe(self.last_lag)
+            self._heartbeat = now
+
+    # --- Watchdog side ---
+
+    def _watch(self) -> None:
+        check_every = min(self.interval, self.threshold) / 2
+        reported_heartbeat = None
+        while not self._stop_event.wait(check_every):
+            heartbeat = self._heartbeat
+            # Due time of the next heartbeat + threshold = definitely blocked
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue < self.threshold:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = collapse_stack(frame) if frame is not None else ""
+            del frame
+            if stack:
+                with self._offenders_lock:
+                    self.offenders[stack] += 1  # Every sample during a stall counts as weight
+
+            if heartbeat == reported_heartbeat:
+                continue  # Same stall, already logged
+            reported_heartbeat = heartbeat
+            self.stalls += 1
+            event_loop_blocked_total.inc()
+            log_event(
+                "event_loop_blocked",
+                level="warning",
+                blocked_ms=round(overdue * 1000, 1),
+                task=self._current_task_name(),
+                stack=stack.split(";")[-16:],  # Innermost frames; list items dodge field truncation
+            )
+
+    def _current_task_name(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+        if task is None:
+            return None  # Blocked inside a plain callback, not a coroutine
+        coro = task.get_coro()
+        return f"{task.get_name()}:{getattr(coro, '__qualname__', coro)}"
+
+
+# =============================================================================
+# LIFECYCLE
+# =============================================================================
+loop_monitor = LoopLagMonitor(settings.LOOP_LAG_INTERVAL_MS, settings.LOOP_BLOCK_THRESHOLD_MS)
+
+
+def start_loop_monitor() -> None:
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
+
+async def stop_loop_monitor() -> None:
+    await loop_monitor.stop()
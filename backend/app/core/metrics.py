@@ -0,0 +1,452 @@
+import os
+import json
+import glob
+import math
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("MetricsRegistry")
+
+NAMESPACE = "hire"
+
+# Seconds. Covers a 1ms cache hit up to a 10s LLM call.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# =============================================================================
+# METRIC TYPES
+# =============================================================================
+# Recording never takes a lock: the event loop is single-threaded and the few
+# executor-thread writers (DB listeners) tolerate the GIL's coarse atomicity.
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    """Fixed buckets: observe() is one bisect over ~13 floats + two adds."""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = f"{NAMESPACE}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: Any, **kwvalues: Any):
+        if kwvalues:
+            values = tuple(str(kwvalues[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing  # Idempotent across module reloads
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(f"{NAMESPACE}_{name}")
+
+    # --- Snapshots (JSON-safe; used for multi-process aggregation) ---
+
+    def snapshot(self) -> Dict[str, Any]:
+        out = {}
+        for metric in self._metrics.values():
+            series = []
+            for labels, child in list(metric._children.items()):
+                if metric.kind == "histogram":
+                    series.append([list(labels), {"counts": list(child.counts), "sum": child.sum, "count": child.count}])
+                else:
+                    series.append([list(labels), child.value])
+            out[metric.name] = {
+                "kind": metric.kind,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", [])),
+                "series": series,
+            }
+        return out
+
+    # --- Prometheus Text Exposition (v0.0.4) ---
+
+    def render_prometheus(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        lines: List[str] = []
+        for name in sorted(snapshot):
+            metric = snapshot[name]
+            labelnames = metric["labelnames"]
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            for labels, value in metric["series"]:
+                pairs = list(zip(labelnames, labels))
+                if metric["kind"] != "histogram":
+                    lines.append(f"{name}{_fmt_labels(pairs)} {_fmt_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric["buckets"] + ["+Inf"], value["counts"]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _fmt_value(bound)
+                    lines.append(f"{name}_bucket{_fmt_labels(pairs + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_fmt_labels(pairs)} {_fmt_value(value['sum'])}")
+                lines.append(f"{name}_count{_fmt_labels(pairs)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(pairs: List[Tuple[str, Any]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+# =============================================================================
+# LABEL HELPERS
+# =============================================================================
+
+def route_label(scope: Dict[str, Any]) -> str:
+    """
+    Route template for an ASGI scope after routing, e.g. /api/v1/jobs/{job_id}.
+    Rebuilt from path + path_params so it works however routers are nested;
+    unmatched paths collapse into one label to keep cardinality bounded.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    path = scope.get("path", "")
+    params = scope.get("path_params") or {}
+    if not params:
+        return path
+    names = {str(v): k for k, v in params.items()}
+    return "/".join("{%s}" % names[seg] if seg in names else seg for seg in path.split("/"))
+
+# =============================================================================
+# QUANTILES (Estimated from buckets, like PromQL histogram_quantile)
+# =============================================================================
+
+def bucket_quantile(q: float, bounds: Sequence[float], counts: Sequence[int]) -> Optional[float]:
+    total = sum(counts)
+    if total == 0:
+        return None
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if cumulative + count >= rank and count > 0:
+            if i >= len(bounds):
+                return bounds[-1] if bounds else None  # +Inf bucket: best known bound
+            lower = bounds[i - 1] if i > 0 else 0.0
+            return lower + (bounds[i] - lower) * ((rank - cumulative) / count)
+        cumulative += count
+    return bounds[-1] if bounds else None
+
+# =============================================================================
+# MULTI-PROCESS AGGREGATION (uvicorn --workers N)
+# =============================================================================
+# Each worker periodically dumps its snapshot to METRICS_MULTIPROC_DIR/<pid>.json.
+# Whichever worker serves /metrics merges its live registry with the others' files.
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {}
+    for snap in snapshots:
+        for name, metric in snap.items():
+            target = merged.setdefault(name, {**metric, "series": []})
+            index = {tuple(labels): i for i, (labels, _) in enumerate(target["series"])}
+            for labels, value in metric["series"]:
+                i = index.get(tuple(labels))
+                if i is None:
+                    index[tuple(labels)] = len(target["series"])
+                    target["series"].append([labels, json.loads(json.dumps(value))])
+                    continue
+                current = target["series"][i][1]
+                if metric["kind"] == "histogram":
+                    if len(current["counts"]) == len(value["counts"]):
+                        current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                        current["sum"] += value["sum"]
+                        current["count"] += value["count"]
+                else:
+                    # Counters add up; gauges here are per-worker amounts (in-flight, lag) -> sum
+                    target["series"][i][1] = current + value
+    return merged
+
+
+class MultiProcessExporter:
+    def __init__(self, registry: MetricsRegistry, directory: str, interval_seconds: float):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{os.getpid()}.json")
+
+    def dump(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(tmp, self.path)  # Atomic: readers never see half a file
+
+    def collect(self) -> Dict[str, Any]:
+        snapshots = [self.registry.snapshot()]
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                pid = int(os.path.basename(path).split(".")[0])
+            except ValueError:
+                continue
+            if pid == os.getpid() or not _pid_alive(pid):
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return merge_snapshots(snapshots)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.dump)
+            except Exception as e:
+                logger.warning(f"Metrics dump failed: {e}")
+
+    def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+# =============================================================================
+# GLOBAL REGISTRY & CORE METRICS
+# =============================================================================
+registry = MetricsRegistry()
+
+events_total = registry.counter(
+    "events_total", "Application events (legacy increment_metric names).", ["event"]
+)
+operation_duration = registry.histogram(
+    "operation_duration_seconds", "Duration of named internal operations.", ["operation"]
+)
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route template, method and status.", ["route", "method", "status"]
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ["route", "method", "status"]
+)
+
+http_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+http_response_size = registry.histogram(
+    "http_response_size_bytes", "Response body size on the wire.", ["route", "method"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+http_request_db_calls = registry.histogram(
+    "http_request_db_calls", "Mongo commands issued per request.", ["route", "method"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+http_request_redis_calls = registry.histogram(
+    "http_request_redis_calls", "Redis commands issued per request.", ["route", "method"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+http_request_db_seconds = registry.histogram(
+    "http_request_db_seconds", "Time spent in Mongo commands per request.", ["route", "method"]
+)
+http_request_redis_seconds = registry.histogram(
+    "http_request_redis_seconds", "Time spent in Redis commands per request.", ["route", "method"]
+)
+
+db_command_duration = registry.histogram(
+    "db_command_duration_seconds", "Mongo command latency by collection and command.",
+    ["collection", "command"]
+)
+db_documents_returned = registry.histogram(
+    "db_documents_returned", "Documents returned or affected per Mongo command.",
+    ["collection", "command"],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 1000, 5000)
+)
+db_command_errors_total = registry.counter(
+    "db_command_errors_total", "Failed Mongo commands.", ["collection", "command"]
+)
+redis_command_duration = registry.histogram(
+    "redis_command_duration_seconds", "Redis round-trip latency by command (pipelines as PIPELINE/MULTI).",
+    ["command"]
+)
+redis_pipeline_commands = registry.histogram(
+    "redis_pipeline_commands", "Commands batched per Redis pipeline.",
+    buckets=(1, 2, 3, 5, 10, 25, 50, 100, 500)
+)
+slow_queries_total = registry.counter(
+    "slow_queries_total", "Commands over the slow-query threshold.", ["backend", "collection", "command"]
+)
+
+_exporter: Optional[MultiProcessExporter] = None
+
+
+def start_metrics_exporter(directory: Optional[str], interval_seconds: float = 5.0) -> None:
+    """No-op for a single worker (directory unset)."""
+    global _exporter
+    if directory and _exporter is None:
+        _exporter = MultiProcessExporter(registry, directory, interval_seconds)
+        _exporter.start()
+        logger.info(f"📈 Multi-process metrics enabled ({directory})")
+
+
+async def stop_metrics_exporter() -> None:
+    global _exporter
+    if _exporter:
+        await _exporter.stop()
+        _exporter = None
+
+
+def collect() -> Dict[str, Any]:
+    """Snapshot across all live workers when multi-process mode is on."""
+    return _exporter.collect() if _exporter else registry.snapshot()
+
+
+def render_latest() -> str:
+    return registry.render_prometheus(collect())
@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import secrets
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("SamplingProfiler")
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_STACK_DEPTH = 128
+
+# =============================================================================
+# STACK COLLAPSING (Brendan Gregg "folded" format)
+# =============================================================================
+
+@lru_cache(maxsize=8192)
+def _frame_label(code: CodeType) -> str:
+    """'app/services/matching_algorithm.py:calculate_composite_score'. Cached per code object."""
+    filename = code.co_filename
+    if filename.startswith(_APP_ROOT):
+        filename = "app" + filename[len(_APP_ROOT):]
+    else:
+        # Libraries: keep from site-packages onward, stdlib: basename
+        marker = filename.rfind("site-packages" + os.sep)
+        filename = filename[marker + 14:] if marker >= 0 else os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """Root-first, ';'-separated frames: one line of flamegraph.pl input (minus the count)."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def render_collapsed(stacks: Counter) -> str:
+    """'stack count' lines, hottest first. Pipe into flamegraph.pl or speedscope."""
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+
+def top_functions(stacks: Counter, limit: int = 20) -> List[Dict[str, Any]]:
+    """Self time per leaf frame, as a share of all samples."""
+    total = sum(stacks.values())
+    leaves: Counter = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    return [
+        {"function": name, "samples": count, "share": round(count / total, 4)}
+        for name, count in leaves.most_common(limit)
+    ] if total else []
+
+# =============================================================================
+# SAMPLER (Background Thread)
+# =============================================================================
+
+class SamplingProfiler:
+    """
+    Wall-clock sampler: a daemon thread snapshots the target thread's stack every
+    interval via sys._current_frames(). Nothing is hooked into the interpreter,
+    so the profiled code runs at full speed; the cost is one stack walk per tick.
+    Targets the thread that created it (the event loop thread) unless told otherwise.
+    Readers go through snapshot(): the sampler inserts new stacks while a request
+    reads, and iterating the live Counter would raise mid-walk.
+    """
+    def __init__(self, interval_ms: float = 5.0, target_thread_id: Optional[int] = None,
+                 max_seconds: Optional[float] = None):
+        self.interval = max(1.0, interval_ms) / 1000
+        self.target_thread_id = target_thread_id or threading.get_ident()
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        return self
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds if self.max_seconds else None
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is not None and self.target_thread_id != own_id:
+                stack = collapse_stack(frame)  # Walk outside the lock; readers only wait on the insert
+                with self._lock:
+                    self.stacks[stack] += 1
+                    self.samples += 1
+            del frame  # Don't keep the target's frames alive between ticks
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        self.stopped_at = time.time()
+
+    def snapshot(self) -> Counter:
+        """Point-in-time copy of the stacks, safe to iterate off the sampler thread."""
+        with self._lock:
+            return Counter(self.stacks)
+
+    def result(self, top: int = 20) -> Dict[str, Any]:
+        end = self.stopped_at or time.time()
+        stacks = self.snapshot()
+        return {
+            "pid": os.getpid(),
+            "running": self.running,
+            "started_at": self.started_at,
+            "duration_seconds": round(end - self.started_at, 3) if self.started_at else 0,
+            "interval_ms": self.interval * 1000,
+            "samples": sum(stacks.values()),
+            "top": top_functions(stacks, top),
+        }
+
+    def collapsed(self) -> str:
+        return render_collapsed(self.snapshot())
+
+# =============================================================================
+# SESSION (One On-Demand Profile Per Worker)
+# =============================================================================
+
+_session: Optional[SamplingProfiler] = None
+
+
+def start_session(duration_seconds: float, interval_ms: float) -> SamplingProfiler:
+    """Must be called from the event loop thread. Raises RuntimeError if one is running."""
+    global _session
+    if _session is not None and _session.running:
+        raise RuntimeError("A profiling session is already running")
+    _session = SamplingProfiler(interval_ms, max_seconds=duration_seconds).start()
+    logger.info(f"🔬 Profiler started for {duration_seconds}s at {interval_ms}ms (pid {os.getpid()})")
+    return _session
+
+
+def stop_session() -> Optional[SamplingProfiler]:
+    if _session is not None and _session.running:
+        _session.stop()
+        logger.info(f"🔬 Profiler stopped ({_session.samples} samples)")
+    return _session
+
+
+def current_session() -> Optional[SamplingProfiler]:
+    return _session
+
+# =============================================================================
+# PER-REQUEST PROFILES (Redis-backed: any worker can arm, serve or fetch)
+# =============================================================================
+# An admin arms a one-shot token; the next request carrying it in
+# PROFILE_TOKEN_HEADER is sampled for its whole lifetime. The sampler watches the
+# loop thread, so concurrent requests on the same worker show up too: profile
+# under light traffic or read the result together with the route's own frames.
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+_TOKEN_KEY = "profiler:token:{}"
+_RESULT_KEY = "profiler:request:{}"
+
+
+async def arm_request_profile(issued_by: str) -> str:
+    token = secrets.token_urlsafe(24)
+    await get_redis().set(_TOKEN_KEY.format(token), issued_by, ex=settings.PROFILER_TOKEN_TTL_SECONDS)
+    return token
+
+
+async def consume_profile_token(token: str) -> bool:
+    """One use only: GETDEL makes a leaked token worthless after the first request."""
+    try:
+        return bool(await get_redis().getdel(_TOKEN_KEY.format(token[:64])))
+    except Exception as e:
+        logger.warning(f"Profile token check failed: {e}")
+        return False
+
+
+async def save_request_profile(request_id: str, route: str, profiler: SamplingProfiler) -> None:
+    payload = {"request_id": request_id, "route": route, **profiler.result(), "collapsed": profiler.collapsed()}
+    try:
+        await get_redis().set(_RESULT_KEY.format(request_id), json.dumps(payload),
+                              ex=settings.PROFILER_RESULT_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not store profile for request {request_id}: {e}")
+
+
+async def load_request_profile(request_id: str) -> Optional[Dict[str, Any]]:
+    raw = await get_redis().get(_RESULT_KEY.format(request_id))
+    return json.loads(raw) if raw else None
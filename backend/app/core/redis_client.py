@@ -2,6 +2,7 @@ import logging
 import redis.asyncio as redis
 from typing import Optional
 from app.core.config import settings
+from app.core.instrumentation import InstrumentedRedis
 
 logger = logging.getLogger("RedisClient")
 
@@ -12,7 +13,7 @@ class RedisClient:
     def get_instance(cls) -> redis.Redis:
         if cls._instance is None:
             try:
-                cls._instance = redis.from_url(
+                cls._instance = InstrumentedRedis.from_url(
                     settings.REDIS_URL, 
                     encoding="utf-8", 
                     decode_responses=True
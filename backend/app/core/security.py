@@ -6,10 +6,10 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from bson import ObjectId
 
 from app.core.config import settings
-from app.db.mongo import get_db
+from app.core.auth_cache import MISSING, token_cache
+from app.core.user_status import user_status_cache, STATUS_MISSING, STATUS_INACTIVE
 
 # =============================================================================
 # CONFIGURATION
@@ -82,16 +82,42 @@ def get_token_hash(token: str) -> str:
     import hashlib
     return hashlib.sha256(token.encode()).hexdigest()
 
+def decode_token_cached(token: str) -> Dict[str, Any]:
+    """
+    jwt.decode with a short-lived cache of verified claims.
+    Raises JWTError like jwt.decode. Failures are never cached.
+    """
+    key = get_token_hash(token)
+    claims = token_cache.get(key)
+    if claims is not MISSING:
+        return claims
+
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    # Never serve a token from cache past its own expiry
+    exp = claims.get("exp")
+    ttl = (exp - datetime.now(timezone.utc).timestamp()) if exp else None
+    token_cache.set(key, claims, ttl=ttl)
+    return claims
+
 # =============================================================================
 # AUTHENTICATION DEPENDENCY (The Gatekeeper)
 # =============================================================================
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> Dict[str, Any]:
+def _check_account(user_id: str, user_status: str, credentials_exception: HTTPException) -> None:
+    if user_status == STATUS_MISSING:
+        logger.warning(f"Token valid but user {user_id} not found in DB (Deleted?)")
+        raise credentials_exception
+
+    # Optional: Check if banned/inactive
+    if user_status == STATUS_INACTIVE:
+        logger.warning(f"User {user_id} is inactive but tried to login")
+        raise HTTPException(status_code=403, detail="User account is inactive")
+
+async def _authenticate(token: str, strict: bool) -> Dict[str, Any]:
     """
-    Validates JWT and checks User existence in DB.
-    Security Principle: Never trust a token blindly; the user might be banned.
+    Shared gatekeeper for user and admin dependencies.
+    strict=True skips the status cache and reads Mongo directly.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -101,8 +127,7 @@ async def get_current_user(
 
     try:
         # 1. Decode Token
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token_cached(token)
         
         user_id: str = payload.get("id")
         identifier: str = payload.get("sub")
@@ -112,44 +137,71 @@ async def get_current_user(
             logger.warning("Token missing critical claims (id or sub)")
             raise credentials_exception
 
-        # 2. Database Verification (The "Production" Step)
+        # 2. Account Verification (The "Production" Step)
         # We verify the user actually exists and is active.
-        db = get_db()
-        try:
-            oid = ObjectId(user_id)
-            # Projection: Fetch minimal data for speed
-            user = await db["users"].find_one(
-                {"_id": oid}, 
-                {"_id": 1, "is_active": 1, "role": 1}
-            )
-            
-            if not user:
-                logger.warning(f"Token valid but user {user_id} not found in DB (Deleted?)")
-                raise credentials_exception
-                
-            # Optional: Check if banned/inactive
-            if user.get("is_active") is False:
-                logger.warning(f"User {user_id} is inactive but tried to login")
-                raise HTTPException(status_code=403, detail="User account is inactive")
-
-        except Exception as db_e:
-            # Handle InvalidId or DB connection issues
-            logger.error(f"Auth DB Check Failed: {db_e}")
-            raise credentials_exception
-
-        return {
-            "id": user_id,
-            "identifier": identifier,
-            "role": role # Trust token role or DB role? Usually DB is safer, but token is faster.
-        }
+        # Served from the user-status cache unless strict; invalidated on delete/deactivate.
+        user_status, db_role = await user_status_cache.get(user_id, strict=strict)
 
+    except HTTPException:
+        raise
     except JWTError as e:
         logger.info(f"JWT Error: {e}")
         raise credentials_exception
     except Exception as e:
-        logger.error(f"Unexpected Auth Error: {e}")
+        # Handle DB/Redis connection issues
+        logger.error(f"Auth Check Failed: {e}")
         raise credentials_exception
 
+    _check_account(user_id, user_status, credentials_exception)
+
+    return {
+        "id": user_id,
+        "identifier": identifier,
+        "role": role, # Trust token role or DB role? Usually DB is safer, but token is faster.
+        "db_role": db_role
+    }
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Dict[str, Any]:
+    """
+    Validates JWT and checks User existence.
+    Security Principle: Never trust a token blindly; the user might be banned.
+    """
+    strict = settings.USER_STATUS_STRICT_SCOPE == "all"
+    return await _authenticate(credentials.credentials, strict=strict)
+
+
+async def authenticate_user_id(user_id: str) -> Dict[str, Any]:
+    """
+    Account check for credentials that aren't a JWT (signed media URLs):
+    the signature says who the URL was issued to, this says they are still active.
+    """
+    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    try:
+        user_status, db_role = await user_status_cache.get(user_id, strict=settings.USER_STATUS_STRICT_SCOPE == "all")
+    except Exception as e:
+        logger.error(f"Auth Check Failed: {e}")
+        raise credentials_exception
+    _check_account(user_id, user_status, credentials_exception)
+    return {"id": user_id, "identifier": None, "role": db_role, "db_role": db_role}
+
+
+async def get_current_admin_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Dict[str, Any]:
+    """
+    Admin-only gate. Role comes from the DB, never from the token.
+    Reads Mongo directly unless USER_STATUS_STRICT_SCOPE is "none".
+    """
+    strict = settings.USER_STATUS_STRICT_SCOPE != "none"
+    user = await _authenticate(credentials.credentials, strict=strict)
+    if user.get("db_role") != "admin":
+        logger.warning(f"Non-admin {user['id']} tried to reach an admin route")
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
 # =============================================================================
 # WEBSOCKET AUTH HELPER
 # =============================================================================
@@ -160,7 +212,7 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     Returns None if invalid.
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token_cached(token)
         if payload.get("id") is None:
             return None
         return payload
@@ -0,0 +1,149 @@
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.core.config import settings
+from app.core.auth_cache import MISSING, TTLCache, invalidate_user
+from app.core.logging import increment_metric, record_latency
+from app.core.redis_client import get_redis
+from app.db.mongo import get_db
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("UserStatusCache")
+
+STATUS_ACTIVE = "active"
+STATUS_INACTIVE = "inactive"
+STATUS_MISSING = "missing"   # Deleted account (token still valid)
+
+REDIS_KEY = "user_status:{}"  # One key per user: "status|role|fetched_at", expires with USER_STATUS_REDIS_TTL_SECONDS
+
+# =============================================================================
+# TWO-TIER CACHE (Local LRU -> Redis -> Mongo)
+# =============================================================================
+
+class UserStatusCache:
+    """
+    Answers "does this user exist and is it active?" for every authenticated request.
+    L1 is a per-worker LRU with a short TTL (bounds cross-worker staleness),
+    L2 is a Redis key per user, shared by all workers and expired by Redis,
+    Mongo is the source of truth.
+    """
+    def __init__(self):
+        self._local = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.USER_STATUS_LOCAL_TTL_SECONDS)
+        self._hits_local = 0
+        self._hits_redis = 0
+        self._misses = 0
+
+    async def get(self, user_id: str, strict: bool = False) -> Tuple[str, Optional[str]]:
+        """Returns (status, role). strict=True always reads Mongo."""
+        if not strict:
+            cached = self._local.get(user_id)
+            if cached is not MISSING:
+                self._record_hit("local", cached[2])
+                return cached[0], cached[1]
+
+            cached = await self._redis_get(user_id)
+            if cached is not None:
+                self._record_hit("redis", cached[2])
+                self._local.set(user_id, cached)
+                return cached[0], cached[1]
+
+        self._misses += 1
+        increment_metric("auth.user_status.miss")
+        status, role = await self._load_from_db(user_id)
+        entry = (status, role, time.time())
+        self._local.set(user_id, entry)
+        await self._redis_set(user_id, entry)
+        return status, role
+
+    async def invalidate(self, user_id: str) -> None:
+        """Call from delete_account and any deactivation path."""
+        self._local.pop(user_id)
+        try:
+            await get_redis().delete(REDIS_KEY.format(user_id))
+        except Exception as e:
+            logger.warning(f"User status invalidation (Redis) failed: {e}")
+        increment_metric("auth.user_status.invalidated")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits_local + self._hits_redis + self._misses
+        return {
+            "lookups": lookups,
+            "hit_ratio": round((self._hits_local + self._hits_redis) / lookups, 4) if lookups else None,
+            "local_hit_ratio": round(self._hits_local / lookups, 4) if lookups else None,
+            "local_entries": len(self._local),
+        }
+
+    # --- Internals ---
+
+    def _record_hit(self, tier: str, fetched_at: float) -> None:
+        if tier == "local":
+            self._hits_local += 1
+        else:
+            self._hits_redis += 1
+        increment_metric(f"auth.user_status.hit.{tier}")
+        # Staleness: how old the answer we just served is
+        record_latency("auth.user_status.staleness_ms", (time.time() - fetched_at) * 1000)
+
+    async def _load_from_db(self, user_id: str) -> Tuple[str, Optional[str]]:
+        try:
+            oid = ObjectId(user_id)
+        except (InvalidId, TypeError):
+            return STATUS_MISSING, None
+        user = await get_db()["users"].find_one(
+            {"_id": oid},
+            {"_id": 1, "is_active": 1, "role": 1}
+        )
+        if not user:
+            return STATUS_MISSING, None
+        status = STATUS_INACTIVE if user.get("is_active") is False else STATUS_ACTIVE
+        return status, user.get("role")
+
+    async def _redis_get(self, user_id: str) -> Optional[Tuple[str, Optional[str], float]]:
+        try:
+            raw = await get_redis().get(REDIS_KEY.format(user_id))
+        except Exception as e:
+            logger.warning(f"User status Redis read failed: {e}")
+            return None
+        if not raw:
+            return None
+        try:
+            status, role, fetched_at = raw.split("|", 2)
+            fetched_at = float(fetched_at)
+        except ValueError:
+            return None
+        return status, (role or None), fetched_at
+
+    async def _redis_set(self, user_id: str, entry: Tuple[str, Optional[str], float]) -> None:
+        status, role, fetched_at = entry
+        try:
+            await get_redis().set(
+                REDIS_KEY.format(user_id), f"{status}|{role or ''}|{fetched_at}",
+                ex=settings.USER_STATUS_REDIS_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.warning(f"User status Redis write failed: {e}")
+
+# =============================================================================
+# EXPORTED INSTANCE & HELPERS
+# =============================================================================
+user_status_cache = UserStatusCache()
+
+
+async def set_user_active(user_id: str, is_active: bool) -> bool:
+    """
+    The deactivation path. Always go through here so caches never outlive the change.
+    """
+    result = await get_db()["users"].update_one(
+        {"_id": ObjectId(user_id)},
+        {"$set": {"is_active": is_active}}
+    )
+    await user_status_cache.invalidate(user_id)
+    if not is_active:
+        invalidate_user(user_id)
+    return result.matched_count > 0
@@ -1,7 +1,8 @@
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo import IndexModel, ASCENDING, TEXT
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 from app.core.config import settings
+from app.core.instrumentation import MongoCommandListener
 
 # =============================================================================
 # CONFIGURATION
@@ -30,7 +31,8 @@ class MongoDB:
                 settings.MONGO_URL,
                 serverSelectionTimeoutMS=5000, # Fail fast (5s)
                 maxPoolSize=100, # Handle high concurrency
-                minPoolSize=10   # Keep connections warm
+                minPoolSize=10,  # Keep connections warm
+                event_listeners=[MongoCommandListener()]  # Per-request call counts
             )
             
             # Select Database
@@ -62,6 +64,7 @@ class MongoDB:
             # 2. Profiles Collection
             await self.db.profiles.create_indexes([
                 IndexModel([("user_id", ASCENDING)], name="user_id_multi"),  # Multiple profiles allowed
+                IndexModel([("imported_by", ASCENDING)], sparse=True),  # Recruiter bulk imports
                 IndexModel([("skills", TEXT)])                        # Text search for skills
             ])
 
@@ -76,14 +79,48 @@ class MongoDB:
             await self.db.applications.create_indexes([
                 # Compound index for uniqueness (User cannot double apply to same Job)
                 IndexModel([("job_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
-                IndexModel([("employer_id", ASCENDING)])
+                IndexModel([("employer_id", ASCENDING)]),
+                IndexModel([("user_id", ASCENDING), ("employer_id", ASCENDING)])  # Media access checks
             ])
             
-            # 5. Job Matches (Cache)
+            # 5. Chats (List view: $or on either participant, newest first)
+            await self.db.chats.create_indexes([
+                IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)]),
+                IndexModel([("employer_id", ASCENDING), ("updated_at", DESCENDING)]),
+                IndexModel([("application_id", ASCENDING)])
+            ])
+
+            # 6. Job Matches (Cache)
             await self.db.job_matches.create_indexes([
                 IndexModel([("user_id", ASCENDING)], unique=True)     # Fast cache retrieval
             ])
 
+            # 7. Extraction Cache (TTL on last use; also the sort key for size trimming)
+            await self.db.extraction_cache.create_indexes([
+                IndexModel([("last_used_at", ASCENDING)],
+                           expireAfterSeconds=settings.EXTRACTION_CACHE_MONGO_TTL_SECONDS)
+            ])
+
+            # 8. Resumable Upload Sessions
+            await self.db.upload_sessions.create_indexes([
+                IndexModel([("user_id", ASCENDING)]),
+                IndexModel([("status", ASCENDING), ("expires_at", ASCENDING)])  # Expiry sweep
+            ])
+
+            # 9. Video Processing Jobs (Claim order + owner polling)
+            await self.db.video_jobs.create_indexes([
+                IndexModel([("status", ASCENDING), ("run_after", ASCENDING)]),
+                IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)]),
+                IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+                IndexModel([("status", ASCENDING), ("finished_at", ASCENDING)]),  # Failed-job retention
+                IndexModel([("preview_state", ASCENDING), ("run_after", ASCENDING)], sparse=True)  # Preview follow-ups
+            ])
+
+            # 10. Blob Metadata (GC scan; zero_since only exists on unreferenced blobs)
+            await self.db.blobs.create_indexes([
+                IndexModel([("zero_since", ASCENDING)], sparse=True)
+            ])
+
             logger.info("✅ Database Indexes Verified.")
             
         except Exception as e:
@@ -7,13 +7,24 @@ from fastapi import FastAPI, WebSocket, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
 from app.db.mongo import mongo_db, get_db
-from app.routes import auth, jobs, profiles, chats, applications
+from app.routes import auth, jobs, profiles, chats, applications, metrics, admin, uploads, media
+from app.core.metrics import start_metrics_exporter, stop_metrics_exporter
+from app.core.logging import start_log_pipeline, stop_log_pipeline
+from app.core.profiler import stop_session
+from app.core.loop_monitor import start_loop_monitor, stop_loop_monitor
+from app.middleware.observability import ObservabilityMiddleware
+from app.middleware.profiling import RequestProfilerMiddleware
+from app.middleware.rate_limiter import start_local_limiters, stop_local_limiters
+from app.middleware.traffic_control import TrafficControlMiddleware
 from app.websocket.server import websocket_endpoint
 from app.services.cleanup_service import start_cleanup_tasks, stop_cleanup_tasks
+from app.services.chat_service import chat_writer
+from app.services.extraction_pool import extraction_pool
+from app.services.video_queue import video_worker
+from app.services import transcoder
 
 # =============================================================================
 # LOGGING CONFIGURATION (Splunk/Datadog Ready)
@@ -40,11 +51,21 @@ async def lifespan(app: FastAPI):
     # --- Startup ---
     logger.info("🚀 System Starting Up...")
     try:
+        if settings.LOG_ASYNC:
+            start_log_pipeline(settings.LOG_QUEUE_SIZE)
         await mongo_db.connect()
         start_cleanup_tasks()  # Start background cleanup
+        chat_writer.start()    # Group-commit writer for chat messages
+        extraction_pool.start()  # Threads for the blocking LLM SDK
+        if settings.VIDEO_WORKER_IN_PROCESS:
+            video_worker.start()  # Else: scripts/video_worker.py processes
+        start_metrics_exporter(settings.METRICS_MULTIPROC_DIR, settings.METRICS_FLUSH_SECONDS)
+        start_loop_monitor()   # Lag histogram + blocking-call stack samples
+        start_local_limiters() # Prunes idle in-process rate-limit buckets
         
         # Ensure upload directories exist (Cook Operational Discipline)
-        os.makedirs("uploads/videos", exist_ok=True)
+        os.makedirs(settings.BLOB_ROOT, exist_ok=True)  # Content-addressed videos
+        os.makedirs("uploads/partial", exist_ok=True)  # Resumable uploads in progress
         logger.info("✅ Database & Resources Ready")
     except Exception as e:
         logger.critical(f"❌ Startup Failed: {e}")
@@ -54,9 +75,18 @@ async def lifespan(app: FastAPI):
     
     # --- Shutdown ---
     logger.info("🛑 Shutting Down...")
+    await chat_writer.stop()  # Flush pending messages before the DB goes away
     await stop_cleanup_tasks()
+    await video_worker.stop()  # Before the pool: in-flight jobs go back to the queue
+    transcoder.shutdown()
+    await extraction_pool.stop()
+    await stop_metrics_exporter()
+    await stop_loop_monitor()
+    await stop_local_limiters()
+    stop_session()  # Don't leave a sampler thread behind
     mongo_db.close()
     logger.info("✅ Shutdown Complete")
+    stop_log_pipeline()  # Last: flush queued structured logs
 
 # =============================================================================
 # APP INITIALIZATION
@@ -73,6 +103,10 @@ app = FastAPI(
 # MIDDLEWARE
 # =============================================================================
 
+# 0. Per-route rate limits + load shedding (app/middleware/traffic_control.py).
+# Added first = innermost: its 429/503 responses still get CORS headers and metrics.
+app.add_middleware(TrafficControlMiddleware)
+
 # 1. CORS (Security)
 app.add_middleware(
     CORSMiddleware,
@@ -86,14 +120,12 @@ app.add_middleware(
 # 2. GZip (Performance - Compresses large JSON payloads)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-# 3. Request ID (Observability)
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-    # Attach ID to logs context (conceptually)
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    return response
+# 3. Opt-in per-request profiling (admin-armed token). Inside observability: needs the request id.
+app.add_middleware(RequestProfilerMiddleware)
+
+# 4. Request ID + Per-Route Metrics (Observability)
+# Added last = outermost: measures compressed bytes and the full middleware stack.
+app.add_middleware(ObservabilityMiddleware)
 
 # =============================================================================
 # GLOBAL EXCEPTION HANDLERS (Safety Net)
@@ -110,12 +142,6 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": f"DEBUG ERROR: {str(exc)}"}
     )
 
-# =============================================================================
-# STATIC FILES (For Video Interviews)
-# =============================================================================
-# Serve files from /uploads directory at http://host/uploads/...
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-
 # =============================================================================
 # ROUTERS
 # =============================================================================
@@ -124,6 +150,15 @@ app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
 app.include_router(profiles.router, prefix="/api/v1/profiles", tags=["Profiles"])
 app.include_router(chats.router, prefix="/api/v1/chats", tags=["Chats"])
 app.include_router(applications.router, prefix="/api/v1/applications", tags=["Applications"])
+app.include_router(uploads.router, prefix="/api/v1/uploads", tags=["Uploads"])
+app.include_router(media.router, prefix="/api/v1/media", tags=["Media"])  # Replaces the /uploads static mount
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
+
+# /metrics exposes routes, queue depths and slow queries: never serve it unauthenticated in production
+if settings.METRICS_AUTH_TOKEN or settings.DEBUG:
+    app.include_router(metrics.router, tags=["System"])
+else:
+    logger.warning("⚠️ METRICS_AUTH_TOKEN is not set: /metrics is not mounted")
 
 # =============================================================================
 # WEBSOCKETS
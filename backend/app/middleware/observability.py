@@ -0,0 +1,87 @@
+import time
+import logging
+
+from app.core.context import RequestContext, request_context, new_request_id
+from app.core.metrics import (
+    route_label, http_requests_total, http_request_duration, http_in_flight,
+    http_response_size, http_request_db_calls, http_request_redis_calls,
+    http_request_db_seconds, http_request_redis_seconds
+)
+
+logger = logging.getLogger("ObservabilityMiddleware")
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# =============================================================================
+# ASGI MIDDLEWARE (Request ID + RED metrics + per-request call counts)
+# =============================================================================
+
+class ObservabilityMiddleware:
+    """
+    Pure ASGI (no BaseHTTPMiddleware): no extra task per request, body streams untouched.
+    Records latency, status, response bytes, in-flight count, and how many Mongo/Redis
+    calls (and how much time in them) each request made, labelled by route template.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or new_request_id()
+
+        ctx = RequestContext(request_id, scope.get("method", "WS"), scope)
+        scope.setdefault("state", {})["request_id"] = request_id  # request.state.request_id
+        token = request_context.set(ctx)
+
+        if scope["type"] == "websocket":
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                request_context.reset(token)
+            return
+
+        status = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, body_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                if ctx.rate_limit is not None:
+                    # Set by services.rate_limiter during the request
+                    limit, remaining, reset = ctx.rate_limit
+                    headers.append((b"ratelimit-limit", str(limit).encode()))
+                    headers.append((b"ratelimit-remaining", str(remaining).encode()))
+                    headers.append((b"ratelimit-reset", str(reset).encode()))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            elapsed = time.perf_counter() - ctx.started_at
+            route = route_label(scope)
+            method = ctx.method
+            labels = (route, method, str(status))
+            http_requests_total.labels(*labels).inc()
+            http_request_duration.labels(*labels).observe(elapsed)
+            http_response_size.labels(route, method).observe(body_bytes)
+            http_request_db_calls.labels(route, method).observe(ctx.db_calls)
+            http_request_redis_calls.labels(route, method).observe(ctx.redis_calls)
+            http_request_db_seconds.labels(route, method).observe(ctx.db_seconds)
+            http_request_redis_seconds.labels(route, method).observe(ctx.redis_seconds)
+            request_context.reset(token)
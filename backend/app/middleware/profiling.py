@@ -0,0 +1,54 @@
+import logging
+
+from app.core.config import settings
+from app.core.metrics import route_label
+from app.core.profiler import (
+    PROFILE_TOKEN_HEADER, SamplingProfiler, consume_profile_token, save_request_profile
+)
+
+logger = logging.getLogger("ProfilingMiddleware")
+
+_HEADER = PROFILE_TOKEN_HEADER.encode("latin-1")
+
+# =============================================================================
+# ASGI MIDDLEWARE (Opt-in, Per-Request Sampling)
+# =============================================================================
+
+class RequestProfilerMiddleware:
+    """
+    Samples a single request when it carries a valid one-shot profile token
+    (armed via POST /api/v1/admin/profiler/requests). Requests without the header
+    pay one scan over their headers and nothing else.
+    Must sit inside ObservabilityMiddleware so the request id is already set.
+    """
+    def __init__(self, app):
+        self.app = app
+        self._active = False  # One profiled request per worker at a time
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = None
+        for name, value in scope.get("headers", []):
+            if name == _HEADER:
+                token = value.decode("latin-1")
+                break
+
+        if token is None or self._active or not await consume_profile_token(token):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profiler = SamplingProfiler(
+            settings.PROFILER_DEFAULT_INTERVAL_MS, max_seconds=settings.PROFILER_MAX_SECONDS
+        ).start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            self._active = False
+            request_id = scope.get("state", {}).get("request_id", "unknown")
+            await save_request_profile(request_id, route_label(scope), profiler)
+            logger.info(f"🔬 Profiled request {request_id} ({profiler.samples} samples)")
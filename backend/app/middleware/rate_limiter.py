@@ -1,105 +1,204 @@
+import math
+import time
+import asyncio
 import logging
 import threading
-from datetime import datetime, timedelta, timezone
-from collections import defaultdict
-from typing import Dict, Tuple, Optional
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException, status
 
+from app.core.config import settings
+from app.core.logging import increment_metric
+
 logger = logging.getLogger("RateLimiter")
 
 # =============================================================================
 # RATE LIMITER ENGINE
 # =============================================================================
 
+class _Bucket:
+    __slots__ = ("tokens", "updated", "blocked_until", "window")
+
+    def __init__(self, tokens: float, now: float, window: float):
+        self.tokens = tokens
+        self.updated = now
+        self.blocked_until = 0.0
+        self.window = window
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Insertion order = least recently used first (every check moves its key to the end)
+        self.buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+
 class RateLimiter:
     """
-    Thread-safe, high-performance in-memory rate limiter.
-    Uses 'Sliding Window' logic.
+    Thread-safe, memory-bounded in-memory rate limiter.
+    Uses 'Token Bucket' logic: capacity max_requests, refilled at
+    max_requests / window_seconds per second.
+    - O(1) per check: a few float ops on monotonic timestamps, no per-request history.
+    - Identifiers are spread over independently locked shards, so concurrent
+      threads rarely contend.
+    - At most max_identifiers are tracked; past that the least recently seen is evicted.
+    - Idle buckets (refilled to full, not blocked) are dropped by a background pruner.
     """
-    def __init__(self):
-        self._requests: Dict[str, list] = defaultdict(list)
-        self._blocked: Dict[str, datetime] = {}
-        self._lock = threading.Lock() # Crucial for async/threaded workers
-    
+    def __init__(self, max_identifiers: int = 100_000, shards: int = 16):
+        self._shards: List[_Shard] = [_Shard() for _ in range(max(1, shards))]
+        self._shard_cap = max(1, -(-max_identifiers // len(self._shards)))
+        self._task: Optional[asyncio.Task] = None
+
+    def _shard(self, identifier: str) -> _Shard:
+        return self._shards[hash(identifier) % len(self._shards)]
+
+    def acquire(
+        self,
+        identifier: str,
+        max_requests: int,
+        window_seconds: float,
+        block_duration_seconds: float = 0
+    ) -> Tuple[bool, float, float]:
+        """
+        Atomic check. Returns (is_allowed, tokens_left, retry_after_seconds).
+        A denied identifier is blocked for block_duration_seconds, or until the
+        next token refills if that is later.
+        """
+        now = time.monotonic()
+        shard = self._shard(identifier)
+        evicted = False
+        rate = max_requests / window_seconds
+
+        with shard.lock:
+            bucket = shard.buckets.get(identifier)
+            if bucket is None:
+                if len(shard.buckets) >= self._shard_cap:
+                    shard.buckets.popitem(last=False)
+                    evicted = True
+                bucket = _Bucket(float(max_requests), now, float(window_seconds))
+                shard.buckets[identifier] = bucket
+            else:
+                shard.buckets.move_to_end(identifier)
+
+                # 1. Block Check (Fastest)
+                if bucket.blocked_until > now:
+                    return False, 0.0, bucket.blocked_until - now
+
+                # 2. Refill for the time since the last check
+                bucket.tokens = min(float(max_requests), bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+
+            # 3. Limit Check
+            if bucket.tokens < 1.0:
+                # Trigger Block
+                wait = max(float(block_duration_seconds), (1.0 - bucket.tokens) / rate)
+                bucket.blocked_until = now + wait
+                allowed, tokens = False, 0.0
+            else:
+                # 4. Record Request
+                bucket.tokens -= 1.0
+                allowed, tokens, wait = True, bucket.tokens, 0.0
+
+        if evicted:
+            increment_metric("rate_limiter.evicted")
+        if not allowed:
+            logger.warning(f"Rate Limit Hit: {identifier} blocked for {wait:.1f}s")
+        return allowed, tokens, wait
+
     def check_rate_limit(
-        self, 
-        identifier: str, 
-        max_requests: int, 
+        self,
+        identifier: str,
+        max_requests: int,
         window_seconds: int,
         block_duration_seconds: int
     ) -> Tuple[bool, str]:
         """
         Atomic check. Returns (is_allowed, reason).
         """
-        now = datetime.now(timezone.utc)
-        
-        with self._lock:
-            # 1. Block Check (Fastest)
-            if identifier in self._blocked:
-                unblock_time = self._blocked[identifier]
-                if now < unblock_time:
-                    remaining = int((unblock_time - now).total_seconds())
-                    return False, f"Too many requests. Try again in {remaining}s."
-                else:
-                    # Block expired, clean up
-                    del self._blocked[identifier]
-
-            # 2. Lazy Cleanup (Only for THIS user, O(1) mostly)
-            # Filter out requests older than the window
-            window_start = now - timedelta(seconds=window_seconds)
-            
-            # Optimization: If list is empty or all items are old, reset immediately
-            user_history = self._requests[identifier]
-            
-            # Fast slice: keep only requests inside window
-            # (Assumes requests are appended in chronological order)
-            new_history = [t for t in user_history if t > window_start]
-            self._requests[identifier] = new_history
-            
-            # 3. Limit Check
-            if len(new_history) >= max_requests:
-                # Trigger Block
-                self._blocked[identifier] = now + timedelta(seconds=block_duration_seconds)
-                logger.warning(f"Rate Limit Hit: {identifier} blocked for {block_duration_seconds}s")
-                return False, f"Rate limit exceeded. Blocked for {block_duration_seconds}s."
-            
-            # 4. Record Request
-            self._requests[identifier].append(now)
-            return True, "OK"
-
-    def prune_stale_data(self, max_age_hours: int = 1):
+        allowed, _, retry_after = self.acquire(identifier, max_requests, window_seconds, block_duration_seconds)
+        if not allowed:
+            return False, f"Too many requests. Try again in {math.ceil(retry_after)}s."
+        return True, "OK"
+
+    def tracked(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def prune_stale_data(self) -> int:
         """
-        Maintenance task to clean completely inactive users from RAM.
-        Call this from a background task (e.g., every 10 mins), NOT the request path.
+        Drop buckets that have refilled completely and aren't blocked: forgetting them
+        changes no decision. Walks each shard from its least recently used end and stops
+        at the first recently used key, so the cost is the stale keys, not all keys.
+        Returns the number removed.
         """
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(hours=max_age_hours)
-        
-        with self._lock:
-            # Snapshot keys to allow modification during iteration
-            initial_count = len(self._requests)
-            for ident in list(self._requests.keys()):
-                # If latest request is older than cutoff, delete entire key
-                if not self._requests[ident] or self._requests[ident][-1] < cutoff:
-                    del self._requests[ident]
-            
-            # Cleanup expired blocks
-            for ident in list(self._blocked.keys()):
-                if now >= self._blocked[ident]:
-                    del self._blocked[ident]
-            
-            final_count = len(self._requests)
-            if initial_count - final_count > 0:
-                logger.info(f"RateLimiter Pruned: Removed {initial_count - final_count} stale users.")
+        removed = 0
+        for shard in self._shards:
+            now = time.monotonic()
+            with shard.lock:
+                stale = []
+                for identifier, bucket in shard.buckets.items():
+                    if now - bucket.updated < bucket.window:
+                        break
+                    if bucket.blocked_until <= now:
+                        stale.append(identifier)
+                for identifier in stale:
+                    del shard.buckets[identifier]
+            removed += len(stale)
+
+        if removed:
+            logger.info(f"RateLimiter Pruned: Removed {removed} stale identifiers.")
+        return removed
+
+    # -------------------------------------------------------------------------
+    # Background pruner (started from the app lifespan)
+    # -------------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, interval_seconds: float = 60) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._prune_loop(interval_seconds))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _prune_loop(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.prune_stale_data()
+            except Exception as e:
+                logger.error(f"RateLimiter prune failed: {e}")
 
 # =============================================================================
 # INSTANCES & DEPENDENCIES
 # =============================================================================
 
 # Global Instances (Singleton pattern via module import)
-otp_limiter = RateLimiter()
-api_limiter = RateLimiter()
+otp_limiter = RateLimiter(settings.RATE_LIMIT_LOCAL_MAX_IDENTIFIERS, settings.RATE_LIMIT_LOCAL_SHARDS)
+api_limiter = RateLimiter(settings.RATE_LIMIT_LOCAL_MAX_IDENTIFIERS, settings.RATE_LIMIT_LOCAL_SHARDS)
+
+
+def start_local_limiters() -> None:
+    for limiter in (otp_limiter, api_limiter):
+        limiter.start(settings.RATE_LIMIT_PRUNE_INTERVAL_SECONDS)
+
+
+async def stop_local_limiters() -> None:
+    for limiter in (otp_limiter, api_limiter):
+        await limiter.stop()
+
 
 def check_otp_rate_limit(identifier: str):
     """
@@ -107,8 +206,8 @@ def check_otp_rate_limit(identifier: str):
     Prevents SMS flooding / Cost attacks.
     """
     allowed, msg = otp_limiter.check_rate_limit(
-        identifier, 
-        max_requests=3, 
+        identifier,
+        max_requests=3,
         window_seconds=300,     # 5 minutes
         block_duration_seconds=900 # 15 minutes block
     )
@@ -133,4 +232,4 @@ def check_api_rate_limit(identifier: str):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=msg
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,200 @@
+import math
+import logging
+from typing import List, Optional, Pattern
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+
+from app.core.config import settings
+from app.core.context import note_rate_limit
+from app.core.logging import increment_metric
+from app.core.loop_monitor import loop_monitor
+from app.core.security import decode_token
+from app.middleware.rate_limiter import api_limiter
+
+logger = logging.getLogger("TrafficControl")
+
+# =============================================================================
+# ROUTE POLICIES (Declarative: One Table, One Middleware)
+# =============================================================================
+
+class RoutePolicy:
+    """
+    max_requests per window_seconds, per caller, per worker process (token bucket:
+    bursts up to max_requests, then the sustained rate).
+    shed=True: expensive at the door, refused with 503 while the worker is overloaded.
+    in_flight=False: long-lived responses (video streams) that shouldn't count as load.
+    per_ip=True: pre-login routes, limited per client address whatever token is sent.
+    Needs the real client address: see FORWARDED_ALLOW_IPS in start.sh.
+    """
+    __slots__ = ("name", "methods", "path", "pattern", "max_requests", "window_seconds", "shed", "in_flight",
+                 "per_ip")
+
+    def __init__(self, name: str, methods: str, path: str, max_requests: int, window_seconds: int = 60,
+                 shed: bool = False, in_flight: bool = True, per_ip: bool = False):
+        self.name = name
+        self.methods = None if methods == "*" else set(methods.split(","))
+        self.path = path
+        self.pattern: Pattern = compile_path(path)[0]
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.shed = shed
+        self.in_flight = in_flight
+        self.per_ip = per_ip
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.methods is None or method in self.methods) and self.pattern.match(path) is not None
+
+
+API = settings.API_V1_STR
+
+# First match wins. Anything else under /api/v1 gets DEFAULT_POLICY.
+# GET /jobs/ is cheap on a cache hit, so it isn't shed here: the handler sheds its
+# cache-miss recompute through load_shedder.check().
+ROUTE_POLICIES: List[RoutePolicy] = [
+    RoutePolicy("interview", "POST", f"{API}/profiles/process-interview", 10, shed=True),
+    RoutePolicy("interview_batch", "POST", f"{API}/profiles/process-interviews:batch", 2, shed=True),
+    RoutePolicy("video_interview", "POST", f"{API}/profiles/process-video-interview", 5, shed=True),
+    RoutePolicy("upload_create", "POST", f"{API}/uploads", 10, shed=True),
+    RoutePolicy("upload_chunk", "PATCH", f"{API}/uploads/{{upload_id}}", 300, shed=True),  # tus clients resume
+    RoutePolicy("job_feed", "GET", f"{API}/jobs/", 60),
+    RoutePolicy("job_apply", "POST", f"{API}/jobs/{{job_id}}/apply", 30),
+    RoutePolicy("chat_message", "POST", f"{API}/chats/{{chat_id}}/messages", 60),
+    RoutePolicy("media", "GET,HEAD", f"{API}/media/{{path:path}}", 600, in_flight=False),  # Players issue many range requests
+    # No session yet. Refresh, logout and account deletion carry one and key on the user (DEFAULT_POLICY)
+    RoutePolicy("otp_send", "POST", f"{API}/auth/send-otp", 100, per_ip=True),
+    RoutePolicy("otp_verify", "POST", f"{API}/auth/verify-otp", 100, per_ip=True),
+]
+DEFAULT_POLICY = RoutePolicy("api", "*", f"{API}/{{path:path}}", 100)  # = check_api_rate_limit
+
+
+def match_policy(method: str, path: str) -> Optional[RoutePolicy]:
+    if not path.startswith(API):
+        return None  # Health checks, /metrics, docs
+    for policy in ROUTE_POLICIES:
+        if policy.matches(method, path):
+            return policy
+    return DEFAULT_POLICY
+
+# =============================================================================
+# LOAD SHEDDER (Per Worker: In-Flight Requests + Event-Loop Lag)
+# =============================================================================
+
+class LoadShedder:
+    """
+    Overloaded = more requests in flight than max_in_flight, or the event loop
+    running behind by more than max_lag_ms (loop_monitor). Cheap requests always
+    go through; expensive ones are refused with 503 + Retry-After so they stop
+    adding to the queue everyone else's p99 is waiting in.
+    Loop-only state: no locking.
+    """
+    def __init__(self, max_in_flight: int, max_lag_ms: float, retry_after_seconds: int):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_lag = max_lag_ms / 1000
+        self.retry_after = max(1, retry_after_seconds)
+        self.in_flight = 0
+
+    def overload_reason(self) -> Optional[str]:
+        if not settings.LOAD_SHED_ENABLED:
+            return None
+        if self.in_flight > self.max_in_flight:
+            return "in_flight"
+        if loop_monitor.current_lag() > self.max_lag:
+            return "loop_lag"
+        return None
+
+    def check(self, name: str) -> None:
+        """For handlers whose expensive path is only known inside (e.g. a cache miss)."""
+        reason = self.overload_reason()
+        if reason:
+            self.record_rejection(name, reason)
+            raise HTTPException(503, "Server busy, please retry shortly",
+                                headers={"Retry-After": str(self.retry_after)})
+
+    def record_rejection(self, name: str, reason: str) -> None:
+        increment_metric("load_shed.rejected")
+        increment_metric(f"load_shed.rejected.{name}")
+        increment_metric(f"load_shed.reason.{reason}")
+
+
+load_shedder = LoadShedder(
+    settings.LOAD_SHED_MAX_IN_FLIGHT, settings.LOAD_SHED_MAX_LOOP_LAG_MS, settings.LOAD_SHED_RETRY_AFTER_SECONDS
+)
+
+# =============================================================================
+# ASGI MIDDLEWARE
+# =============================================================================
+
+def _caller(scope, policy: RoutePolicy) -> str:
+    """
+    The verified user id (signature checked, claims cached by decode_token), else the
+    client address. Never the raw header: a made-up bearer value per request would
+    otherwise get a fresh bucket every time and flood the limiter's LRU.
+    """
+    if not policy.per_ip:
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                claims = decode_token(token.strip()) if scheme.lower() == "bearer" and token else None
+                if claims:
+                    return f"u:{claims['id']}"
+                break
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+
+class TrafficControlMiddleware:
+    """
+    Pure ASGI. Per request: look up the route policy, shed if it is expensive and
+    the worker is overloaded, apply the policy's rate limit (RateLimit-* headers via
+    the request context), and count the request as in flight while it runs.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        policy = match_policy(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        if policy.shed:
+            reason = load_shedder.overload_reason()
+            if reason:
+                load_shedder.record_rejection(policy.name, reason)
+                response = JSONResponse(
+                    {"detail": "Server busy, please retry shortly"}, status_code=503,
+                    headers={"Retry-After": str(load_shedder.retry_after)}
+                )
+                await response(scope, receive, send)
+                return
+
+        if settings.RATE_LIMIT_ENABLED:
+            allowed, tokens, retry_after = api_limiter.acquire(
+                f"{policy.name}:{_caller(scope, policy)}", policy.max_requests, policy.window_seconds
+            )
+            # Reset: until the bucket is full again, or until the next request is allowed
+            reset = retry_after if not allowed else (policy.max_requests - tokens) * policy.window_seconds / policy.max_requests
+            note_rate_limit(policy.max_requests, int(tokens), max(1, math.ceil(reset)))
+            if not allowed:
+                increment_metric("rate_limit.hit")
+                increment_metric(f"rate_limit.hit.route.{policy.name}")
+                response = JSONResponse(
+                    {"detail": "Too many requests. Please slow down."}, status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+                )
+                await response(scope, receive, send)
+                return
+
+        if not policy.in_flight:
+            await self.app(scope, receive, send)
+            return
+        load_shedder.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            load_shedder.in_flight -= 1
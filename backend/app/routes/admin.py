@@ -0,0 +1,88 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.security import get_current_admin_user
+from app.core import profiler
+
+# =============================================================================
+# CONFIG
+# =============================================================================
+
+router = APIRouter()
+logger = logging.getLogger("AdminRouter")
+
+# =============================================================================
+# SCHEMAS
+# =============================================================================
+
+class ProfilerStart(BaseModel):
+    duration_seconds: float = Field(30, gt=0)
+    interval_ms: float = Field(settings.PROFILER_DEFAULT_INTERVAL_MS, ge=1, le=1000)
+
+# =============================================================================
+# SAMPLING PROFILER
+# =============================================================================
+# Sessions profile the worker that serves the call (the response includes its pid).
+# Output is folded stacks: `flamegraph.pl profile.txt > out.svg`, or drop into speedscope.
+
+@router.post("/profiler/start")
+async def start_profiler(body: ProfilerStart, admin: dict = Depends(get_current_admin_user)):
+    duration = min(body.duration_seconds, settings.PROFILER_MAX_SECONDS)
+    try:
+        session = profiler.start_session(duration, body.interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"Profiler started by admin {admin['id']}")
+    return session.result()
+
+@router.post("/profiler/stop")
+async def stop_profiler(admin: dict = Depends(get_current_admin_user)):
+    session = profiler.stop_session()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session on this worker")
+    return session.result()
+
+@router.get("/profiler")
+async def profiler_status(admin: dict = Depends(get_current_admin_user)):
+    session = profiler.current_session()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session on this worker")
+    return session.result()
+
+@router.get("/profiler/collapsed", response_class=PlainTextResponse)
+async def profiler_collapsed(admin: dict = Depends(get_current_admin_user)):
+    """Folded stacks of the current (or last) session."""
+    session = profiler.current_session()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session on this worker")
+    return PlainTextResponse(session.collapsed())
+
+@router.post("/profiler/requests")
+async def arm_request_profile(admin: dict = Depends(get_current_admin_user)):
+    """
+    Returns a one-shot token. Send it as the X-Profile-Token header on the request to
+    profile, then fetch the result by that request's X-Request-ID.
+    """
+    token = await profiler.arm_request_profile(admin["id"])
+    return {
+        "header": profiler.PROFILE_TOKEN_HEADER,
+        "token": token,
+        "expires_in": settings.PROFILER_TOKEN_TTL_SECONDS
+    }
+
+@router.get("/profiler/requests/{request_id}")
+async def get_request_profile(
+    request_id: str,
+    format: str = "json",
+    admin: dict = Depends(get_current_admin_user)
+):
+    result = await profiler.load_request_profile(request_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No profile stored for this request")
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"])
+    return result
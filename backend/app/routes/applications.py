@@ -10,6 +10,7 @@ from bson.errors import InvalidId
 
 from app.db.mongo import get_db
 from app.core.security import get_current_user
+from app.services.media import video_urls
 
 # =============================================================================
 # CONFIG
@@ -62,6 +63,17 @@ async def get_applications(current_user: dict = Depends(get_current_user)):
             }
         ).sort("updated_at", -1).to_list(100)
 
+        # Candidate interview videos for the employer side, one query for the whole page
+        candidate_ids = list({a["user_id"] for a in apps if a.get("employer_id") == user_id})
+        candidate_videos = {}
+        if candidate_ids:
+            video_profiles = await db["profiles"].find(
+                {"user_id": {"$in": candidate_ids}, "video_id": {"$ne": None}},
+                {"user_id": 1, "video_id": 1}
+            ).sort("created_at", -1).to_list(len(candidate_ids) * 5)
+            for p in video_profiles:
+                candidate_videos.setdefault(p["user_id"], p["video_id"])  # Newest first
+
         results = []
 
         for app in apps:
@@ -92,7 +104,9 @@ async def get_applications(current_user: dict = Depends(get_current_user)):
                     if job else "Unknown Company"
                 ),
                 "chatId": str(chat["_id"]) if chat else None,
-                "updatedAt": app.get("updated_at")
+                "updatedAt": app.get("updated_at"),
+                # Preview rendition by default (see /api/v1/media)
+                **video_urls(candidate_videos.get(app.get("user_id")), user_id)
             })
 
         return results
@@ -9,6 +9,8 @@ from app.schemas.auth import OTPRequest, OTPVerify, Token, UserRole, TokenRefres
 from app.services.otp_service import generate_otp, verify_otp, send_otp_via_provider
 from app.core.security import create_access_token, create_refresh_token, get_token_hash, get_current_user
 from app.core.logging import log_event, increment_metric
+from app.core.auth_cache import invalidate_user, invalidate_chat
+from app.core.user_status import user_status_cache
 from app.db.mongo import get_db
 from app.services.rate_limiter import check_otp_send_limit, check_otp_verify_limit, check_refresh_token_limit
 from app.core.config import settings
@@ -256,10 +258,17 @@ async def delete_account(current_user: dict = Depends(get_current_user)):
         
         # 2. Delete Related Data (Using string ID as foreign key)
         # Note: In a real microservice, we'd emit a "USER_DELETED" event
+        chat_ids = await db["chats"].distinct("_id", {"user_id": user_id})
         await db["profiles"].delete_many({"user_id": user_id})
         await db["applications"].delete_many({"user_id": user_id})
         await db["chats"].delete_many({"user_id": user_id})
         await db["job_matches"].delete_many({"user_id": user_id})
+
+        # 3. Revoke cached auth state (status, tokens, chat grants)
+        await user_status_cache.invalidate(user_id)
+        invalidate_user(user_id)
+        for chat_id in chat_ids:
+            invalidate_chat(str(chat_id))
         
         log_event("account_deleted", user_id=user_id)
         
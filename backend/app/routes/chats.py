@@ -9,7 +9,9 @@ from bson.errors import InvalidId
 
 from app.db.mongo import get_db
 from app.core.security import get_current_user
-from app.services.rate_limiter import check_chat_message_limit
+from app.services.chat_service import send_and_publish, load_chat_for_participant
+from app.services.presence import presence_store, safe_call, other_participants
+from app.websocket.server import manager
 
 # =============================================================================
 # CONFIGURATION & LOGGING
@@ -25,6 +27,9 @@ class MessageCreate(BaseModel):
     text: str = Field(..., min_length=1, max_length=2000)
     role: str = "employee"  # Optional input from frontend
 
+class ReadReceipt(BaseModel):
+    message_id: str = Field(..., min_length=1, max_length=64)
+
 # =============================================================================
 # UTILITIES
 # =============================================================================
@@ -44,6 +49,8 @@ async def get_user_chats(current_user: dict = Depends(get_current_user)):
     """
     Get all active chats for the logged-in user.
     Optimized: Excludes full message history for list view.
+    Unread counts and peer presence come from counters (one round trip each),
+    never from scanning messages.
     """
     db = get_db()
     user_id = current_user["id"]
@@ -61,9 +68,19 @@ async def get_user_chats(current_user: dict = Depends(get_current_user)):
 
         chats = await cursor.to_list(length=100)
 
+        unread = await safe_call(presence_store.get_unread(user_id), default={})
+        peers = {
+            peer for chat in chats for peer in other_participants(chat, user_id)
+        }
+        online = await safe_call(presence_store.online_many(peers), default={})
+
         for chat in chats:
             chat["id"] = str(chat["_id"])
             chat["_id"] = str(chat["_id"])
+            chat["unread_count"] = unread.get(chat["id"], 0)
+            chat["peer_online"] = any(
+                online.get(peer, False) for peer in other_participants(chat, user_id)
+            )
 
         return chats
 
@@ -106,6 +123,30 @@ async def get_chat_detail(
         raise HTTPException(500, "Could not load chat")
 
 
+@router.post("/{chat_id}/read")
+async def mark_chat_read(
+    chat_id: str,
+    payload: ReadReceipt,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    REST twin of the socket {"type": "read"} frame.
+    Resets the unread counter and notifies the room.
+    """
+    user_id = current_user["id"]
+    oid = safe_oid(chat_id)
+
+    if not await load_chat_for_participant(oid, user_id):
+        raise HTTPException(403, "Access denied")
+
+    timestamp = datetime.utcnow().isoformat()
+    await safe_call(presence_store.mark_read(chat_id, user_id, payload.message_id, timestamp))
+    manager.publish(chat_id, {
+        "type": "read", "user_id": user_id, "message_id": payload.message_id, "timestamp": timestamp
+    })
+    return {"status": "success"}
+
+
 @router.post("/{chat_id}/messages")
 async def send_message(
     chat_id: str,
@@ -114,67 +155,24 @@ async def send_message(
 ):
     """
     Send a message in a chat.
-    Atomic update: pushes message and updates last_message metadata.
+    Waits for the group commit, then fans out to connected sockets.
+    Clients that hold a socket can send over /ws/{chat_id} instead.
     """
     db = get_db()
     user_id = current_user["id"]
     oid = safe_oid(chat_id)
 
     try:
-        chat = await db["chats"].find_one(
-            {"_id": oid},
-            {"user_id": 1, "employer_id": 1}
-        )
+        chat = await load_chat_for_participant(oid, user_id)
 
         if not chat:
-            raise HTTPException(404, "Chat not found")
-
-        if chat.get("user_id") != user_id and chat.get("employer_id") != user_id:
+            # Slow path only on failure: tell "missing" apart from "forbidden"
+            if not await db["chats"].find_one({"_id": oid}, {"_id": 1}):
+                raise HTTPException(404, "Chat not found")
             raise HTTPException(403, "You cannot reply to this chat")
 
-
-        # 🔒 ROLE RESOLUTION LOGIC
-        # 1. Determine actual relationships
-        is_employer = (chat.get("employer_id") == user_id)
-        is_seeker = (chat.get("user_id") == user_id)
-        
-        # 2. Determine final role
-        final_role = "employee" # Default
-        
-        if is_employer and is_seeker:
-            # Self-Chat / Demo Mode: Trust the frontend claimed role
-            final_role = message.role if message.role in ["employer", "employee"] else "employer"
-        elif is_employer:
-            final_role = "employer"
-        elif is_seeker:
-            final_role = "employee"
-        else:
-            raise HTTPException(403, "Access Denied")
-
-        # 3. Create Message
-        timestamp = datetime.utcnow().isoformat()
-        new_message = {
-            "id": str(ObjectId()),
-            "sender_id": user_id,
-            "role": final_role, 
-            "text": message.text,
-            "timestamp": timestamp
-        }
-
-        await db["chats"].update_one(
-            {"_id": oid},
-            {
-                "$push": {"messages": new_message},
-                "$set": {
-                    "updated_at": timestamp,
-                    "last_message": (
-                        message.text[:50] + "..."
-                        if len(message.text) > 50
-                        else message.text
-                    )
-                }
-            }
-        )
+        # Same pipeline as the WebSocket: rate limit -> group commit -> fan out
+        new_message = await send_and_publish(chat, user_id, message.text, message.role)
 
         return {
             "status": "success",
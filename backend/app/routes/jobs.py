@@ -13,6 +13,7 @@ from app.core.security import get_current_user
 from app.core.redis_client import get_redis
 from app.core.logging import increment_metric, measure_latency
 from app.services.matching_algorithm import match_jobs_for_profile
+from app.middleware.traffic_control import load_shedder
 
 # =============================================================================
 # CONFIG
@@ -104,7 +105,8 @@ async def get_jobs(
             return matches
 
 
-        # 4. Compute matches (authoritative)
+        # 4. Compute matches (authoritative). The expensive path: refused while overloaded
+        load_shedder.check("job_feed_recompute")
         increment_metric("match.cache.miss")
         logger.info(f"🔄 Match Cache MISS for {cache_key}. Computing...")
         
@@ -135,6 +137,8 @@ async def get_jobs(
 
         return matches
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"JOB FEED ERROR: {e}")
         raise HTTPException(500, "Failed to load jobs")
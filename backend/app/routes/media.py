@@ -0,0 +1,89 @@
+import logging
+import mimetypes
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from app.core.security import get_current_user, authenticate_user_id
+from app.services.blob_store import blob_store
+from app.services.video_queue import PREVIEW_QUEUED, PREVIEW_RUNNING
+from app.services.media import (
+    resolve_video, serve_file, verify_media_signature, RENDITION_PREVIEW, RENDITION_ORIGINAL
+)
+
+# =============================================================================
+# CONFIG
+# =============================================================================
+
+router = APIRouter()
+logger = logging.getLogger("MediaRouter")
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+# =============================================================================
+# VIEWER (Bearer header, or a signed URL for <video src> / <img src>)
+# =============================================================================
+
+async def get_media_viewer(
+    video_id: str,
+    viewer: Optional[str] = None,
+    expires: Optional[int] = None,
+    sig: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)
+) -> dict:
+    """API clients send the Bearer token; browsers play the signed URLs from video_urls()."""
+    if credentials is not None:
+        return await get_current_user(credentials)
+    if viewer and expires and sig and verify_media_signature(video_id, viewer, expires, sig):
+        return await authenticate_user_id(viewer)
+    raise HTTPException(401, "Could not validate credentials", headers={"WWW-Authenticate": "Bearer"})
+
+# =============================================================================
+# ENDPOINTS
+# =============================================================================
+
+@router.api_route("/videos/{video_id}", methods=["GET", "HEAD"])
+async def stream_video(
+    video_id: str,
+    request: Request,
+    rendition: str = RENDITION_PREVIEW,
+    current_user: dict = Depends(get_media_viewer)
+):
+    """
+    Interview video playback. Supports Range (scrubbing), If-None-Match / If-Range,
+    and is private-cacheable. Visible to the candidate, admins and employers
+    the candidate has applied to. Authenticated by Bearer header or signed URL.
+    Serves the compact preview by default (the original until one exists);
+    ?rendition=original forces the upload as recorded.
+    """
+    if rendition not in (RENDITION_PREVIEW, RENDITION_ORIGINAL):
+        raise HTTPException(400, "rendition must be 'preview' or 'original'")
+    video = await resolve_video(video_id, current_user)
+
+    preview_digest = video.get("artifacts", {}).get("preview_digest")
+    if rendition == RENDITION_PREVIEW and preview_digest:
+        return await serve_file(
+            blob_store.local_path(preview_digest), request.headers, current_user["id"], "video/mp4",
+            digest=preview_digest
+        )
+
+    # The default URL switches to the preview once it lands: until then, make browsers revalidate
+    preview_pending = rendition == RENDITION_PREVIEW and video.get("preview_state") in (PREVIEW_QUEUED, PREVIEW_RUNNING)
+    media_type = video.get("content_type") or mimetypes.guess_type(video["file_path"])[0] or "video/mp4"
+    return await serve_file(
+        video["file_path"], request.headers, current_user["id"], media_type, digest=video.get("blob_digest"),
+        immutable=not preview_pending
+    )
+
+@router.api_route("/videos/{video_id}/poster", methods=["GET", "HEAD"])
+async def video_poster(video_id: str, request: Request, current_user: dict = Depends(get_media_viewer)):
+    """Poster frame (JPEG) shown before playback starts. 404 until the preview stage has run."""
+    video = await resolve_video(video_id, current_user)
+    poster_digest = video.get("artifacts", {}).get("poster_digest")
+    if not poster_digest:
+        raise HTTPException(404, "Poster not available")
+    return await serve_file(
+        blob_store.local_path(poster_digest), request.headers, current_user["id"], "image/jpeg",
+        digest=poster_digest
+    )
@@ -1,15 +1,54 @@
-from fastapi import APIRouter
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from app.core.config import settings
 from app.core.logging import get_metrics
+from app.core.metrics import render_latest
+from app.core.instrumentation import recent_slow_queries
+from app.core.loop_monitor import loop_monitor
+from app.core.user_status import user_status_cache
 
 router = APIRouter()
 
-@router.get("/metrics")
-async def metrics_endpoint():
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _check_scrape_token(authorization: Optional[str]) -> None:
+    """
+    Scrapers must send METRICS_AUTH_TOKEN as a Bearer token. Without a token the
+    endpoints are open in DEBUG only; main.py doesn't mount them otherwise, and
+    this refuses as a second line in case the router is mounted elsewhere.
+    """
+    expected = settings.METRICS_AUTH_TOKEN
+    if not expected:
+        if settings.DEBUG:
+            return
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = (authorization or "").removeprefix("Bearer ").strip()
+    if not secrets.compare_digest(supplied, expected):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus scrape target (text exposition format).
+    Aggregates all uvicorn workers when METRICS_MULTIPROC_DIR is set.
+    """
+    _check_scrape_token(authorization)
+    return PlainTextResponse(render_latest(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@router.get("/metrics/json")
+async def metrics_json_endpoint(authorization: Optional[str] = Header(None)):
     """
-    Expose metrics snapshot for monitoring.
-    In production, this should be:
-    - Protected by auth or IP whitelist
-    - Exported to Prometheus/Datadog/CloudWatch
-    - Not publicly accessible
+    Human-friendly snapshot: counters + estimated latency percentiles,
+    plus the most recent slow Mongo/Redis commands with their request id and route,
+    and the stacks that blocked this worker's event loop most often.
     """
-    return get_metrics()
+    _check_scrape_token(authorization)
+    snapshot = get_metrics()
+    snapshot["auth_user_status"] = user_status_cache.stats()
+    snapshot["slow_queries"] = recent_slow_queries()
+    snapshot["event_loop"] = loop_monitor.stats()
+    return snapshot
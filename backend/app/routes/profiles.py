@@ -1,18 +1,24 @@
 import shutil
 import os
+import json
 import logging
-import aiofiles # Async file IO
 from datetime import datetime
 from typing import List, Optional, Dict, Union, Any
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from pymongo.errors import DuplicateKeyError
 
 from app.db.mongo import get_db
+from app.core.config import settings
 from app.core.security import get_current_user
 from app.core.redis_client import get_redis
-from app.services.ai_extraction import extract_profile_from_interview
+from app.services.extraction_pool import extraction_pool, get_job
+from app.services import uploads
+from app.services.blob_store import blob_store, BlobTooLarge
+from app.services.video_queue import enqueue_video_job, get_video_job, video_worker
+from app.services.media import resolve_video, video_urls
 # from app.core.logging import log_event # Assuming this exists or using standard logger
 
 # =============================================================================
@@ -21,9 +27,8 @@ from app.services.ai_extraction import extract_profile_from_interview
 router = APIRouter()
 logger = logging.getLogger("ProfilesRouter")
 
-UPLOAD_DIR = "uploads/videos"
-ALLOWED_VIDEO_TYPES = {"video/mp4", "video/webm", "video/quicktime"}
-MAX_VIDEO_SIZE = 100 * 1024 * 1024 # 100MB Cap for MVP
+ALLOWED_VIDEO_TYPES = uploads.ALLOWED_VIDEO_TYPES
+MAX_VIDEO_SIZE = uploads.MAX_VIDEO_SIZE # 100MB Cap for MVP (UPLOAD_MAX_BYTES)
 
 # =============================================================================
 # SCHEMAS
@@ -32,6 +37,14 @@ MAX_VIDEO_SIZE = 100 * 1024 * 1024 # 100MB Cap for MVP
 class InterviewData(BaseModel):
     transcript: str = Field(..., min_length=10, max_length=50000)
 
+class BatchInterviewItem(BaseModel):
+    transcript: str = Field(..., min_length=10, max_length=50000)
+    candidate_ref: Optional[str] = Field(None, max_length=100)  # Recruiter's own reference (phone, name)
+
+class BatchInterviewRequest(BaseModel):
+    items: List[BatchInterviewItem] = Field(..., min_length=1)
+    create_profiles: bool = False
+
 class ProfileResponse(BaseModel):
     id: str
     roleTitle: str
@@ -63,31 +76,84 @@ class ProfileCreate(BaseModel):
     # New Signals
     experience_detail: Optional[ExperienceEntry] = None
     target_role: Optional[str] = None
+    video_id: Optional[str] = None  # From a finished video job
 
 # =============================================================================
 # UTILITIES
 # =============================================================================
 
-async def save_video_file(file: UploadFile, request_id: str) -> str:
+async def save_video_file(file: UploadFile) -> Dict[str, Any]:
     """
     Async file save. Prevents blocking the main thread.
     Cook Operational Discipline: Validate before writing.
+    Content-addressed: a re-uploaded identical video is stored once. Returns the
+    blob doc, holding one reference the caller must hand off or release.
+    The size cap is enforced while streaming; large/flaky uploads should use /uploads (resumable).
     """
     if file.content_type not in ALLOWED_VIDEO_TYPES:
         raise HTTPException(400, "Invalid file type. Only MP4/WebM allowed.")
 
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    file_path = f"{UPLOAD_DIR}/{request_id}_{file.filename}"
+    async def chunks():
+        while content := await file.read(1024 * 1024): # 1MB chunks
+            yield content
 
     try:
-        async with aiofiles.open(file_path, 'wb') as out_file:
-            while content := await file.read(1024 * 1024): # 1MB chunks
-                await out_file.write(content)
-        return file_path
+        return await blob_store.ingest(chunks(), MAX_VIDEO_SIZE, file.content_type)
+    except BlobTooLarge:
+        raise HTTPException(413, f"Video exceeds {MAX_VIDEO_SIZE // (1024 * 1024)}MB limit")
     except Exception as e:
         logger.error(f"File Save Error: {e}")
         raise HTTPException(500, "Could not save video file")
 
+async def _invalidate_match_cache(user_id: str) -> None:
+    """Profiles changed: drop cached matches so a fresh match is computed."""
+    db = get_db()
+    await db["job_matches"].delete_many({"user_id": user_id})
+    
+    # Invalidate Redis cache
+    redis = get_redis()
+    try:
+        # Pattern delete: match:{user_id}:*
+        pattern = f"match:{user_id}:*"
+        cursor = 0
+        while True:
+            cursor, keys = await redis.scan(cursor, match=pattern, count=100)
+            if keys:
+                await redis.delete(*keys)
+            if cursor == 0:
+                break
+    except Exception as e:
+        logger.warning(f"Redis invalidation failed: {e}")
+
+# Roles allowed to store bulk-imported candidates (checked against the DB role, not the token)
+IMPORT_ROLES = ("employer", "admin")
+
+def _extracted_profile_doc(profile: Dict[str, Any], imported_by: str, candidate_ref: Optional[str]) -> Dict[str, Any]:
+    """
+    Same shape as create_profile's document, from an extraction result.
+    Unowned (user_id None): the candidate has no account yet, and the importer's
+    own profile list and job matching must not pick these up.
+    """
+    return {
+        "user_id": None,
+        "imported_by": imported_by,
+        "roleTitle": profile["roleTitle"],
+        "target_role": profile["roleTitle"],
+        "location": profile.get("location", "Unknown"),
+        "experienceYears": profile.get("experienceYears", 0.0),
+        "experience_detail": None,
+        "salary_expectations": "Negotiable",
+        "skills": profile.get("skills", []),
+        "skill_entries": [{"name": s, "level": "intermediate"} for s in profile.get("skills", [])],
+        "summary": profile.get("summary", ""),
+        "remote_work_preference": False,
+        "source": "batch_transcript",
+        "candidate_ref": candidate_ref,
+        "active": True,
+        "isDefault": False,
+        "created_at": datetime.utcnow()
+    }
+
 # =============================================================================
 # ENDPOINTS
 # =============================================================================
@@ -102,12 +168,13 @@ async def get_profiles(current_user: dict = Depends(get_current_user)):
     try:
         profiles = await db["profiles"].find(
             {"user_id": current_user["id"]},
-            {"_id": 1, "roleTitle": 1, "summary": 1, "skills": 1, "experienceYears": 1, "location": 1, "salary_expectations": 1, "created_at": 1, "active": 1, "isDefault": 1}
+            {"_id": 1, "roleTitle": 1, "summary": 1, "skills": 1, "experienceYears": 1, "location": 1, "salary_expectations": 1, "created_at": 1, "active": 1, "isDefault": 1, "video_id": 1}
         ).sort("created_at", -1).to_list(100)
 
         for p in profiles:
             p["id"] = str(p["_id"])
             p["_id"] = str(p["_id"])
+            p.update(video_urls(p.pop("video_id", None), current_user["id"]))  # videoUrl serves the preview rendition
             
         return profiles
     except Exception as e:
@@ -127,6 +194,9 @@ async def create_profile(
     Create and save a new profile for the job seeker.
     """
     db = get_db()
+
+    if profile_data.video_id:
+        await resolve_video(profile_data.video_id, {"id": current_user["id"]})  # Own videos only
     
     try:
         # Normalize Skills: Split into legacy Strings and rich Entries
@@ -161,7 +231,8 @@ async def create_profile(
             "skill_entries": final_skill_entries, # High Signal List[dict]
             "summary": profile_data.summary or f"Experienced {profile_data.job_title} in {profile_data.location}.",
             "remote_work_preference": profile_data.remote_work_preference,
-            "source": "manual",
+            "video_id": profile_data.video_id,
+            "source": "video_interview" if profile_data.video_id else "manual",
             "active": True,
             "isDefault": True,
             "created_at": datetime.utcnow()
@@ -171,23 +242,7 @@ async def create_profile(
         result = await db["profiles"].insert_one(profile_doc)
         profile_id = str(result.inserted_id)
         
-        # Invalidate job_matches cache so fresh match is computed
-        await db["job_matches"].delete_many({"user_id": current_user["id"]})
-        
-        # Invalidate Redis cache
-        redis = get_redis()
-        try:
-            # Pattern delete: match:{user_id}:*
-            pattern = f"match:{current_user['id']}:*"
-            cursor = 0
-            while True:
-                cursor, keys = await redis.scan(cursor, match=pattern, count=100)
-                if keys:
-                    await redis.delete(*keys)
-                if cursor == 0:
-                    break
-        except Exception as e:
-            logger.warning(f"Redis invalidation failed: {e}")
+        await _invalidate_match_cache(current_user["id"])
         
         logger.info(f"Profile created: {profile_id} for user {current_user['id']}")
         
@@ -197,6 +252,7 @@ async def create_profile(
             "skills": profile_doc["skills"],
             "experienceYears": profile_doc["experienceYears"],
             "summary": profile_doc["summary"],
+            **video_urls(profile_doc["video_id"], current_user["id"]),
             "message": "Profile created successfully"
         }
         
@@ -204,29 +260,46 @@ async def create_profile(
         logger.error(f"Create Profile Error: {e}")
         raise HTTPException(status_code=500, detail="Could not create profile")
 
+def _enrich_transcript_profile(profile_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    profile_data["user_id"] = user_id
+    profile_data["source"] = "text_transcript"
+    profile_data["created_at"] = datetime.utcnow()
+    return profile_data
+
 @router.post("/process-interview")
 async def process_interview(
     data: InterviewData,
+    response: Response,
+    async_job: Optional[bool] = None,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Process raw text transcript.
-    Safety: Time-bounded LLM execution.
+    Safety: Time-bounded LLM execution on the extraction pool (never blocks the loop).
+    Long transcripts (or ?async_job=true) return 202 + a job id to poll.
     """
-    request_id = f"req_{int(datetime.now().timestamp())}"
-    
+    if async_job is None:
+        async_job = len(data.transcript) > settings.EXTRACTION_ASYNC_THRESHOLD_CHARS
+
     try:
-        # LLM Call (Assuming synchronous for now, ideal to be async)
-        profile_data = extract_profile_from_interview(data.transcript)
-        
-        # Enrich
-        profile_data["user_id"] = current_user["id"]
-        profile_data["source"] = "text_transcript"
-        profile_data["created_at"] = datetime.utcnow()
+        if async_job:
+            user_id = current_user["id"]
+            job_id = await extraction_pool.submit_job(
+                data.transcript, user_id,
+                on_done=lambda profile: _enrich_transcript_profile(profile, user_id)
+            )
+            response.status_code = 202
+            return {
+                "job_id": job_id,
+                "status": "pending",
+                "poll_url": f"/api/v1/profiles/extraction-jobs/{job_id}"
+            }
+
+        profile_data = await extraction_pool.extract(data.transcript)
         
         # Save extracted profile automatically? 
         # Usually we return draft, let user confirm.
-        return profile_data
+        return _enrich_transcript_profile(profile_data, current_user["id"])
 
     except Exception as e:
         logger.error(f"AI Extraction Failed (Text): {e}")
@@ -239,47 +312,104 @@ async def process_interview(
             "error": str(e)
         }
 
-@router.post("/process-video-interview")
+@router.post("/process-interviews:batch")
+async def process_interviews_batch(
+    data: BatchInterviewRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Bulk onboarding: many transcripts in, one NDJSON line out per transcript as soon as it is ready.
+    LLM calls are batched EXTRACTION_LLM_BATCH_SIZE transcripts per prompt; cache hits return first.
+    create_profiles=true (employers and admins only) also inserts each finished group
+    with one insert_many, as unowned candidate records tagged imported_by.
+    Lines: {"index", "candidate_ref", "engine", "profile", "profile_id"?} then a final {"done": true, ...}.
+    """
+    if len(data.items) > settings.EXTRACTION_BATCH_MAX_ITEMS:
+        raise HTTPException(413, f"At most {settings.EXTRACTION_BATCH_MAX_ITEMS} transcripts per batch")
+    if data.create_profiles and current_user.get("db_role") not in IMPORT_ROLES:
+        raise HTTPException(403, "Only employers can import candidate profiles")
+
+    user_id = current_user["id"]
+    transcripts = [item.transcript for item in data.items]
+
+    async def stream():
+        db = get_db()
+        created = 0
+        failed_inserts = 0
+        async for group in extraction_pool.extract_many(transcripts, settings.EXTRACTION_LLM_BATCH_SIZE):
+            profile_ids: Dict[int, str] = {}
+            if data.create_profiles:
+                docs = [_extracted_profile_doc(p, user_id, data.items[i].candidate_ref) for i, p, _ in group]
+                try:
+                    result = await db["profiles"].insert_many(docs, ordered=False)
+                    profile_ids = {i: str(oid) for (i, _, _), oid in zip(group, result.inserted_ids)}
+                    created += len(result.inserted_ids)
+                except Exception as e:
+                    logger.error(f"Batch profile insert failed: {e}")
+                    failed_inserts += len(docs)
+
+            for i, profile, engine in group:
+                line = {
+                    "index": i,
+                    "candidate_ref": data.items[i].candidate_ref,
+                    "engine": engine,
+                    "profile": profile
+                }
+                if i in profile_ids:
+                    line["profile_id"] = profile_ids[i]
+                yield json.dumps(line) + "\n"
+
+        summary = {"done": True, "total": len(transcripts), "profiles_created": created}
+        if failed_inserts:
+            summary["profiles_failed"] = failed_inserts
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/extraction-jobs/{job_id}")
+async def get_extraction_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Poll a transcript extraction job: pending | done (with result) | failed."""
+    return await get_job(job_id, current_user["id"])
+
+@router.post("/process-video-interview", status_code=202)
 async def process_video_interview(
-    video: UploadFile = File(...),
+    video: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = Form(None),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Process video file.
-    Flow: Upload -> (Simulated) Transcribe -> Extract -> Return.
-    Reliability: Async I/O, Error Handling.
+    Flow: Upload -> queue (probe -> audio -> transcribe -> extract) -> poll; the preview follows the result.
+    Reliability: Transcription runs on the video workers, never inside the request.
+    Accepts either a multipart `video` or the `upload_id` of a finalized resumable upload.
     """
-    request_id = f"vid_{int(datetime.now().timestamp())}"
-    
-    # 1. Async Save (Non-blocking)
-    file_path = await save_video_file(video, request_id)
-    
-    # 2. Transcription Simulation
-    # In V2: Push to Celery/Background Tasks for Whisper processing
-    logger.info(f"Video saved to {file_path}. simulating transcription...")
-    
-    # Mock Transcript (Simulating a successful Whisper output)
-    mock_transcript = (
-        "Hello, I am Rajesh. I have been driving heavy trucks for 8 years "
-        "across Hyderabad and Bangalore. I have a clean license and know "
-        "basic engine repair. I am looking for a stable logistics role."
-    )
+    # 1. Async Save (Non-blocking, deduplicated)
+    if upload_id:
+        session = await uploads.get_session(upload_id, current_user["id"])
+        if session["status"] != uploads.STATUS_COMPLETE:
+            raise HTTPException(409, "Upload not finalized")
+        digest, content_type = session["blob_digest"], session["content_type"]
+        job_id = await enqueue_video_job(current_user["id"], digest, content_type)
+    elif video is not None:
+        blob = await save_video_file(video)
+        digest, content_type = blob["_id"], blob["content_type"]
+        try:
+            job_id = await enqueue_video_job(current_user["id"], digest, content_type)
+        finally:
+            await blob_store.release(digest)  # The job holds its own reference
+    else:
+        raise HTTPException(400, "Provide a video file or an upload_id")
     
-    # 3. Extraction
-    try:
-        profile_data = extract_profile_from_interview(mock_transcript)
-        
-        profile_data["source"] = "video_interview"
-        profile_data["video_path"] = file_path # In prod, this is S3 URL
-        
-        return profile_data
-        
-    except Exception as e:
-        logger.error(f"AI Extraction Failed (Video): {e}")
-        return {
-             "roleTitle": "Driver (Video Parsed)",
-             "skills": ["Driving", "Vehicle Maintenance"],
-             "experienceYears": 5,
-             "summary": "Video processed but AI extraction had low confidence.",
-             "video_path": file_path
-        }
\ No newline at end of file
+    # 2. Queue for background processing
+    video_worker.notify()
+    logger.info(f"Video stored as blob {digest[:12]}. queued as job {job_id}")
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "poll_url": f"/api/v1/profiles/video-jobs/{job_id}"
+    }
+
+@router.get("/video-jobs/{job_id}")
+async def get_video_interview_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Poll a video job: queued | running (with stage) | done (with result) | failed."""
+    return await get_video_job(job_id, current_user["id"])
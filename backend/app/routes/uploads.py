@@ -0,0 +1,109 @@
+import base64
+import logging
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+
+from app.core.security import get_current_user
+from app.services import uploads
+
+# =============================================================================
+# CONFIG
+# =============================================================================
+
+router = APIRouter()
+logger = logging.getLogger("UploadsRouter")
+
+TUS_VERSION = "1.0.0"
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _parse_metadata(header: Optional[str]) -> Dict[str, str]:
+    """tus Upload-Metadata: 'filename <b64>,filetype <b64>'."""
+    metadata: Dict[str, str] = {}
+    for pair in (header or "").split(","):
+        parts = pair.strip().split(" ", 1)
+        if not parts[0]:
+            continue
+        try:
+            metadata[parts[0]] = base64.b64decode(parts[1]).decode("utf-8") if len(parts) > 1 else ""
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(400, f"Invalid Upload-Metadata value for '{parts[0]}'")
+    return metadata
+
+def _offset_headers(session: dict) -> Dict[str, str]:
+    return {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["length"]),
+        "Cache-Control": "no-store"
+    }
+
+# =============================================================================
+# ENDPOINTS (tus-style resumable upload)
+# =============================================================================
+# 1. POST   /uploads            Upload-Length + Upload-Metadata -> 201, Location
+#                               (429 past UPLOAD_MAX_OPEN_SESSIONS unfinished uploads)
+# 2. HEAD   /uploads/{id}       -> Upload-Offset (where to resume after a drop)
+# 3. PATCH  /uploads/{id}       Upload-Offset + body [+ Upload-Checksum] -> 204, new Upload-Offset
+#                               (423 while another PATCH still holds the upload)
+# 4. POST   /uploads/{id}/finalize  -> file ready for processing
+#    DELETE /uploads/{id}       abandon
+
+@router.post("", status_code=201)
+async def create_upload(
+    response: Response,
+    upload_length: int = Header(..., alias="Upload-Length"),
+    upload_metadata: Optional[str] = Header(None, alias="Upload-Metadata"),
+    current_user: dict = Depends(get_current_user)
+):
+    metadata = _parse_metadata(upload_metadata)
+    session = await uploads.create_session(
+        current_user["id"],
+        upload_length,
+        metadata.get("filename"),
+        metadata.get("filetype", "video/mp4")
+    )
+    upload_id = str(session["_id"])
+    response.headers["Location"] = f"/api/v1/uploads/{upload_id}"
+    response.headers.update(_offset_headers(session))
+    return {"upload_id": upload_id, "offset": 0, "length": session["length"]}
+
+@router.head("/{upload_id}")
+async def upload_offset(upload_id: str, current_user: dict = Depends(get_current_user)):
+    session = await uploads.get_session(upload_id, current_user["id"])
+    return Response(status_code=200, headers=_offset_headers(session))
+
+@router.patch("/{upload_id}", status_code=204)
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    upload_checksum: Optional[str] = Header(None, alias="Upload-Checksum"),
+    content_type: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    if content_type != CHUNK_CONTENT_TYPE:
+        raise HTTPException(415, f"Content-Type must be {CHUNK_CONTENT_TYPE}")
+    offset = await uploads.append_chunk(
+        upload_id, current_user["id"], upload_offset, request.stream(), upload_checksum
+    )
+    return Response(status_code=204, headers={"Tus-Resumable": TUS_VERSION, "Upload-Offset": str(offset)})
+
+@router.post("/{upload_id}/finalize")
+async def finalize_upload(upload_id: str, current_user: dict = Depends(get_current_user)):
+    session = await uploads.finalize_session(upload_id, current_user["id"])
+    return {
+        "upload_id": upload_id,
+        "status": session["status"],
+        "size": session["length"],
+        "content_type": session["content_type"]
+    }
+
+@router.delete("/{upload_id}", status_code=204)
+async def abort_upload(upload_id: str, current_user: dict = Depends(get_current_user)):
+    await uploads.abort_session(upload_id, current_user["id"])
+    return Response(status_code=204)
@@ -4,11 +4,17 @@ import re
 import logging
 from typing import Dict, List, Any, Optional
 
+from app.core.config import settings
+from app.services import rule_extractor
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 logger = logging.getLogger("AIExtractionService")
 
+# Bump whenever the prompt or the rules change: it is part of the extraction cache key
+EXTRACTOR_VERSION = "3"
+
 # Feature Flags
 # Only enable Gemini if the package is installed AND the key is present
 ENABLE_GEMINI = False
@@ -25,6 +31,18 @@ try:
 except ImportError:
     logger.warning("⚠️ google-generativeai not installed. AI features disabled.")
 
+def llm_enabled() -> bool:
+    """EXTRACTION_LLM="fake" swaps in the local stub (services/fake_gemini.py)."""
+    if settings.EXTRACTION_LLM == "fake":
+        return True
+    return settings.EXTRACTION_LLM == "gemini" and ENABLE_GEMINI
+
+def _get_model():
+    if settings.EXTRACTION_LLM == "fake":
+        from app.services.fake_gemini import FakeGenerativeModel
+        return FakeGenerativeModel()
+    return genai.GenerativeModel('gemini-pro')
+
 # =============================================================================
 # EXTRACTION ENGINE
 # =============================================================================
@@ -33,12 +51,13 @@ def extract_profile_from_interview(transcript: str) -> Dict[str, Any]:
     """
     Extracts structured profile data from unstructured text.
     Reliability: Tries AI first, then Regex, then Defaults. Never crashes.
+    Blocking: request handlers go through services.extraction_pool instead.
     """
     if not transcript or len(transcript) < 10:
         return _get_default_profile()
 
     # 1. Try AI Extraction
-    if ENABLE_GEMINI:
+    if llm_enabled():
         try:
             return _extract_with_gemini(transcript)
         except Exception as e:
@@ -53,9 +72,17 @@ def extract_profile_from_interview(transcript: str) -> Dict[str, Any]:
 # STRATEGIES
 # =============================================================================
 
+_PROFILE_SCHEMA = """{
+        "roleTitle": "Current or Desired Job Title",
+        "skills": ["List", "of", "hard", "skills"],
+        "experienceYears": number (float),
+        "summary": "Professional summary (max 200 chars)",
+        "location": "City or Country inferred"
+    }"""
+
 def _extract_with_gemini(transcript: str) -> Dict[str, Any]:
     """AI-Powered Extraction using Google Gemini Pro."""
-    model = genai.GenerativeModel('gemini-pro')
+    model = _get_model()
     
     prompt = f"""
     You are a Hiring Assistant. Analyze this interview transcript and extract a JSON profile.
@@ -63,91 +90,70 @@ def _extract_with_gemini(transcript: str) -> Dict[str, Any]:
     Transcript: "{transcript}"
     
     Output JSON strictly matching this schema:
-    {{
-        "roleTitle": "Current or Desired Job Title",
-        "skills": ["List", "of", "hard", "skills"],
-        "experienceYears": number (float),
-        "summary": "Professional summary (max 200 chars)",
-        "location": "City or Country inferred"
-    }}
+    {_PROFILE_SCHEMA}
     """
     
-    try:
-        # Generate
-        response = model.generate_content(prompt)
-        raw_text = response.text.strip()
-        
-        # Cleanup Markdown Code Blocks (Common LLM artifact)
-        if raw_text.startswith("```"):
-            raw_text = re.sub(r"^```(json)?|```$", "", raw_text, flags=re.MULTILINE).strip()
-            
-        data = json.loads(raw_text)
-        
-        # Validation
-        return {
-            "roleTitle": str(data.get("roleTitle", "Professional")),
-            "skills": list(data.get("skills", [])),
-            "experienceYears": float(data.get("experienceYears", 0)),
-            "summary": str(data.get("summary", "Extracted from interview.")),
-            "location": str(data.get("location", "Remote"))
-        }
-        
-    except json.JSONDecodeError:
-        logger.error("Gemini returned invalid JSON")
+    # Generate
+    response = model.generate_content(prompt)
+    data = _parse_json_reply(response.text)
+    if not isinstance(data, dict):
         raise ValueError("Invalid JSON from AI")
+    return _validate_profile(data)
 
-def _extract_rule_based(transcript: str) -> Dict[str, Any]:
+def _extract_batch_with_gemini(transcripts: List[str]) -> List[Dict[str, Any]]:
     """
-    Deterministic extraction using Regex keywords.
-    Focused on 'Blue Collar' & 'Tech' roles common in your examples.
+    Several transcripts in one request: one round trip and one quota unit instead of N.
+    Transcripts go in as a JSON array so quotes/newlines inside them can't break the framing.
+    Raises unless the reply is an array with exactly one profile per transcript, in order.
     """
-    text = transcript.lower()
-    
-    # 1. Role Detection
-    role_map = {
-        "driver": ["driving", "truck", "vehicle", "license", "hmv", "lmv", "delivery"],
-        "developer": ["software", "code", "python", "java", "react", "programming"],
-        "mechanic": ["repair", "engine", "maintenance", "technician"],
-        "sales": ["selling", "customer", "retail", "marketing"],
-        "nurse": ["patient", "medical", "hospital", "care"]
-    }
-    
-    detected_role = "Candidate"
-    max_matches = 0
-    
-    for role, keywords in role_map.items():
-        matches = sum(1 for k in keywords if k in text)
-        if matches > max_matches:
-            max_matches = matches
-            detected_role = role.title()
-
-    # 2. Experience Detection
-    # Look for "X years", "X yrs"
-    exp_match = re.search(r'(\d+)\+?\s*(?:years?|yrs?)', text)
-    experience = float(exp_match.group(1)) if exp_match else 0.0
-    
-    # 3. Skills Extraction
-    common_skills = [
-        "driving", "maintenance", "repair", "safety", "logistics", # Blue collar
-        "python", "javascript", "react", "sql", "aws", "docker",   # Tech
-        "sales", "communication", "management", "excel"            # General
-    ]
+    model = _get_model()
+
+    prompt = f"""
+    You are a Hiring Assistant. Analyze each interview transcript and extract a JSON profile.
+
+    Transcripts (JSON array): {json.dumps(transcripts)}
+
+    Output a JSON array with exactly {len(transcripts)} objects, in the same order,
+    each strictly matching this schema:
+    {_PROFILE_SCHEMA}
+    """
+
+    response = model.generate_content(prompt)
+    data = _parse_json_reply(response.text)
+    if not isinstance(data, list) or len(data) != len(transcripts):
+        raise ValueError("Batch reply does not match the number of transcripts")
+    return [_validate_profile(item if isinstance(item, dict) else {}) for item in data]
+
+def _parse_json_reply(raw_text: str) -> Any:
+    raw_text = raw_text.strip()
     
-    found_skills = [s.title() for s in common_skills if s in text]
+    # Cleanup Markdown Code Blocks (Common LLM artifact)
+    if raw_text.startswith("```"):
+        raw_text = re.sub(r"^```(json)?|```$", "", raw_text, flags=re.MULTILINE).strip()
     
-    # 4. Summary Generation
-    summary = f"{detected_role} with {experience} years experience."
-    if found_skills:
-        summary += f" Skilled in {', '.join(found_skills[:3])}."
+    try:
+        return json.loads(raw_text)
+    except json.JSONDecodeError:
+        logger.error("Gemini returned invalid JSON")
+        raise ValueError("Invalid JSON from AI")
 
+def _validate_profile(data: Dict[str, Any]) -> Dict[str, Any]:
     return {
-        "roleTitle": detected_role,
-        "skills": found_skills or ["General"],
-        "experienceYears": experience,
-        "summary": summary,
-        "location": "Unknown" # Hard to regex reliable locations without a massive list
+        "roleTitle": str(data.get("roleTitle", "Professional")),
+        "skills": list(data.get("skills", [])),
+        "experienceYears": float(data.get("experienceYears", 0)),
+        "summary": str(data.get("summary", "Extracted from interview.")),
+        "location": str(data.get("location", "Remote"))
     }
 
+def _extract_rule_based(transcript: str) -> Dict[str, Any]:
+    """
+    Deterministic extraction: roles, skills, experience and locations.
+    Focused on 'Blue Collar' & 'Tech' roles common in your examples.
+    Single pass over the transcript; see services/rule_extractor.py.
+    """
+    return rule_extractor.extract(transcript)
+
 def _get_default_profile() -> Dict[str, Any]:
     """Fail-safe return value."""
     return {
@@ -0,0 +1,278 @@
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.logging import increment_metric, log_event
+from app.db.mongo import get_db
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("BlobStore")
+
+COLLECTION = "blobs"
+HASH_CHUNK = 1024 * 1024
+
+STATE_LIVE = "live"
+STATE_DELETING = "deleting"  # GC owns it: new references wait until the doc is gone
+
+
+class BlobTooLarge(Exception):
+    pass
+
+# =============================================================================
+# BACKENDS (Pluggable)
+# =============================================================================
+
+class BlobBackend(ABC):
+    """
+    Where blob bytes live. Keys are sha256 hex digests, so a put of an existing
+    key is a no-op by construction. An object-store adapter implements the same
+    four calls; local_path returns None for it and readers fetch via the adapter.
+    """
+    name: str
+
+    @abstractmethod
+    async def put(self, digest: str, source_path: str) -> bool:
+        """Take ownership of source_path (moved or uploaded, then removed). False if already stored."""
+
+    @abstractmethod
+    async def exists(self, digest: str) -> bool: ...
+
+    @abstractmethod
+    async def delete(self, digest: str) -> None: ...
+
+    @abstractmethod
+    def local_path(self, digest: str) -> Optional[str]: ...
+
+
+class LocalDiskBackend(BlobBackend):
+    """<root>/ab/cd/<digest>: two fan-out levels keep directories small."""
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    async def put(self, digest: str, source_path: str) -> bool:
+        return await asyncio.to_thread(self._put, digest, source_path)
+
+    def _put(self, digest: str, source_path: str) -> bool:
+        path = self.local_path(digest)
+        if os.path.exists(path):
+            os.remove(source_path)  # Deduplicated: identical bytes already stored
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+        return True
+
+    async def exists(self, digest: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self.local_path(digest))
+
+    async def delete(self, digest: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, self.local_path(digest))
+        except FileNotFoundError:
+            pass
+
+
+BACKENDS = {
+    "local": lambda: LocalDiskBackend(settings.BLOB_ROOT),
+}
+
+# =============================================================================
+# BLOB STORE (Bytes in a Backend, Metadata + Refcounts in Mongo)
+# =============================================================================
+
+class BlobStore:
+    """
+    Content-addressed, deduplicating storage.
+    - Ingest hashes while streaming to a temp file, then stores it under its sha256.
+    - Every ingest/add_ref is one reference; release drops one. Blobs at zero
+      references are deleted by collect_garbage after a grace period.
+    - GC and new references never race: GC flips the doc to "deleting" with a
+      conditional update first, and a reference to a deleting blob waits for the
+      doc to disappear, then recreates it and rewrites the bytes.
+    """
+    def __init__(self, backend: BlobBackend, tmp_dir: str):
+        self.backend = backend
+        self.tmp_dir = tmp_dir
+
+    def local_path(self, digest: str) -> Optional[str]:
+        return self.backend.local_path(digest)
+
+    def tmp_path(self) -> str:
+        """Scratch path on the blob volume, so ingest_file can adopt it with a rename."""
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        return os.path.join(self.tmp_dir, uuid.uuid4().hex)
+
+    async def ingest(self, chunks: AsyncIterator[bytes], max_bytes: int, content_type: str) -> Dict[str, Any]:
+        """Stream -> temp file (hashing on the way) -> blob. Returns the blob doc; holds one reference."""
+        tmp_path = self.tmp_path()
+        hasher = hashlib.sha256()
+        size = 0
+        fd = await asyncio.to_thread(os.open, tmp_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o640)
+        try:
+            try:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise BlobTooLarge()
+                    await asyncio.to_thread(_hash_and_write, hasher, fd, chunk)
+            finally:
+                await asyncio.to_thread(os.close, fd)
+            return await self._commit(tmp_path, hasher.hexdigest(), size, content_type)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+
+    async def ingest_file(self, path: str, content_type: str) -> Dict[str, Any]:
+        """Adopt a complete local file (e.g. a finished resumable upload). Holds one reference."""
+        digest, size = await asyncio.to_thread(_hash_file, path)
+        return await self._commit(path, digest, size, content_type)
+
+    async def _commit(self, source_path: str, digest: str, size: int, content_type: str) -> Dict[str, Any]:
+        blob = await self._reference(digest, size, content_type)
+        if await self.backend.put(digest, source_path):
+            increment_metric("blobs.stored")
+        else:
+            increment_metric("blobs.deduplicated")
+            increment_metric("blobs.deduplicated_bytes", size)
+        return blob
+
+    async def _reference(self, digest: str, size: int, content_type: str) -> Dict[str, Any]:
+        collection = get_db()[COLLECTION]
+        for _ in range(50):
+            now = datetime.utcnow()
+            try:
+                blob = await collection.find_one_and_update(
+                    {"_id": digest, "state": {"$ne": STATE_DELETING}},
+                    {
+                        "$inc": {"refcount": 1},
+                        "$set": {"last_ref_at": now},
+                        "$unset": {"zero_since": ""},
+                        "$setOnInsert": {
+                            "size": size,
+                            "content_type": content_type,
+                            "backend": self.backend.name,
+                            "state": STATE_LIVE,
+                            "created_at": now,
+                        },
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                return blob
+            except DuplicateKeyError:
+                # GC is deleting this digest right now; it finishes in milliseconds
+                await asyncio.sleep(0.02)
+        raise RuntimeError(f"Blob {digest} stuck in deletion")
+
+    async def add_ref(self, digest: str) -> None:
+        result = await get_db()[COLLECTION].update_one(
+            {"_id": digest, "state": STATE_LIVE},
+            {"$inc": {"refcount": 1}, "$set": {"last_ref_at": datetime.utcnow()}, "$unset": {"zero_since": ""}}
+        )
+        if result.matched_count == 0:
+            raise RuntimeError(f"Blob {digest} is not available")
+
+    async def release(self, digest: Optional[str]) -> None:
+        if not digest:
+            return
+        collection = get_db()[COLLECTION]
+        blob = await collection.find_one_and_update(
+            {"_id": digest, "refcount": {"$gt": 0}},
+            {"$inc": {"refcount": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if blob and blob["refcount"] <= 0:
+            await collection.update_one(
+                {"_id": digest, "refcount": {"$lte": 0}},
+                {"$set": {"zero_since": datetime.utcnow()}}
+            )
+
+    async def collect_garbage(self, grace_seconds: float, limit: int = 500) -> int:
+        """Delete blobs nobody has referenced for grace_seconds. Returns the number removed."""
+        collection = get_db()[COLLECTION]
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        candidates = await collection.find(
+            {"refcount": {"$lte": 0}, "zero_since": {"$lt": cutoff}, "state": STATE_LIVE},
+            {"_id": 1, "size": 1}
+        ).to_list(limit)
+
+        removed = 0
+        freed = 0
+        for candidate in candidates:
+            digest = candidate["_id"]
+            # Claim it only if it is still unreferenced
+            claimed = await collection.update_one(
+                {"_id": digest, "refcount": {"$lte": 0}, "state": STATE_LIVE},
+                {"$set": {"state": STATE_DELETING}}
+            )
+            if claimed.modified_count == 0:
+                continue
+            await self.backend.delete(digest)
+            await collection.delete_one({"_id": digest, "state": STATE_DELETING})
+            removed += 1
+            freed += candidate.get("size", 0)
+
+        removed_tmp = await asyncio.to_thread(self._sweep_tmp, grace_seconds)
+        if removed or removed_tmp:
+            log_event("blob_gc", removed=removed, freed_bytes=freed, stale_tmp_removed=removed_tmp)
+        return removed
+
+    def _sweep_tmp(self, grace_seconds: float) -> int:
+        """Temp files left by crashed ingests."""
+        if not os.path.isdir(self.tmp_dir):
+            return 0
+        cutoff = time.time() - max(grace_seconds, 3600)
+        removed = 0
+        for entry in os.scandir(self.tmp_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                _remove_quietly(entry.path)
+                removed += 1
+        return removed
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _hash_and_write(hasher, fd: int, chunk: bytes) -> None:
+    hasher.update(chunk)  # hashlib drops the GIL for large buffers
+    view = memoryview(chunk)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _hash_file(path: str):
+    hasher = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            hasher.update(chunk)
+            size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+# =============================================================================
+# EXPORTED INSTANCE
+# =============================================================================
+blob_store = BlobStore(BACKENDS[settings.BLOB_BACKEND](), tmp_dir=os.path.join(settings.BLOB_ROOT, "tmp"))
@@ -0,0 +1,268 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.auth_cache import MISSING, chat_access_cache
+from app.core.logging import increment_metric, record_latency
+from app.db.mongo import get_db
+from app.services.rate_limiter import check_chat_message_limit
+from app.services.presence import presence_store, safe_call, other_participants
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("ChatService")
+
+MAX_MESSAGE_LENGTH = 2000
+LAST_MESSAGE_PREVIEW = 50
+
+# =============================================================================
+# ACCESS CONTROL (Cached)
+# =============================================================================
+
+async def load_chat_for_participant(chat_oid: ObjectId, user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the chat's participants if user_id is the seeker OR the employer.
+    Grants and denials are cached per (user, chat); participants never change.
+    """
+    key = (user_id, str(chat_oid))
+    cached = chat_access_cache.get(key)
+    if cached is not MISSING:
+        return cached or None
+
+    chat = await get_db()["chats"].find_one(
+        {"_id": chat_oid, "$or": [{"user_id": user_id}, {"employer_id": user_id}]},
+        {"user_id": 1, "employer_id": 1}
+    )
+    chat_access_cache.set(key, chat or False)
+    return chat
+
+# =============================================================================
+# MESSAGE CONSTRUCTION (Shared by REST + WebSocket)
+# =============================================================================
+
+def resolve_sender_role(chat: Dict[str, Any], user_id: str, claimed_role: Optional[str]) -> str:
+    """
+    Derive the sender role from the chat relationship, never from the client.
+    Only a self-chat (demo mode) falls back to the claimed role.
+    """
+    is_employer = (chat.get("employer_id") == user_id)
+    is_seeker = (chat.get("user_id") == user_id)
+
+    if is_employer and is_seeker:
+        return claimed_role if claimed_role in ["employer", "employee"] else "employer"
+    if is_employer:
+        return "employer"
+    if is_seeker:
+        return "employee"
+    raise HTTPException(403, "Access Denied")
+
+
+def validate_text(text: Any) -> str:
+    if not isinstance(text, str) or not text.strip():
+        raise HTTPException(422, "Message text is required")
+    if len(text) > MAX_MESSAGE_LENGTH:
+        raise HTTPException(422, f"Message exceeds {MAX_MESSAGE_LENGTH} characters")
+    return text
+
+
+def build_message(user_id: str, role: str, text: str) -> Dict[str, Any]:
+    return {
+        "id": str(ObjectId()),
+        "sender_id": user_id,
+        "role": role,
+        "text": text,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+def to_socket_event(message: Dict[str, Any], client_msg_id: Optional[str] = None) -> Dict[str, Any]:
+    """Wire format for fan-out. 'sender' is kept for older clients."""
+    event = {"type": "message", "sender": message["role"], **message}
+    if client_msg_id:
+        event["client_msg_id"] = client_msg_id
+    return event
+
+# =============================================================================
+# WRITE-BEHIND GROUP COMMIT
+# =============================================================================
+
+class ChatMessageWriter:
+    """
+    Collects messages for a few milliseconds and commits them in one bulk_write,
+    one $push/$each per chat. Every submit gets a future that resolves on commit,
+    so callers choose between waiting (REST) and write-behind (WebSocket).
+    """
+    def __init__(self, batch_size: int, flush_interval_ms: int):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info("💬 Chat write-behind writer started")
+
+    async def stop(self) -> None:
+        """Drain everything still queued, then stop."""
+        if not self._task:
+            return
+        await self._queue.put(None)  # Sentinel
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("🛑 Chat writer stopped")
+
+    def submit(self, chat_oid: ObjectId, message: Dict[str, Any]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self.running:
+            # Scripts / startup: no background writer, commit directly
+            asyncio.create_task(self._commit([(chat_oid, message, future)]))
+            return future
+        self._queue.put_nowait((chat_oid, message, future))
+        return future
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                try:
+                    if timeout <= 0:
+                        item = self._queue.get_nowait()
+                    else:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._commit(batch)
+            if stopping:
+                return
+
+    async def _commit(self, batch: List[Tuple[ObjectId, Dict[str, Any], asyncio.Future]]) -> None:
+        # Group per chat, preserving arrival order
+        grouped: Dict[ObjectId, List[Dict[str, Any]]] = {}
+        for chat_oid, message, _ in batch:
+            grouped.setdefault(chat_oid, []).append(message)
+
+        ops = []
+        for chat_oid, messages in grouped.items():
+            last_text = messages[-1]["text"]
+            ops.append(UpdateOne(
+                {"_id": chat_oid},
+                {
+                    "$push": {"messages": {"$each": messages}},
+                    "$set": {
+                        "updated_at": messages[-1]["timestamp"],
+                        "last_message": (
+                            last_text[:LAST_MESSAGE_PREVIEW] + "..."
+                            if len(last_text) > LAST_MESSAGE_PREVIEW
+                            else last_text
+                        )
+                    }
+                }
+            ))
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            await get_db()["chats"].bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.error(f"Chat group commit failed ({len(batch)} msgs): {e}")
+            increment_metric("chat.commit.fail")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        record_latency("chat.commit_time", (loop.time() - start) * 1000)
+        increment_metric("chat.messages.persisted", len(batch))
+        for _, message, future in batch:
+            if not future.done():
+                future.set_result(message)
+
+
+chat_writer = ChatMessageWriter(
+    batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+    flush_interval_ms=settings.CHAT_WRITE_FLUSH_MS
+)
+
+# =============================================================================
+# PIPELINE: validate -> rate limit -> write -> fan out
+# =============================================================================
+
+def publish(chat_id: str, message: Dict[str, Any], client_msg_id: Optional[str] = None) -> None:
+    """Fan a committed message out to everyone connected to the chat room."""
+    from app.websocket.server import manager  # Local import: server depends on this module
+
+    manager.publish(chat_id, to_socket_event(message, client_msg_id))
+
+
+async def _count_unread(chat: Dict[str, Any], sender_id: str) -> None:
+    for recipient in other_participants(chat, sender_id):
+        await safe_call(presence_store.incr_unread(recipient, str(chat["_id"])))
+
+
+def deliver(chat: Dict[str, Any], message: Dict[str, Any], client_msg_id: Optional[str] = None) -> None:
+    """Post-commit side effects: fan out + bump the recipient's unread counter."""
+    publish(str(chat["_id"]), message, client_msg_id)
+    asyncio.create_task(_count_unread(chat, message["sender_id"]))
+
+
+async def submit_message(
+    chat: Dict[str, Any],
+    user_id: str,
+    text: Any,
+    claimed_role: Optional[str] = None
+) -> Tuple[Dict[str, Any], asyncio.Future]:
+    """
+    Single entry point for new chat messages.
+    Returns the message and a future that resolves once it is durable.
+    """
+    text = validate_text(text)
+    chat_id = str(chat["_id"])
+    role = resolve_sender_role(chat, user_id, claimed_role)
+
+    await check_chat_message_limit(chat_id, user_id)
+
+    message = build_message(user_id, role, text)
+    return message, chat_writer.submit(chat["_id"], message)
+
+
+async def send_and_publish(
+    chat: Dict[str, Any],
+    user_id: str,
+    text: Any,
+    claimed_role: Optional[str] = None
+) -> Dict[str, Any]:
+    """REST path: wait for the group commit, then fan out."""
+    message, committed = await submit_message(chat, user_id, text, claimed_role)
+    await committed
+    deliver(chat, message)
+    return message
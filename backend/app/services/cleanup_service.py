@@ -3,7 +3,12 @@ import asyncio
 from datetime import datetime, timedelta, timezone
 
 from app.db.mongo import get_db
+from app.core.config import settings
 from app.core.logging import log_event, increment_metric
+from app.services.extraction_cache import trim_extraction_cache
+from app.services.uploads import purge_expired_sessions
+from app.services.video_queue import purge_failed_jobs
+from app.services.blob_store import blob_store
 
 logger = logging.getLogger("CleanupService")
 
@@ -87,6 +92,65 @@ async def cleanup_revoked_refresh_tokens():
     except Exception as e:
         logger.error(f"Revoked token cleanup failed: {e}")
 
+async def cleanup_extraction_cache():
+    """
+    Enforce the extraction cache size cap (the TTL index only bounds age).
+    Least recently used entries go first.
+    """
+    try:
+        deleted = await trim_extraction_cache(settings.EXTRACTION_CACHE_MAX_DOCS)
+        
+        if deleted > 0:
+            increment_metric("cleanup.extraction_cache.deleted")
+            log_event(
+                "cleanup_extraction_cache",
+                deleted_count=deleted
+            )
+            logger.info(f"🧹 Trimmed {deleted} extraction cache entries")
+            
+    except Exception as e:
+        logger.error(f"Extraction cache cleanup failed: {e}")
+
+async def cleanup_expired_uploads():
+    """
+    Remove resumable uploads nobody finished. Their partial files are
+    preallocated to full length, so abandoned ones hold real disk space.
+    """
+    try:
+        deleted = await purge_expired_sessions()
+        
+        if deleted > 0:
+            increment_metric("cleanup.uploads.deleted")
+            log_event(
+                "cleanup_expired_uploads",
+                deleted_count=deleted
+            )
+            logger.info(f"🧹 Purged {deleted} abandoned uploads")
+            
+    except Exception as e:
+        logger.error(f"Upload cleanup failed: {e}")
+
+async def cleanup_video_blobs():
+    """
+    Drop failed video jobs past retention, then garbage-collect blobs nothing
+    references any more (after BLOB_GC_GRACE_SECONDS at zero references).
+    """
+    try:
+        purged_jobs = await purge_failed_jobs(settings.VIDEO_FAILED_RETENTION_DAYS)
+        deleted = await blob_store.collect_garbage(settings.BLOB_GC_GRACE_SECONDS)
+        
+        if purged_jobs or deleted:
+            increment_metric("cleanup.blobs.deleted")
+            log_event(
+                "cleanup_video_blobs",
+                purged_jobs=purged_jobs,
+                deleted_count=deleted
+            )
+            logger.info(f"🧹 Purged {purged_jobs} failed video jobs, collected {deleted} blobs")
+            
+    except Exception as e:
+        logger.error(f"Blob cleanup failed: {e}")
+
 # =============================================================================
 # BACKGROUND TASK RUNNER
 # =============================================================================
@@ -108,6 +172,9 @@ async def _run_cleanup_loop():
             await cleanup_expired_refresh_tokens()
             await cleanup_stale_match_cache()
             await cleanup_revoked_refresh_tokens()
+            await cleanup_extraction_cache()
+            await cleanup_expired_uploads()
+            await cleanup_video_blobs()  # After uploads: expired sessions release references first
             
             log_event("cleanup_cycle_complete")
             logger.info("✅ Cleanup cycle complete")
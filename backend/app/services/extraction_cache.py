@@ -0,0 +1,193 @@
+import re
+import copy
+import json
+import asyncio
+import hashlib
+import logging
+import unicodedata
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.auth_cache import MISSING, TTLCache
+from app.core.logging import increment_metric
+from app.core.redis_client import get_redis
+from app.db.mongo import get_db
+from app.services.ai_extraction import EXTRACTOR_VERSION
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("ExtractionCache")
+
+REDIS_KEY = "extract:{}"
+COLLECTION = "extraction_cache"
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class _LeaderCancelled(Exception):
+    """Set on a coalesced future whose extracting request went away; a waiter takes over."""
+
+# =============================================================================
+# KEYING (Normalized Transcript + Extractor Version)
+# =============================================================================
+
+def normalize_transcript(transcript: str) -> str:
+    """
+    Case, punctuation and whitespace never change what the extractors see as
+    signal, so 'I drive trucks.' and 'i  drive trucks' share one entry.
+    """
+    text = unicodedata.normalize("NFKC", transcript).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def cache_key(transcript: str, engine: str) -> str:
+    """engine ("llm" | "rules") is part of the key: a rules answer never masks a future LLM answer."""
+    material = f"{EXTRACTOR_VERSION}\0{engine}\0{normalize_transcript(transcript)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+# =============================================================================
+# THREE-TIER CACHE (Local LRU -> Redis -> Mongo)
+# =============================================================================
+
+class ExtractionCache:
+    """
+    Local LRU absorbs double-submits on one worker, Redis shares results across
+    workers, Mongo keeps them past Redis eviction (TTL index + size cap trimmed
+    by the cleanup service). Concurrent misses for one key share a single extraction.
+    """
+    def __init__(self):
+        self._local = TTLCache(settings.EXTRACTION_CACHE_LOCAL_ENTRIES, settings.EXTRACTION_CACHE_LOCAL_TTL_SECONDS)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def get_or_extract(
+        self,
+        transcript: str,
+        engine: str,
+        extract: Callable[[], Awaitable[Tuple[Dict[str, Any], bool]]]
+    ) -> Dict[str, Any]:
+        """
+        extract() returns (profile, cacheable). Results are deep-copied on the
+        way out: callers enrich the dict they get back.
+        """
+        key = cache_key(transcript, engine)
+
+        profile = await self._lookup(key)
+        if profile is not None:
+            return copy.deepcopy(profile)
+
+        # The leader pops its future before waiters wake, so after a cancelled
+        # leader the first waiter to run finds none and extracts; the rest wait on it
+        while key in self._pending:
+            increment_metric("extraction.cache.coalesced")
+            try:
+                return copy.deepcopy(await asyncio.shield(self._pending[key]))
+            except _LeaderCancelled:
+                increment_metric("extraction.cache.leader_cancelled")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            profile, cacheable = await extract()
+            if cacheable:
+                await self._store(key, engine, profile)
+            future.set_result(profile)
+        except asyncio.CancelledError:
+            # Never cancel the shared future: that would cancel every waiter with it
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved: waiters may not exist
+            raise
+        finally:
+            self._pending.pop(key, None)
+        return copy.deepcopy(profile)
+
+    async def get(self, transcript: str, engine: str) -> Optional[Dict[str, Any]]:
+        profile = await self._lookup(cache_key(transcript, engine))
+        return copy.deepcopy(profile) if profile is not None else None
+
+    async def put(self, transcript: str, engine: str, profile: Dict[str, Any]) -> None:
+        await self._store(cache_key(transcript, engine), engine, profile)
+
+    async def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        profile = self._local.get(key)
+        if profile is not MISSING:
+            increment_metric("extraction.cache.hit.local")
+            return profile
+
+        try:
+            raw = await get_redis().get(REDIS_KEY.format(key))
+            if raw:
+                profile = json.loads(raw)
+                self._local.set(key, profile)
+                increment_metric("extraction.cache.hit.redis")
+                return profile
+        except Exception as e:
+            logger.warning(f"Extraction cache Redis read failed: {e}")
+
+        try:
+            doc = await get_db()[COLLECTION].find_one_and_update(
+                {"_id": key},
+                {"$set": {"last_used_at": datetime.utcnow()}},  # Keeps it clear of TTL + trimming
+                projection={"profile": 1}
+            )
+        except Exception as e:
+            logger.warning(f"Extraction cache Mongo read failed: {e}")
+            doc = None
+        if doc:
+            profile = doc["profile"]
+            self._local.set(key, profile)
+            await self._redis_set(key, profile)
+            increment_metric("extraction.cache.hit.mongo")
+            return profile
+
+        increment_metric("extraction.cache.miss")
+        return None
+
+    async def _store(self, key: str, engine: str, profile: Dict[str, Any]) -> None:
+        profile = copy.deepcopy(profile)
+        self._local.set(key, profile)
+        await self._redis_set(key, profile)
+        now = datetime.utcnow()
+        try:
+            await get_db()[COLLECTION].update_one(
+                {"_id": key},
+                {
+                    "$set": {"profile": profile, "last_used_at": now},
+                    "$setOnInsert": {"engine": engine, "version": EXTRACTOR_VERSION, "created_at": now}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Extraction cache Mongo write failed: {e}")
+
+    async def _redis_set(self, key: str, profile: Dict[str, Any]) -> None:
+        try:
+            await get_redis().set(REDIS_KEY.format(key), json.dumps(profile),
+                                  ex=settings.EXTRACTION_CACHE_REDIS_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Extraction cache Redis write failed: {e}")
+
+# =============================================================================
+# MAINTENANCE (Called by cleanup_service)
+# =============================================================================
+
+async def trim_extraction_cache(max_docs: int) -> int:
+    """Keep the max_docs most recently used entries; the TTL index handles age."""
+    collection = get_db()[COLLECTION]
+    boundary = await collection.find({}, {"last_used_at": 1}).sort("last_used_at", -1).skip(max_docs).limit(1).to_list(1)
+    if not boundary:
+        return 0
+    result = await collection.delete_many({"last_used_at": {"$lte": boundary[0]["last_used_at"]}})
+    return result.deleted_count
+
+# =============================================================================
+# EXPORTED INSTANCE
+# =============================================================================
+extraction_cache = ExtractionCache()
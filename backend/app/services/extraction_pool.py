@@ -0,0 +1,332 @@
+import json
+import time
+import uuid
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logging import increment_metric, record_latency
+from app.core.redis_client import get_redis
+from app.services.ai_extraction import (
+    llm_enabled, _extract_with_gemini, _extract_batch_with_gemini, _extract_rule_based,
+    _get_default_profile
+)
+from app.services.extraction_cache import ExtractionCache, extraction_cache
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("ExtractionPool")
+
+JOB_KEY = "extraction_job:{}"
+
+# =============================================================================
+# CIRCUIT BREAKER
+# =============================================================================
+
+class CircuitBreaker:
+    """
+    closed -> open after N consecutive failures (errors or timeouts).
+    open -> half-open after the cooldown: exactly one trial call goes through.
+    half-open -> closed on success, back to open on failure.
+    Loop-only state: no locking.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("🟢 Extraction breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """The call ended without a verdict (cancelled, never submitted): let the next caller try."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"🔴 Extraction breaker open ({self.failures} failures)")
+                increment_metric("extraction.breaker.opened")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+# =============================================================================
+# WORKER POOL
+# =============================================================================
+
+class ExtractionPool:
+    """
+    Runs the blocking LLM SDK on a bounded thread pool so the event loop never waits on it.
+    - Per-call timeout: the caller gets the rule-based result; the thread finishes in the background.
+    - Admission: when every worker is busy and the backlog is full, skip the LLM outright.
+    - Breaker: after repeated failures/timeouts, go straight to rule-based until the cooldown ends.
+    - Cache (optional): identical transcripts are answered from ExtractionCache.
+    """
+    def __init__(self, workers: int, max_pending: int, timeout_seconds: float, breaker: CircuitBreaker,
+                 cache: Optional[ExtractionCache] = None):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, max_pending)
+        self.timeout = timeout_seconds
+        self.breaker = breaker
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0  # Submitted and not yet finished (includes timed-out calls)
+        self._slot_freed: Optional[asyncio.Event] = None  # Created on the running loop
+        self._jobs: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extraction")
+            logger.info(f"🧠 Extraction pool started ({self.workers} workers)")
+
+    async def stop(self) -> None:
+        for task in list(self._jobs):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("🛑 Extraction pool stopped")
+
+    async def run_llm(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking LLM call through admission, breaker and timeout.
+        Raises on rejection/failure so callers pick their own fallback.
+        """
+        if self._in_flight >= self.capacity:
+            increment_metric("extraction.llm.rejected")
+            raise RuntimeError("Extraction pool saturated")
+        if not self.breaker.allow():
+            increment_metric("extraction.llm.short_circuited")
+            raise RuntimeError("Extraction breaker open")
+
+        loop = asyncio.get_running_loop()
+        try:
+            self.start()  # Lazy for scripts that never ran the lifespan
+            future = loop.run_in_executor(self._executor, fn, *args)
+        except BaseException:
+            self.breaker.release_trial()
+            raise
+        self._in_flight += 1
+        future.add_done_callback(self._release)
+
+        start = loop.time()
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.CancelledError:
+            # The caller went away (client disconnect): no verdict on the LLM, but a
+            # half-open breaker must not keep waiting on this trial forever.
+            # The shielded call finishes in the background and _release still runs.
+            self.breaker.release_trial()
+            raise
+        except asyncio.TimeoutError:
+            increment_metric("extraction.llm.timeout")
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            increment_metric("extraction.llm.fail")
+            self.breaker.record_failure()
+            raise
+        record_latency("extraction.llm", (loop.time() - start) * 1000)
+        self.breaker.record_success()
+        return result
+
+    async def extract(self, transcript: str) -> Dict[str, Any]:
+        """Async counterpart of extract_profile_from_interview. Never raises."""
+        if not transcript or len(transcript) < 10:
+            return _get_default_profile()
+
+        engine = "llm" if llm_enabled() else "rules"
+        if self.cache is None:
+            profile, _ = await self._extract_uncached(transcript, engine)
+            return profile
+        return await self.cache.get_or_extract(
+            transcript, engine, lambda: self._extract_uncached(transcript, engine)
+        )
+
+    async def _extract_uncached(self, transcript: str, engine: str) -> Tuple[Dict[str, Any], bool]:
+        """Returns (profile, cacheable). A rules fallback is not cached under the LLM key."""
+        if engine == "llm":
+            try:
+                return await self.run_llm(_extract_with_gemini, transcript), True
+            except Exception as e:
+                logger.info(f"LLM extraction skipped ({type(e).__name__}: {e}); using rules")
+
+        increment_metric("extraction.rule_based")
+        return _extract_rule_based(transcript), engine == "rules"
+
+    async def extract_many(
+        self,
+        transcripts: List[str],
+        batch_size: int
+    ) -> AsyncIterator[List[Tuple[int, Dict[str, Any], str]]]:
+        """
+        Bulk extraction. Yields groups of (index, profile, engine) as they finish:
+        cache hits first, then one group per LLM batch (or per rules fallback).
+        engine is "cache" | "llm" | "rules".
+        """
+        engine = "llm" if llm_enabled() else "rules"
+        misses: List[int] = []
+        ready: List[Tuple[int, Dict[str, Any], str]] = []
+
+        for i, transcript in enumerate(transcripts):
+            if not transcript or len(transcript) < 10:
+                ready.append((i, _get_default_profile(), "rules"))
+                continue
+            cached = await self.cache.get(transcript, engine) if self.cache else None
+            if cached is not None:
+                ready.append((i, cached, "cache"))
+            else:
+                misses.append(i)
+        if ready:
+            yield ready
+
+        if engine == "rules":
+            for start in range(0, len(misses), batch_size):
+                group = [(i, _extract_rule_based(transcripts[i]), "rules") for i in misses[start:start + batch_size]]
+                await self._remember(transcripts, group, engine)
+                yield group
+                await asyncio.sleep(0)  # Let other requests run between chunks
+            return
+
+        # At most `workers` chunks in flight: a big batch queues behind itself instead of
+        # filling the backlog that single /process-interview calls rely on
+        slots = asyncio.Semaphore(self.workers)
+
+        async def run_chunk(chunk: List[int]) -> List[Tuple[int, Dict[str, Any], str]]:
+            async with slots:
+                return await self._llm_chunk(transcripts, chunk)
+
+        chunks = [misses[start:start + max(1, batch_size)] for start in range(0, len(misses), max(1, batch_size))]
+        for finished in asyncio.as_completed([run_chunk(chunk) for chunk in chunks]):
+            group = await finished
+            await self._remember(transcripts, group, engine)
+            yield group
+
+    async def _llm_chunk(self, transcripts: List[str], chunk: List[int]) -> List[Tuple[int, Dict[str, Any], str]]:
+        """One batched prompt for the chunk; rules for the whole chunk if it fails."""
+        texts = [transcripts[i] for i in chunk]
+        try:
+            await self._wait_for_slot()
+            if len(texts) == 1:
+                profiles = [await self.run_llm(_extract_with_gemini, texts[0])]
+            else:
+                profiles = await self.run_llm(_extract_batch_with_gemini, texts)
+            increment_metric("extraction.llm.batched", len(texts))
+            return [(i, p, "llm") for i, p in zip(chunk, profiles)]
+        except Exception as e:
+            logger.info(f"Batch LLM extraction skipped ({type(e).__name__}: {e}); using rules")
+            increment_metric("extraction.rule_based", len(texts))
+            return [(i, _extract_rule_based(t), "rules") for i, t in zip(chunk, texts)]
+
+    async def _remember(self, transcripts: List[str], group, engine: str) -> None:
+        """Cache what the intended engine produced (never a rules fallback under the LLM key)."""
+        if self.cache is None:
+            return
+        for i, profile, produced_by in group:
+            if produced_by == engine:
+                await self.cache.put(transcripts[i], engine, profile)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "capacity": self.capacity,
+            "breaker": self.breaker.state,
+            "jobs": len(self._jobs),
+        }
+
+    def _release(self, _future) -> None:
+        self._in_flight -= 1
+        if self._slot_freed is not None:
+            self._slot_freed.set()
+
+    async def _wait_for_slot(self) -> None:
+        """
+        Batch work waits for admission instead of being rejected as saturated.
+        run_llm admits synchronously (no await before the in-flight count moves),
+        so a slot seen free here is still free when it is called.
+        """
+        while self._in_flight >= self.capacity:
+            if self._slot_freed is None:
+                self._slot_freed = asyncio.Event()
+            self._slot_freed.clear()
+            increment_metric("extraction.llm.batch_waited")
+            await self._slot_freed.wait()
+
+    # --- Async Jobs (Long Transcripts) ---
+
+    async def submit_job(self, transcript: str, user_id: str, on_done: Callable[[Dict[str, Any]], Any] = None) -> str:
+        """
+        Returns a job id immediately; the result lands in Redis (any worker can serve the poll).
+        on_done(profile) may enrich the result before it is stored.
+        """
+        job_id = uuid.uuid4().hex
+        await _save_job(job_id, {"status": "pending", "user_id": user_id})
+        task = asyncio.create_task(self._run_job(job_id, transcript, user_id, on_done))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+        return job_id
+
+    async def _run_job(self, job_id: str, transcript: str, user_id: str, on_done) -> None:
+        try:
+            profile = await self.extract(transcript)
+            if on_done:
+                profile = on_done(profile)
+            await _save_job(job_id, {"status": "done", "user_id": user_id, "result": profile})
+        except Exception as e:
+            logger.error(f"Extraction job {job_id} failed: {e}")
+            await _save_job(job_id, {"status": "failed", "user_id": user_id, "error": str(e)})
+
+# =============================================================================
+# JOB STORE (Redis, TTL-bounded)
+# =============================================================================
+
+async def _save_job(job_id: str, job: Dict[str, Any]) -> None:
+    await get_redis().set(JOB_KEY.format(job_id), json.dumps(job, default=str),
+                          ex=settings.EXTRACTION_JOB_TTL_SECONDS)
+
+
+async def get_job(job_id: str, user_id: str) -> Dict[str, Any]:
+    raw = await get_redis().get(JOB_KEY.format(job_id))
+    if not raw:
+        raise HTTPException(status_code=404, detail="Extraction job not found or expired")
+    job = json.loads(raw)
+    if job.pop("user_id", None) != user_id:
+        raise HTTPException(status_code=404, detail="Extraction job not found or expired")
+    return {"job_id": job_id, **job}
+
+# =============================================================================
+# EXPORTED INSTANCE
+# =============================================================================
+extraction_pool = ExtractionPool(
+    workers=settings.EXTRACTION_WORKERS,
+    max_pending=settings.EXTRACTION_MAX_PENDING,
+    timeout_seconds=settings.EXTRACTION_TIMEOUT_SECONDS,
+    breaker=CircuitBreaker(settings.EXTRACTION_BREAKER_FAILURES, settings.EXTRACTION_BREAKER_COOLDOWN_SECONDS),
+    cache=extraction_cache
+)
@@ -0,0 +1,44 @@
+import json
+import time
+import random
+import logging
+
+from app.core.config import settings
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("FakeGemini")
+
+# =============================================================================
+# LOCAL GEMINI STUB (EXTRACTION_LLM="fake")
+# =============================================================================
+# Stands in for google.generativeai.GenerativeModel in load tests and verify
+# scripts: same blocking generate_content() call, configurable latency and
+# failure rate, no network and no API quota. Understands both the single and
+# the batched prompt.
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    def __init__(self, latency_ms: float = None, failure_rate: float = None):
+        self.latency_ms = settings.FAKE_LLM_LATENCY_MS if latency_ms is None else latency_ms
+        self.failure_rate = settings.FAKE_LLM_FAILURE_RATE if failure_rate is None else failure_rate
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        time.sleep(self.latency_ms / 1000)  # Blocking on purpose, like the real SDK
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError("Fake Gemini: simulated upstream error")
+
+        from app.services.ai_extraction import _extract_rule_based  # Avoid import cycle
+        if "Transcripts (JSON array): " in prompt:
+            line = prompt.split("Transcripts (JSON array): ", 1)[1].split("\n", 1)[0]
+            data = [_extract_rule_based(t) for t in json.loads(line)]
+        else:
+            transcript = prompt.split('Transcript: "', 1)[-1].rsplit('"', 1)[0]
+            data = _extract_rule_based(transcript)
+        # Wrapped in a code fence, like the real model often does
+        return FakeResponse("```json\n" + json.dumps(data) + "\n```")
@@ -0,0 +1,68 @@
+# =============================================================================
+# OFFLINE LOCATION GAZETTEER (Rule-Based Extraction)
+# =============================================================================
+# alias (lowercase, as spoken/written) -> canonical display name.
+# Covers metros, tier-2/3 cities and the industrial/logistics hubs our blue-collar
+# candidates name most, plus common old names and spellings. Multi-word aliases
+# match across any whitespace and punctuation.
+
+_CANONICAL = [
+    # Metros
+    "Mumbai", "Delhi", "Bangalore", "Hyderabad", "Chennai", "Kolkata", "Pune", "Ahmedabad",
+    # Tier 2
+    "Jaipur", "Lucknow", "Kanpur", "Nagpur", "Indore", "Bhopal", "Patna", "Vadodara",
+    "Surat", "Rajkot", "Ludhiana", "Amritsar", "Chandigarh", "Agra", "Varanasi", "Nashik",
+    "Aurangabad", "Coimbatore", "Madurai", "Kochi", "Thiruvananthapuram", "Visakhapatnam",
+    "Vijayawada", "Guntur", "Warangal", "Mysore", "Mangalore", "Hubli", "Belgaum",
+    "Bhubaneswar", "Cuttack", "Ranchi", "Jamshedpur", "Dhanbad", "Raipur", "Guwahati",
+    "Dehradun", "Meerut", "Ghaziabad", "Noida", "Gurugram", "Faridabad", "Allahabad",
+    "Jodhpur", "Udaipur", "Kota", "Gwalior", "Jabalpur", "Srinagar", "Jammu", "Goa",
+    "Tiruchirappalli", "Salem", "Tirupur", "Nellore", "Kurnool", "Tirupati", "Kakinada",
+    "Rajahmundry", "Karimnagar", "Nizamabad", "Khammam", "Solapur", "Kolhapur", "Thane",
+    "Navi Mumbai", "Howrah", "Durgapur", "Asansol", "Siliguri", "Bareilly", "Aligarh",
+    "Moradabad", "Gorakhpur", "Jalandhar", "Bhilai", "Bikaner", "Ajmer", "Jamnagar",
+    "Bhavnagar", "Anand", "Hosur", "Vellore", "Erode", "Thrissur", "Kozhikode",
+    "Secunderabad", "Pimpri Chinchwad", "Bhiwandi", "Panipat", "Sonipat", "Rohtak",
+    "Haridwar", "Rudrapur", "Vapi", "Ankleshwar", "Sriperumbudur", "Manesar",
+    # Remote work is a "location" candidates state too
+    "Remote",
+]
+
+_ALIASES = {
+    "bengaluru": "Bangalore",
+    "bangaluru": "Bangalore",
+    "bombay": "Mumbai",
+    "new delhi": "Delhi",
+    "ncr": "Delhi",
+    "gurgaon": "Gurugram",
+    "madras": "Chennai",
+    "calcutta": "Kolkata",
+    "poona": "Pune",
+    "baroda": "Vadodara",
+    "cochin": "Kochi",
+    "ernakulam": "Kochi",
+    "trivandrum": "Thiruvananthapuram",
+    "vizag": "Visakhapatnam",
+    "mysuru": "Mysore",
+    "mangaluru": "Mangalore",
+    "hubballi": "Hubli",
+    "belagavi": "Belgaum",
+    "prayagraj": "Allahabad",
+    "trichy": "Tiruchirappalli",
+    "tiruppur": "Tirupur",
+    "calicut": "Kozhikode",
+    "pimpri": "Pimpri Chinchwad",
+    "hyd": "Hyderabad",
+    "blr": "Bangalore",
+    "work from home": "Remote",
+    "wfh": "Remote",
+}
+
+LOCATIONS = {name.lower(): name for name in _CANONICAL}
+LOCATIONS.update(_ALIASES)
+
+# Aliases that are also everyday words or first names ("My name is Anand", "remote
+# area", "erode trust"). These only count right after a location cue: "in Salem",
+# "from Kota", "I live in Anand".
+NEEDS_CUE = {"anand", "salem", "erode", "kota", "remote"}
+LOCATION_CUES = ("in", "at", "from", "near")
@@ -0,0 +1,320 @@
+import os
+import hmac
+import stat
+import time
+import hashlib
+import asyncio
+import logging
+from email.utils import formatdate
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import increment_metric
+from app.db.mongo import get_db
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("MediaService")
+
+READ_CHUNK = 256 * 1024  # Ranged reads: fewer thread hops than Starlette's 64KB, still small per request
+
+MEDIA_URL = "/api/v1/media/videos/{}"
+
+RENDITION_PREVIEW = "preview"
+RENDITION_ORIGINAL = "original"
+
+
+def video_url(video_id: Optional[str]) -> Optional[str]:
+    """Default playback URL: the compact preview when one exists, else the original."""
+    return MEDIA_URL.format(video_id) if video_id else None
+
+
+def video_urls(video_id: Optional[str], viewer_id: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    URL set for API payloads (all None when there is no video).
+    Pass the viewer for URLs the browser loads directly (<video src>, <img src>):
+    they carry a signature instead of needing an Authorization header.
+    """
+    if not video_id:
+        return {"videoUrl": None, "videoOriginalUrl": None, "posterUrl": None}
+    base = MEDIA_URL.format(video_id)
+    signed = sign_media_query(video_id, viewer_id) if viewer_id else ""
+    return {
+        "videoUrl": f"{base}?{signed}" if signed else base,
+        "videoOriginalUrl": f"{base}?rendition={RENDITION_ORIGINAL}" + (f"&{signed}" if signed else ""),
+        "posterUrl": f"{base}/poster" + (f"?{signed}" if signed else ""),
+    }
+
+# =============================================================================
+# SIGNED URLS (Playback Without an Authorization Header)
+# =============================================================================
+# HMAC over (video_id, viewer, expires). A signed URL only says who it was issued
+# to: resolve_video still checks that viewer's access on every request.
+
+_SIGNING_KEY = hashlib.sha256(b"media-url:" + settings.SECRET_KEY.encode()).digest()  # Never the raw JWT key
+
+
+def _media_signature(video_id: str, viewer_id: str, expires: int) -> str:
+    message = f"{video_id}:{viewer_id}:{expires}".encode()
+    return hmac.new(_SIGNING_KEY, message, hashlib.sha256).hexdigest()[:32]
+
+
+def sign_media_query(video_id: str, viewer_id: str) -> str:
+    """
+    'viewer=..&expires=..&sig=..'. Expiry is rounded up to the next TTL boundary, so
+    one URL stays the same for a whole window (between 1 and 2 TTLs of validity)
+    and the browser's media cache keeps hitting.
+    """
+    ttl = max(60, settings.MEDIA_URL_TTL_SECONDS)
+    expires = (int(time.time()) // ttl + 2) * ttl
+    return urlencode({"viewer": viewer_id, "expires": expires, "sig": _media_signature(video_id, viewer_id, expires)})
+
+
+def verify_media_signature(video_id: str, viewer_id: str, expires: int, sig: str) -> bool:
+    if expires < time.time():
+        increment_metric("media.signed_url.expired")
+        return False
+    return hmac.compare_digest(sig, _media_signature(video_id, viewer_id, expires))
+
+# =============================================================================
+# ACCESS CONTROL (Owner, Admin, or an Employer the Candidate Applied To)
+# =============================================================================
+
+async def resolve_video(video_id: str, viewer: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns the video job doc if `viewer` may watch it. Anyone else gets 404,
+    so ids can't be probed for existence.
+    """
+    try:
+        oid = ObjectId(video_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(404, "Video not found")
+
+    db = get_db()
+    video = await db["video_jobs"].find_one({"_id": oid}, {
+        "user_id": 1, "file_path": 1, "content_type": 1, "blob_digest": 1, "preview_state": 1,
+        "artifacts.preview_digest": 1, "artifacts.poster_digest": 1
+    })
+    if not video:
+        raise HTTPException(404, "Video not found")
+
+    owner = video["user_id"]
+    if viewer["id"] == owner or viewer.get("db_role") == "admin":
+        return video
+
+    # Employers see a candidate's video once the candidate has applied to one of their jobs
+    application = await db["applications"].find_one(
+        {"user_id": owner, "employer_id": viewer["id"]}, {"_id": 1}
+    )
+    if not application:
+        increment_metric("media.access_denied")
+        raise HTTPException(404, "Video not found")
+    return video
+
+# =============================================================================
+# PER-USER STREAM LIMIT
+# =============================================================================
+
+class StreamLimiter:
+    """
+    Caps concurrent media streams per viewer in this process, so one employer
+    scrubbing back and forth can't hold every connection a worker has.
+    Loop-only state: no locking.
+    """
+    def __init__(self, max_per_user: int):
+        self.max_per_user = max(1, max_per_user)
+        self._active: Dict[str, int] = {}
+
+    def acquire(self, user_id: str) -> Callable[[], None]:
+        """Returns the release callback; raises 429 when the viewer is at the cap."""
+        active = self._active.get(user_id, 0)
+        if active >= self.max_per_user:
+            increment_metric("media.streams.rejected")
+            raise HTTPException(429, "Too many concurrent video streams", headers={"Retry-After": "1"})
+        self._active[user_id] = active + 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            remaining = self._active.get(user_id, 1) - 1
+            if remaining > 0:
+                self._active[user_id] = remaining
+            else:
+                self._active.pop(user_id, None)
+
+        return release
+
+    def active(self, user_id: str) -> int:
+        return self._active.get(user_id, 0)
+
+
+stream_limiter = StreamLimiter(settings.MEDIA_MAX_STREAMS_PER_USER)
+
+# =============================================================================
+# VALIDATORS & RANGES
+# =============================================================================
+
+def strong_etag(st: os.stat_result) -> str:
+    """
+    Media files are written once and never modified in place (new uploads get new
+    paths), so inode + size + mtime_ns identifies the exact bytes.
+    """
+    tag = hashlib.blake2b(f"{st.st_ino}-{st.st_size}-{st.st_mtime_ns}".encode(), digest_size=12).hexdigest()
+    return f'"{tag}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single byte range -> (start, end inclusive). None means "send the whole file":
+    no header, a unit other than bytes, or a multi-range request (allowed by RFC 9110;
+    players scrub with one range at a time). Raises 416 when unsatisfiable.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    try:
+        if not sep:
+            raise ValueError
+        if first == "":
+            # Suffix: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else max(start, size - 1)
+            if end < start:
+                raise ValueError
+            end = min(end, size - 1)
+    except ValueError:
+        return None  # Malformed: ignore the header
+    if start >= size:
+        raise HTTPException(416, "Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+# =============================================================================
+# RESPONSE
+# =============================================================================
+
+def _pread(fd: int, length: int, offset: int) -> bytes:
+    return os.pread(fd, length, offset)
+
+
+class MediaFileResponse(Response):
+    """
+    Serves [start, end] of a file.
+    - Whole-file responses use the ASGI pathsend extension when the server offers it
+      (the server can then sendfile(2) straight from the page cache).
+    - Otherwise: positional reads on a worker thread, READ_CHUNK at a time, so the
+      event loop never blocks on disk and memory per stream stays flat.
+    on_close runs however the transfer ends (finished, client gone, cancelled).
+    """
+    def __init__(self, path: str, st: os.stat_result, byte_range: Optional[Tuple[int, int]],
+                 headers: Dict[str, str], media_type: str, on_close: Callable[[], None]):
+        self.path = path
+        self.size = st.st_size
+        self.range = byte_range
+        self.on_close = on_close
+        self.background = None
+        self.media_type = media_type
+        self.status_code = 206 if byte_range else 200
+        start, end = byte_range or (0, self.size - 1)
+        self.start, self.length = start, max(0, end - start + 1)
+        headers = {**headers, "content-length": str(self.length)}
+        if byte_range:
+            headers["content-range"] = f"bytes {start}-{end}/{self.size}"
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if scope["method"].upper() == "HEAD":
+                await send({"type": "http.response.body", "body": b""})
+                return
+            if self.range is None and "http.response.pathsend" in scope.get("extensions", {}):
+                increment_metric("media.pathsend")
+                await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+                return
+
+            fd = await asyncio.to_thread(os.open, self.path, os.O_RDONLY)
+            try:
+                offset, remaining = self.start, self.length
+                while remaining > 0:
+                    chunk = await asyncio.to_thread(_pread, fd, min(READ_CHUNK, remaining), offset)
+                    if not chunk:
+                        break  # File shrank underneath us; the client sees a short body
+                    offset += len(chunk)
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b""})
+            finally:
+                os.close(fd)
+            increment_metric("media.bytes_sent", self.length)
+        finally:
+            self.on_close()
+
+
+async def serve_file(
+    path: str,
+    request_headers,
+    viewer_id: str,
+    media_type: str = "video/mp4",
+    digest: Optional[str] = None,
+    immutable: bool = True
+) -> Response:
+    """
+    Conditional + ranged response for a media file. Content-addressed files pass their digest.
+    immutable=False when the URL may later serve other bytes (default rendition before the
+    preview lands): browsers then revalidate every time and get a 304 while it hasn't changed.
+    """
+    try:
+        st = await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(404, "Video not found")
+    if not stat.S_ISREG(st.st_mode):
+        raise HTTPException(404, "Video not found")
+
+    etag = f'"{digest}"' if digest else strong_etag(st)
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(st.st_mtime, usegmt=True),
+        "accept-ranges": "bytes",
+        # Private: access-controlled. Immutable only when the bytes behind the URL can't change.
+        "cache-control": (
+            f"private, max-age={settings.MEDIA_CACHE_MAX_AGE_SECONDS}, immutable" if immutable else "private, no-cache"
+        ),
+        "vary": "Authorization",
+    }
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        increment_metric("media.not_modified")
+        return Response(status_code=304, headers=headers)
+
+    byte_range = parse_range(request_headers.get("range"), st.st_size)
+    if_range = request_headers.get("if-range")
+    if byte_range and if_range and if_range.strip() != etag:
+        byte_range = None  # Client's copy is stale: send the whole (new) file
+
+    release = stream_limiter.acquire(viewer_id)
+    return MediaFileResponse(path, st, byte_range, headers, media_type, on_close=release)
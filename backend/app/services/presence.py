@@ -0,0 +1,137 @@
+import os
+import time
+import logging
+from typing import Dict, Iterable
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("PresenceService")
+
+# Key layout (Redis backend)
+#   presence:{user_id}            -> "1"             TTL PRESENCE_TTL_SECONDS
+#   typing:{chat_id}:{user_id}    -> "1"             TTL TYPING_TTL_SECONDS
+#   read:{chat_id}                -> hash user_id -> "message_id|timestamp"
+#   unread:{user_id}              -> hash chat_id -> count
+
+# =============================================================================
+# STORES
+# =============================================================================
+
+class LocalPresenceStore:
+    """
+    Single-worker store. Same semantics as Redis, expiry checked lazily on read.
+    """
+    def __init__(self):
+        self._expiring: Dict[str, float] = {}
+        self._read: Dict[str, Dict[str, str]] = {}
+        self._unread: Dict[str, Dict[str, int]] = {}
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expiring.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._expiring[key]
+            return False
+        return True
+
+    async def set_online(self, user_id: str) -> None:
+        self._expiring[f"presence:{user_id}"] = time.monotonic() + settings.PRESENCE_TTL_SECONDS
+
+    async def set_offline(self, user_id: str) -> None:
+        self._expiring.pop(f"presence:{user_id}", None)
+
+    async def online_many(self, user_ids: Iterable[str]) -> Dict[str, bool]:
+        return {uid: self._alive(f"presence:{uid}") for uid in user_ids}
+
+    async def set_typing(self, chat_id: str, user_id: str, is_typing: bool) -> None:
+        key = f"typing:{chat_id}:{user_id}"
+        if is_typing:
+            self._expiring[key] = time.monotonic() + settings.TYPING_TTL_SECONDS
+        else:
+            self._expiring.pop(key, None)
+
+    async def mark_read(self, chat_id: str, user_id: str, message_id: str, timestamp: str) -> None:
+        self._read.setdefault(chat_id, {})[user_id] = f"{message_id}|{timestamp}"
+        self._unread.get(user_id, {}).pop(chat_id, None)
+
+    async def incr_unread(self, user_id: str, chat_id: str, amount: int = 1) -> None:
+        counters = self._unread.setdefault(user_id, {})
+        counters[chat_id] = counters.get(chat_id, 0) + amount
+
+    async def get_unread(self, user_id: str) -> Dict[str, int]:
+        return dict(self._unread.get(user_id, {}))
+
+
+class RedisPresenceStore:
+    """
+    Multi-worker store. Every operation is a single round trip.
+    """
+    async def set_online(self, user_id: str) -> None:
+        await get_redis().set(f"presence:{user_id}", "1", ex=settings.PRESENCE_TTL_SECONDS)
+
+    async def set_offline(self, user_id: str) -> None:
+        await get_redis().delete(f"presence:{user_id}")
+
+    async def online_many(self, user_ids: Iterable[str]) -> Dict[str, bool]:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        values = await get_redis().mget([f"presence:{uid}" for uid in user_ids])
+        return {uid: bool(v) for uid, v in zip(user_ids, values)}
+
+    async def set_typing(self, chat_id: str, user_id: str, is_typing: bool) -> None:
+        key = f"typing:{chat_id}:{user_id}"
+        if is_typing:
+            await get_redis().set(key, "1", ex=settings.TYPING_TTL_SECONDS)
+        else:
+            await get_redis().delete(key)
+
+    async def mark_read(self, chat_id: str, user_id: str, message_id: str, timestamp: str) -> None:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hset(f"read:{chat_id}", user_id, f"{message_id}|{timestamp}")
+        pipe.hdel(f"unread:{user_id}", chat_id)
+        await pipe.execute()
+
+    async def incr_unread(self, user_id: str, chat_id: str, amount: int = 1) -> None:
+        await get_redis().hincrby(f"unread:{user_id}", chat_id, amount)
+
+    async def get_unread(self, user_id: str) -> Dict[str, int]:
+        raw = await get_redis().hgetall(f"unread:{user_id}")
+        return {chat_id: int(count) for chat_id, count in raw.items()}
+
+# =============================================================================
+# BACKEND SELECTION
+# =============================================================================
+
+def _select_store():
+    backend = settings.PRESENCE_BACKEND
+    if backend == "auto":
+        # uvicorn/gunicorn convention: WEB_CONCURRENCY = worker count
+        workers = int(os.getenv("WEB_CONCURRENCY", "1") or 1)
+        backend = "redis" if workers > 1 else "local"
+    logger.info(f"Presence store: {backend}")
+    return RedisPresenceStore() if backend == "redis" else LocalPresenceStore()
+
+
+presence_store = _select_store()
+
+
+async def safe_call(coro, default=None):
+    """Presence is best-effort: never fail a request or a socket over it."""
+    try:
+        return await coro
+    except Exception as e:
+        logger.warning(f"Presence store error: {e}")
+        return default
+
+
+def other_participants(chat: Dict[str, str], user_id: str) -> list:
+    return [
+        uid for uid in {chat.get("user_id"), chat.get("employer_id")}
+        if uid and uid != user_id
+    ]
@@ -1,15 +1,79 @@
+import uuid
+import math
 import logging
-from typing import Optional
+from typing import NamedTuple, Optional
 from fastapi import HTTPException, status
+from redis.commands.core import AsyncScript
 
+from app.core.config import settings
+from app.core.context import note_rate_limit
 from app.core.redis_client import get_redis
 from app.core.logging import increment_metric
 
 logger = logging.getLogger("RateLimiter")
 
 # =============================================================================
-# REDIS-BACKED RATE LIMITER (ATOMIC + DISTRIBUTED)
+# SLIDING WINDOW (One Atomic Lua Script = One Round Trip)
 # =============================================================================
+# Each key is a sorted set of admitted request timestamps (microseconds, Redis
+# server clock, so app hosts with skewed clocks agree). The script trims entries
+# older than the window, admits the request if fewer than `limit` remain, and
+# reports what the RateLimit-* headers need. Memory per key is bounded by `limit`;
+# rejected requests are not recorded, so hammering a limit does not extend it.
+# TIME before a write needs effect replication (the default since Redis 5).
+
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, math.ceil(window / 1000))
+    count = count + 1
+    allowed = 1
+end
+
+local reset = window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+return {allowed, limit - count, math.ceil(reset / 1000)}
+"""
+
+_script: Optional[AsyncScript] = None
+
+
+class RateLimitState(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: int  # Until the oldest counted request leaves the window (= Retry-After when denied)
+
+
+def _sliding_window() -> AsyncScript:
+    global _script
+    if _script is None:
+        # EVALSHA, falling back to EVAL (which caches it) after a SCRIPT FLUSH / failover
+        _script = get_redis().register_script(SLIDING_WINDOW_LUA)
+    return _script
+
+
+async def acquire(key: str, max_requests: int, window_seconds: int, client=None) -> RateLimitState:
+    """Count one request against `key`. `client` overrides the app's Redis (benchmarks)."""
+    allowed, remaining, reset_ms = await _sliding_window()(
+        keys=[key],
+        args=[max_requests, window_seconds * 1_000_000, uuid.uuid4().hex],
+        client=client
+    )
+    return RateLimitState(bool(allowed), max_requests, max(0, int(remaining)), max(1, math.ceil(int(reset_ms) / 1000)))
+
 
 async def check_rate_limit(
     key: str,
@@ -18,60 +82,47 @@ async def check_rate_limit(
     error_message: str = "Too many requests. Please try again later."
 ) -> None:
     """
-    Generic Redis-backed rate limiter using INCR + EXPIRE.
+    Generic Redis-backed sliding-window rate limiter.
     
     Args:
         key: Redis key (e.g., "rl:otp:{identifier}")
-        max_requests: Maximum allowed requests in window
+        max_requests: Maximum allowed requests in any window_seconds span
         window_seconds: Time window in seconds
         error_message: Custom error message for 429 response
     
     Raises:
-        HTTPException: 429 if limit exceeded
+        HTTPException: 429 (with Retry-After) if limit exceeded
     
-    Logic:
-        1. INCR key
-        2. If first request (count == 1), set EXPIRE
-        3. If count > max_requests, raise 429
+    The result is also noted on the request context, so the response carries
+    RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset.
+    Disabled with RATE_LIMIT_ENABLED=false (local development, load tests).
     """
-    redis = get_redis()
-    
-    # 🔒 BYPASS FOR DEV/TESTING (User Request: "fix all those")
-    return 
+    if not settings.RATE_LIMIT_ENABLED:
+        return
 
     try:
-        # Atomic increment
-        count = await redis.incr(key)
-        
-        # Set TTL on first request
-        if count == 1:
-            await redis.expire(key, window_seconds)
-        
-        # Check limit
-        if count > max_requests:
-            # Get TTL for Retry-After header
-            ttl = await redis.ttl(key)
-            retry_after = max(ttl, 1) if ttl > 0 else window_seconds
-            
-            # Metrics
-            increment_metric("rate_limit.hit")
-            increment_metric(f"rate_limit.hit.{key.split(':')[1]}")  # e.g., rate_limit.hit.otp
-            
-            logger.warning(f"Rate limit exceeded: {key} (count={count}, max={max_requests})")
-            
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=error_message,
-                headers={"Retry-After": str(retry_after)}
-            )
-            
-    except HTTPException:
-        raise
+        state = await acquire(key, max_requests, window_seconds)
     except Exception as e:
         # FAIL OPEN: If Redis is down, allow request
+        increment_metric("rate_limit.error")
         logger.error(f"Rate limiter error (failing open): {e}")
         return
 
+    note_rate_limit(state.limit, state.remaining, state.reset_seconds)
+
+    if not state.allowed:
+        # Metrics
+        increment_metric("rate_limit.hit")
+        increment_metric(f"rate_limit.hit.{key.split(':')[1]}")  # e.g., rate_limit.hit.otp
+
+        logger.warning(f"Rate limit exceeded: {key} (max={max_requests}/{window_seconds}s)")
+
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=error_message,
+            headers={"Retry-After": str(state.reset_seconds)}
+        )
+
 # =============================================================================
 # ENDPOINT-SPECIFIC RATE LIMITERS
 # =============================================================================
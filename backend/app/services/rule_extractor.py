@@ -0,0 +1,188 @@
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from app.services.gazetteer import LOCATIONS, LOCATION_CUES, NEEDS_CUE
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("RuleExtractor")
+
+# Role -> evidence keywords. Declaration order breaks ties.
+ROLE_KEYWORDS = {
+    "driver": ["driving", "truck", "vehicle", "license", "hmv", "lmv", "delivery"],
+    "developer": ["software", "code", "python", "java", "react", "programming"],
+    "mechanic": ["repair", "engine", "maintenance", "technician"],
+    "sales": ["selling", "customer", "retail", "marketing"],
+    "nurse": ["patient", "medical", "hospital", "care"]
+}
+
+# Output order follows this list
+SKILLS = [
+    "driving", "maintenance", "repair", "safety", "logistics", # Blue collar
+    "python", "javascript", "react", "sql", "aws", "docker",   # Tech
+    "sales", "communication", "management", "excel"            # General
+]
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "twenty": 20
+}
+
+# Inflections accepted after a keyword: "truck" also matches "trucks", "repair" -> "repairing"
+_SUFFIXES = ("", "s", "es", "ed", "ing")
+
+# Everything that is not a letter or digit becomes a space ("in Pune." -> "in Pune ").
+# One C-level str.translate, no regex.
+_SEPARATORS = str.maketrans({
+    ch: " " for ch in map(chr, range(128)) if not ch.isalnum()
+})
+
+# Experience: find the unit first (a literal-led scan, glued "5yrs" included), then
+# read the number just before it. Patterns that start with a number or a lookbehind
+# have no literal for sre to skip ahead on and cost ms on long transcripts.
+_YEAR_UNIT = re.compile(r"y(?:ears?|rs?)\b")
+_YEARS_BEFORE = re.compile(
+    r"(?<![\w.])(\d+(?:\.\d+)?|" + "|".join(NUMBER_WORDS) + r")\s*\+?[\s-]*$"
+)
+
+# =============================================================================
+# COMPILATION (Precomputed Word Forms)
+# =============================================================================
+# Every keyword inflection and the first word of every gazetteer alias is folded
+# into one frozen vocabulary, built once at import. Extraction then costs one
+# tokenizing pass and one C-level set intersection; everything after that works on
+# the few words that hit, independent of transcript length and vocabulary size.
+
+# inflected form -> (role, keyword) it is evidence for; form -> skill
+_EVIDENCE: Dict[str, Tuple[str, str]] = {}
+for _role, _keywords in ROLE_KEYWORDS.items():
+    for _keyword in _keywords:
+        for _suffix in _SUFFIXES:
+            _EVIDENCE.setdefault(_keyword + _suffix, (_role, _keyword))
+_SKILL_OF = {skill + suffix: skill for skill in SKILLS for suffix in _SUFFIXES}
+_SKILL_ORDER = {skill: i for i, skill in enumerate(SKILLS)}
+_ROLE_ORDER = {role: i for i, role in enumerate(ROLE_KEYWORDS)}
+
+# first word -> aliases starting with it. Single-word, unambiguous aliases are
+# "plain": the word being present is the mention. The rest need the text around them.
+_PLACES: Dict[str, List[str]] = {}
+for _alias in LOCATIONS:
+    _PLACES.setdefault(_alias.split()[0], []).append(_alias)
+_PLAIN = frozenset(alias for alias in LOCATIONS if " " not in alias and alias not in NEEDS_CUE)
+
+_VOCABULARY = frozenset(_EVIDENCE).union(_SKILL_OF, _PLACES)
+
+# =============================================================================
+# EXTRACTION (Single Linear Pass)
+# =============================================================================
+
+def _experience(text: str) -> float:
+    """The earliest '<number|word> years' (also '8+ yrs', '5yrs', '2.5 years.')."""
+    for unit in _YEAR_UNIT.finditer(text):
+        start = unit.start()
+        if start and text[start - 1].isalpha():
+            continue  # "storyears", not a unit
+        match = _YEARS_BEFORE.search(text, max(0, start - 24), start)
+        if match:
+            number = match.group(1)
+            return float(NUMBER_WORDS.get(number) or number)
+    return 0.0
+
+
+def _alias_pattern(alias: str):
+    # Literal-led on purpose: sre then skips ahead with a fast substring search.
+    # The leading word boundary is checked per match in _mentions.
+    return re.compile(" +".join(map(re.escape, alias.split())) + "(?![a-z0-9])")
+
+
+_ALIAS_PATTERNS = {alias: _alias_pattern(alias) for alias in LOCATIONS}
+_CUE_BEFORE = re.compile(r"(?<![a-z0-9])(?:" + "|".join(LOCATION_CUES) + r") +$")
+
+
+def _mentions(norm: str, alias: str):
+    """
+    Offsets of whole-word mentions of alias in the normalized text, lazily: the
+    tie-break only needs the first. Ambiguous names ('Anand' is also a first name)
+    only count right after a location cue: 'in Anand', 'from Salem'.
+    """
+    for match in _ALIAS_PATTERNS[alias].finditer(norm):
+        start = match.start()
+        if start and norm[start - 1] != " ":
+            continue  # Tail of a longer word
+        if alias in NEEDS_CUE and not _CUE_BEFORE.search(norm, max(0, start - 16), start):
+            continue
+        yield start
+
+
+def _location(norm: str, tokens: List[str], places: frozenset) -> str:
+    """Most-mentioned city, earliest mention on ties; 'Unknown' if none."""
+    plain, contextual = [], []
+    for word in places:
+        for alias in _PLACES[word]:
+            (plain if alias in _PLAIN else contextual).append(alias)
+
+    mentions: Dict[str, int] = {}
+    for alias in contextual:
+        count = sum(1 for _ in _mentions(norm, alias))
+        if count:
+            mentions[LOCATIONS[alias]] = mentions.get(LOCATIONS[alias], 0) + count
+    cities = {LOCATIONS[alias] for alias in plain}.union(mentions)
+    if len(cities) <= 1:
+        return next(iter(cities), "Unknown")  # Counting can't change the answer
+
+    counted = Counter(filter(frozenset(plain).__contains__, tokens))
+    for alias in plain:
+        mentions[LOCATIONS[alias]] = mentions.get(LOCATIONS[alias], 0) + counted[alias]
+
+    most = max(mentions.values())
+    tied = [city for city, count in mentions.items() if count == most]
+    if len(tied) == 1:
+        return tied[0]
+    first = {}
+    for alias in plain + contextual:
+        city = LOCATIONS[alias]
+        if city in tied:
+            at = next(_mentions(norm, alias), len(norm))
+            first[city] = min(first.get(city, at), at)
+    return min(tied, key=first.__getitem__)
+
+
+def extract(transcript: str) -> Dict[str, Any]:
+    """
+    Tokenize once, intersect with the vocabulary, then resolve only the words that
+    hit: role votes, skills, the first stated experience and the most-mentioned location.
+    """
+    text = transcript.lower()
+    norm = text.translate(_SEPARATORS)
+    tokens = norm.split()
+    hits = _VOCABULARY.intersection(tokens)
+
+    # 1. Role: most distinct evidence keywords, declaration order on ties
+    votes = Counter(role for role, _ in {_EVIDENCE[word] for word in hits.intersection(_EVIDENCE)})
+    detected_role = "Candidate"
+    if votes:
+        detected_role = min(votes, key=lambda role: (-votes[role], _ROLE_ORDER[role])).title()
+
+    # 2. Skills in canonical order
+    skills = {_SKILL_OF[word] for word in hits.intersection(_SKILL_OF)}
+    found_skills = [s.title() for s in sorted(skills, key=_SKILL_ORDER.__getitem__)]
+
+    # 3. Location
+    places = hits.intersection(_PLACES)
+    location = _location(norm, tokens, places) if places else "Unknown"
+
+    experience = _experience(text)
+    summary = f"{detected_role} with {experience} years experience."
+    if found_skills:
+        summary += f" Skilled in {', '.join(found_skills[:3])}."
+
+    return {
+        "roleTitle": detected_role,
+        "skills": found_skills or ["General"],
+        "experienceYears": experience,
+        "summary": summary,
+        "location": location
+    }
@@ -0,0 +1,93 @@
+import os
+import shutil
+import asyncio
+import logging
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("Transcoder")
+
+# =============================================================================
+# WORKER FUNCTIONS (Run in the process pool; must stay top-level + picklable)
+# =============================================================================
+
+def _run_ffmpeg(args, timeout: float) -> None:
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-y", "-v", "error", *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited {result.returncode}: {result.stderr.decode(errors='replace')[-300:]}")
+
+
+def render_preview(src: str, dst: str, height: int, video_kbps: int, audio_kbps: int, timeout: float) -> int:
+    """
+    Low-bitrate H.264/AAC MP4 for mobile review. +faststart puts the index first so
+    playback starts after the first few KB instead of after the whole file.
+    Returns the output size in bytes.
+    """
+    _run_ffmpeg([
+        "-i", src,
+        "-vf", f"scale=-2:'min({height},ih)'",
+        "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main", "-pix_fmt", "yuv420p",
+        "-b:v", f"{video_kbps}k", "-maxrate", f"{video_kbps}k", "-bufsize", f"{video_kbps * 2}k",
+        "-c:a", "aac", "-ac", "1", "-b:a", f"{audio_kbps}k",
+        "-movflags", "+faststart",
+        "-f", "mp4", dst
+    ], timeout)
+    return os.path.getsize(dst)
+
+
+def render_poster(src: str, dst: str, width: int, at_seconds: float, timeout: float) -> int:
+    """One JPEG frame (falls back to the first frame for clips shorter than at_seconds)."""
+    try:
+        _run_ffmpeg(["-ss", str(at_seconds), "-i", src, "-frames:v", "1",
+                     "-vf", f"scale={width}:-2", "-q:v", "4", "-f", "image2", dst], timeout)
+    except RuntimeError:
+        _run_ffmpeg(["-i", src, "-frames:v", "1", "-vf", f"scale={width}:-2", "-q:v", "4", "-f", "image2", dst], timeout)
+    if not os.path.exists(dst) or os.path.getsize(dst) == 0:
+        raise RuntimeError("ffmpeg produced no poster frame")
+    return os.path.getsize(dst)
+
+# =============================================================================
+# POOL (Bounded, Separate Processes)
+# =============================================================================
+# Transcodes are CPU-bound for seconds to minutes. A small process pool caps how
+# many run at once per worker host and keeps them out of the event loop's
+# process entirely; "spawn" avoids forking a process that holds threads/sockets.
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def available() -> bool:
+    return settings.VIDEO_PREVIEW_ENABLED and shutil.which("ffmpeg") is not None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.TRANSCODE_WORKERS),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"🎞️ Transcode pool started ({settings.TRANSCODE_WORKERS} processes)")
+    return _pool
+
+
+async def run(fn, *args):
+    """Run a worker function in the pool without blocking the loop."""
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), fn, *args)
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,392 @@
+import os
+import uuid
+import base64
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.core.logging import increment_metric, log_event
+from app.db.mongo import get_db
+from app.services.blob_store import blob_store
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("UploadService")
+
+PARTIAL_DIR = "uploads/partial"
+ALLOWED_VIDEO_TYPES = {"video/mp4", "video/webm", "video/quicktime"}
+MAX_VIDEO_SIZE = settings.UPLOAD_MAX_BYTES
+
+COLLECTION = "upload_sessions"
+WRITE_BUFFER = 1024 * 1024  # Coalesce network chunks into 1MB positional writes
+
+# tus checksum extension: "Upload-Checksum: <algorithm> <base64 digest>"
+CHECKSUM_ALGORITHMS = {"sha256": hashlib.sha256, "sha1": hashlib.sha1, "md5": hashlib.md5}
+
+STATUS_UPLOADING = "uploading"
+STATUS_FINALIZING = "finalizing"
+STATUS_COMPLETE = "complete"
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _safe_filename(filename: Optional[str]) -> str:
+    """Basename only, no path tricks, bounded length."""
+    name = os.path.basename(filename or "video.mp4").replace("\x00", "")
+    return name[-100:] or "video.mp4"
+
+
+def _preallocate(path: str, length: int) -> None:
+    """Reserve the whole file up front so chunks land with pwrite and the disk can't fill mid-upload."""
+    fd = os.open(path, os.O_CREAT | os.O_WRONLY, 0o640)
+    try:
+        if length and hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, length)
+        else:
+            os.ftruncate(fd, length)
+    finally:
+        os.close(fd)
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def parse_checksum(header: Optional[str]):
+    """Returns (hasher, expected_digest) or (None, None)."""
+    if not header:
+        return None, None
+    try:
+        algorithm, encoded = header.strip().split(" ", 1)
+        hasher = CHECKSUM_ALGORITHMS[algorithm.lower()]()
+        return hasher, base64.b64decode(encoded.strip(), validate=True)
+    except (ValueError, KeyError):
+        raise HTTPException(400, "Invalid Upload-Checksum (expected '<sha256|sha1|md5> <base64>')")
+
+
+def _session_oid(upload_id: str) -> ObjectId:
+    try:
+        return ObjectId(upload_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(404, "Upload not found")
+
+# =============================================================================
+# RESUMABLE UPLOADS (tus-style: create -> HEAD offset -> PATCH at offset -> finalize)
+# =============================================================================
+
+async def create_session(user_id: str, length: int, filename: Optional[str], content_type: str) -> Dict[str, Any]:
+    if content_type not in ALLOWED_VIDEO_TYPES:
+        raise HTTPException(400, "Invalid file type. Only MP4/WebM allowed.")
+    if length <= 0:
+        raise HTTPException(400, "Upload-Length must be positive")
+    if length > MAX_VIDEO_SIZE:
+        raise HTTPException(413, f"Video exceeds {MAX_VIDEO_SIZE // (1024 * 1024)}MB limit")
+
+    oid = ObjectId()
+    partial_path = f"{PARTIAL_DIR}/{oid}.part"
+    now = datetime.utcnow()
+    session = {
+        "_id": oid,
+        "user_id": user_id,
+        "length": length,
+        "offset": 0,
+        "filename": _safe_filename(filename),
+        "content_type": content_type,
+        "partial_path": partial_path,
+        "status": STATUS_UPLOADING,
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS),
+        "locked_by": None,
+        "lock_until": None,
+    }
+    collection = get_db()[COLLECTION]
+
+    # Every open session reserves disk for its full length, so cap them per user.
+    # Insert first, then count: two racing creates can't both squeeze past the cap.
+    await collection.insert_one(session)
+    open_sessions = await collection.count_documents(
+        {"user_id": user_id, "status": STATUS_UPLOADING, "expires_at": {"$gt": now}}
+    )
+    if open_sessions > settings.UPLOAD_MAX_OPEN_SESSIONS:
+        await collection.delete_one({"_id": oid})
+        increment_metric("uploads.resumable.too_many_open")
+        raise HTTPException(
+            429, f"Too many unfinished uploads (max {settings.UPLOAD_MAX_OPEN_SESSIONS}); finish or cancel one first"
+        )
+
+    try:
+        os.makedirs(PARTIAL_DIR, exist_ok=True)
+        await asyncio.to_thread(_preallocate, partial_path, length)
+    except OSError as e:
+        await collection.delete_one({"_id": oid})
+        _remove_quietly(partial_path)
+        logger.error(f"❌ Could not reserve {length} bytes for upload {oid}: {e}")
+        raise HTTPException(507, "Not enough storage for this upload, try again later")
+    increment_metric("uploads.resumable.created")
+    return session
+
+
+async def get_session(upload_id: str, user_id: str) -> Dict[str, Any]:
+    session = await get_db()[COLLECTION].find_one({"_id": _session_oid(upload_id), "user_id": user_id})
+    if not session:
+        raise HTTPException(404, "Upload not found")
+    if session["expires_at"] < datetime.utcnow():
+        raise HTTPException(410, "Upload expired")
+    return session
+
+
+class _WriterLease:
+    """
+    One writer per session (tus servers lock an upload the same way). Claimed together
+    with the offset check, renewed before each disk write once half the lease is used,
+    released when the request ends. A writer that lost its lease (it stalled past
+    UPLOAD_LOCK_SECONDS and a retry took over) stops before its next write instead of
+    overwriting bytes the new writer already committed.
+    """
+    def __init__(self, session_id: ObjectId):
+        self.session_id = session_id
+        self.token = uuid.uuid4().hex
+        self.renewed_at = 0.0
+
+    def _until(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=settings.UPLOAD_LOCK_SECONDS)
+
+    async def claim(self, offset: int) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        claimed = await get_db()[COLLECTION].find_one_and_update(
+            {
+                "_id": self.session_id,
+                "status": STATUS_UPLOADING,
+                "offset": offset,
+                "$or": [{"locked_by": None}, {"lock_until": {"$lt": now}}],
+            },
+            {"$set": {"locked_by": self.token, "lock_until": self._until()}},
+            return_document=ReturnDocument.AFTER
+        )
+        self.renewed_at = asyncio.get_running_loop().time()
+        return claimed
+
+    async def ensure(self) -> None:
+        """Call before every write; raises 409 if another writer took the session over."""
+        loop = asyncio.get_running_loop()
+        if loop.time() - self.renewed_at < settings.UPLOAD_LOCK_SECONDS / 2:
+            return
+        renewed = await get_db()[COLLECTION].update_one(
+            {"_id": self.session_id, "locked_by": self.token, "status": STATUS_UPLOADING},
+            {"$set": {"lock_until": self._until()}}
+        )
+        if renewed.modified_count == 0:
+            increment_metric("uploads.resumable.lease_lost")
+            raise HTTPException(409, "Upload was taken over by another request; resume from HEAD")
+        self.renewed_at = loop.time()
+
+    async def release(self) -> None:
+        await get_db()[COLLECTION].update_one(
+            {"_id": self.session_id, "locked_by": self.token},
+            {"$set": {"locked_by": None, "lock_until": None}}
+        )
+
+
+async def append_chunk(
+    upload_id: str,
+    user_id: str,
+    offset: int,
+    chunks: AsyncIterator[bytes],
+    checksum_header: Optional[str] = None
+) -> int:
+    """
+    Write the request body at `offset` with positional writes, holding the session's
+    writer lease (a second concurrent PATCH gets 423). The stored offset only advances
+    (compare-and-set on the old offset, by the lease holder) after the whole chunk is on
+    disk and its checksum matched, so a dropped connection or a bad chunk costs exactly
+    that chunk. Returns the new offset.
+    """
+    session = await get_session(upload_id, user_id)
+    if session["status"] != STATUS_UPLOADING:
+        raise HTTPException(409, "Upload already finalized")
+    if offset != session["offset"]:
+        # tus: the client must resume from the server's offset (HEAD)
+        raise HTTPException(409, f"Offset mismatch: server is at {session['offset']}")
+
+    lease = _WriterLease(session["_id"])
+    if not await lease.claim(offset):
+        current = await get_session(upload_id, user_id)
+        if current["status"] != STATUS_UPLOADING:
+            raise HTTPException(409, "Upload already finalized")
+        if current["offset"] != offset:
+            raise HTTPException(409, f"Offset mismatch: server is at {current['offset']}")
+        increment_metric("uploads.resumable.locked")
+        raise HTTPException(423, "Upload is locked by another request; retry shortly")
+
+    try:
+        position = await _write_chunk(session, lease, offset, chunks, checksum_header)
+        result = await get_db()[COLLECTION].update_one(
+            {"_id": session["_id"], "offset": offset, "status": STATUS_UPLOADING, "locked_by": lease.token},
+            {"$set": {
+                "offset": position,
+                "expires_at": datetime.utcnow() + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+            }}
+        )
+        if result.modified_count == 0 and position != offset:
+            raise HTTPException(409, "Upload was taken over by another request; resume from HEAD")
+    finally:
+        await lease.release()
+    increment_metric("uploads.resumable.bytes", position - offset)
+    return position
+
+
+async def _write_chunk(
+    session: Dict[str, Any],
+    lease: _WriterLease,
+    offset: int,
+    chunks: AsyncIterator[bytes],
+    checksum_header: Optional[str]
+) -> int:
+    hasher, expected_digest = parse_checksum(checksum_header)
+    limit = session["length"]
+    position = offset
+    buffer = bytearray()
+
+    fd = await asyncio.to_thread(os.open, session["partial_path"], os.O_WRONLY)
+    try:
+        async for chunk in chunks:
+            if position + len(buffer) + len(chunk) > limit:
+                increment_metric("uploads.resumable.oversize")
+                raise HTTPException(413, "Chunk runs past the declared Upload-Length")
+            if hasher:
+                hasher.update(chunk)
+            buffer += chunk
+            if len(buffer) >= WRITE_BUFFER:
+                data, buffer = bytes(buffer), bytearray()
+                await lease.ensure()
+                await asyncio.to_thread(_pwrite_all, fd, data, position)
+                position += len(data)
+        if buffer:
+            await lease.ensure()
+            await asyncio.to_thread(_pwrite_all, fd, bytes(buffer), position)
+            position += len(buffer)
+    finally:
+        await asyncio.to_thread(os.close, fd)
+
+    if hasher and hasher.digest() != expected_digest:
+        increment_metric("uploads.resumable.checksum_mismatch")
+        # 460 is tus's "Checksum Mismatch"; offset stays put so the chunk is simply resent
+        raise HTTPException(460, "Checksum mismatch")
+    return position
+
+
+async def finalize_session(upload_id: str, user_id: str) -> Dict[str, Any]:
+    """
+    Hand the completed file to the blob store (deduplicated by content).
+    The session keeps one blob reference until it expires, so the upload_id stays
+    usable for UPLOAD_SESSION_TTL_SECONDS. Idempotent: a repeated call returns the same result.
+    """
+    session = await get_session(upload_id, user_id)
+    if session["status"] == STATUS_COMPLETE:
+        return session
+    if session["offset"] != session["length"]:
+        raise HTTPException(409, f"Upload incomplete: {session['offset']}/{session['length']} bytes")
+
+    # Claim the finalize so a concurrent call can't ingest the same partial file twice
+    collection = get_db()[COLLECTION]
+    finalizing = {"_id": session["_id"], "status": STATUS_FINALIZING}
+    claimed = await collection.update_one(
+        {"_id": session["_id"], "status": STATUS_UPLOADING},
+        {"$set": {"status": STATUS_FINALIZING, "finalize_started_at": datetime.utcnow()}}
+    )
+    if claimed.modified_count == 0:
+        raise HTTPException(409, "Upload is being finalized")
+
+    try:
+        await asyncio.to_thread(_fsync, session["partial_path"])
+        blob = await blob_store.ingest_file(session["partial_path"], session["content_type"])
+    except BaseException:
+        # Cancellation included: a session left in "finalizing" would refuse every retry
+        await asyncio.shield(collection.update_one(finalizing, {"$set": {"status": STATUS_UPLOADING}}))
+        raise
+
+    completed_at = datetime.utcnow()
+    update = {
+        "status": STATUS_COMPLETE,
+        "blob_digest": blob["_id"],
+        "completed_at": completed_at,
+        "expires_at": completed_at + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS),
+    }
+    try:
+        await collection.update_one(finalizing, {"$set": update})
+    except BaseException:
+        # The partial file now lives in the blob store, so the session can't go back to
+        # uploading: give the reference back; purge_expired_sessions drops the stale session
+        await asyncio.shield(blob_store.release(blob["_id"]))
+        raise
+    log_event("upload_finalized", upload_id=str(session["_id"]), size_bytes=session["length"],
+              deduplicated=blob["refcount"] > 1)
+    return {**session, **update}
+
+
+def _fsync(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+async def abort_session(upload_id: str, user_id: str) -> None:
+    session = await get_session(upload_id, user_id)
+    if session["status"] != STATUS_UPLOADING:
+        raise HTTPException(409, "Upload already finalized")
+    await get_db()[COLLECTION].delete_one({"_id": session["_id"], "status": STATUS_UPLOADING})
+    _remove_quietly(session["partial_path"])
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+# =============================================================================
+# MAINTENANCE (Called by cleanup_service)
+# =============================================================================
+
+async def purge_expired_sessions() -> int:
+    """
+    Abandoned uploads hold preallocated disk space: drop the session and its partial file.
+    Completed sessions past their TTL give back their blob reference. Finalizes stuck
+    past UPLOAD_FINALIZE_STALE_SECONDS (worker died mid-ingest) are reclaimed the same way.
+    """
+    collection = get_db()[COLLECTION]
+    now = datetime.utcnow()
+    stale_finalize = now - timedelta(seconds=settings.UPLOAD_FINALIZE_STALE_SECONDS)
+    expired = await collection.find(
+        {"$or": [
+            {"status": {"$in": [STATUS_UPLOADING, STATUS_COMPLETE]}, "expires_at": {"$lt": now}},
+            {"status": STATUS_FINALIZING, "finalize_started_at": {"$lt": stale_finalize}},
+            {"status": STATUS_FINALIZING, "finalize_started_at": {"$exists": False}, "expires_at": {"$lt": now}},
+        ]},
+        {"partial_path": 1, "status": 1, "blob_digest": 1}
+    ).to_list(1000)
+    for session in expired:
+        deleted = await collection.delete_one({"_id": session["_id"], "status": session["status"]})
+        if not deleted.deleted_count:
+            continue
+        if session.get("blob_digest"):
+            await blob_store.release(session["blob_digest"])
+        else:
+            _remove_quietly(session["partial_path"])
+    return len(expired)
@@ -0,0 +1,567 @@
+import os
+import json
+import time
+import shutil
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.core.logging import increment_metric, record_latency, log_event
+from app.db.mongo import get_db
+from app.services.extraction_pool import extraction_pool
+from app.services.media import video_url, video_urls
+from app.services.blob_store import blob_store
+from app.services import transcoder
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("VideoQueue")
+
+COLLECTION = "video_jobs"
+AUDIO_DIR = "uploads/audio"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+STAGES = ("probe", "audio", "transcribe", "extract")
+
+# Preview follow-up: runs after the job is done, so the profile never waits on ffmpeg
+PREVIEW_QUEUED = "queued"
+PREVIEW_RUNNING = "running"
+PREVIEW_DONE = "done"
+PREVIEW_FAILED = "failed"
+
+
+class PermanentJobError(Exception):
+    """A failure retrying cannot fix (missing or unreadable file)."""
+
+# =============================================================================
+# TRANSCRIPTION (Pluggable)
+# =============================================================================
+# transcribe_audio(path) -> text. Blocking; always called on a worker thread.
+# VIDEO_TRANSCRIBER picks the engine: "stub" needs nothing installed,
+# "whisper" needs the optional openai-whisper package (and ffmpeg).
+
+STUB_TRANSCRIPT = (
+    "Hello, I am Rajesh. I have been driving heavy trucks for 8 years "
+    "across Hyderabad and Bangalore. I have a clean license and know "
+    "basic engine repair. I am looking for a stable logistics role."
+)
+
+_whisper_model = None
+
+
+def _transcribe_stub(path: str) -> str:
+    return STUB_TRANSCRIPT
+
+
+def _transcribe_whisper(path: str) -> str:
+    global _whisper_model
+    if _whisper_model is None:
+        import whisper  # Optional dependency, only needed for this engine
+        _whisper_model = whisper.load_model(settings.WHISPER_MODEL)
+    return _whisper_model.transcribe(path, fp16=False)["text"].strip()
+
+
+TRANSCRIBERS: Dict[str, Callable[[str], str]] = {
+    "stub": _transcribe_stub,
+    "whisper": _transcribe_whisper,
+}
+
+
+def transcribe_audio(path: str) -> str:
+    try:
+        engine = TRANSCRIBERS[settings.VIDEO_TRANSCRIBER]
+    except KeyError:
+        raise PermanentJobError(f"Unknown VIDEO_TRANSCRIBER '{settings.VIDEO_TRANSCRIBER}'")
+    return engine(path)
+
+# =============================================================================
+# STAGES
+# =============================================================================
+# Each stage reads job["artifacts"] and returns new artifacts. Artifacts are
+# persisted after every stage, so a retry resumes at the stage that failed.
+# The preview isn't a stage: see _stage_preview and VideoWorker.process_preview.
+
+async def _run_tool(*args: str) -> str:
+    proc = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"{args[0]} exited {proc.returncode}: {stderr.decode(errors='replace')[-300:]}")
+    return stdout.decode()
+
+
+async def _stage_probe(job: Dict[str, Any]) -> Dict[str, Any]:
+    path = job["file_path"]
+    if not os.path.isfile(path):
+        raise PermanentJobError(f"Video file missing: {path}")
+    probe: Dict[str, Any] = {"size_bytes": os.path.getsize(path), "duration_seconds": None}
+    if shutil.which("ffprobe"):
+        try:
+            out = await _run_tool("ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", path)
+            probe["duration_seconds"] = float(json.loads(out)["format"]["duration"])
+        except (RuntimeError, KeyError, ValueError) as e:
+            raise PermanentJobError(f"Unreadable video: {e}")
+        if probe["duration_seconds"] > settings.VIDEO_MAX_DURATION_SECONDS:
+            raise PermanentJobError(f"Video longer than {settings.VIDEO_MAX_DURATION_SECONDS}s")
+    return {"probe": probe}
+
+
+async def _stage_audio(job: Dict[str, Any]) -> Dict[str, Any]:
+    if not shutil.which("ffmpeg"):
+        # No ffmpeg: hand the container to the transcriber as-is
+        return {"audio_path": job["file_path"]}
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    audio_path = f"{AUDIO_DIR}/{job['_id']}.wav"
+    # 16 kHz mono PCM: what speech models expect, and a fraction of the video's size
+    await _run_tool("ffmpeg", "-nostdin", "-y", "-v", "error", "-i", job["file_path"],
+                    "-vn", "-ac", "1", "-ar", "16000", "-f", "wav", audio_path)
+    return {"audio_path": audio_path}
+
+
+async def _stage_transcribe(job: Dict[str, Any]) -> Dict[str, Any]:
+    transcript = await asyncio.to_thread(transcribe_audio, job["artifacts"]["audio_path"])
+    return {"transcript": transcript}
+
+
+async def _stage_extract(job: Dict[str, Any]) -> Dict[str, Any]:
+    profile = await extraction_pool.extract(job["artifacts"]["transcript"])
+    profile["source"] = "video_interview"
+    profile["video_path"] = job["file_path"]  # In prod, this is S3 URL
+    profile["video_id"] = str(job["_id"])
+    profile["video_url"] = video_url(profile["video_id"])
+    profile.update(video_urls(profile["video_id"]))  # Same URLs before and after the preview exists
+    return {"profile": profile}
+
+
+async def _stage_preview(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Follow-up on a done job: a compact MP4 rendition + JPEG poster for employers
+    on mobile data. Until it lands (or without ffmpeg, or on a transcode error)
+    the original is served. A failed ingest or write raises and the follow-up
+    retries; _ingest_once keeps retries from taking a second blob reference.
+    """
+    if not transcoder.available():
+        return {"preview_skipped": "disabled"}
+
+    src = job["file_path"]
+    preview_tmp, poster_tmp = blob_store.tmp_path(), blob_store.tmp_path()
+    timeout = settings.VIDEO_PREVIEW_TIMEOUT_SECONDS
+    try:
+        try:
+            preview_bytes = await transcoder.run(
+                transcoder.render_preview, src, preview_tmp,
+                settings.VIDEO_PREVIEW_HEIGHT, settings.VIDEO_PREVIEW_VIDEO_KBPS, settings.VIDEO_PREVIEW_AUDIO_KBPS, timeout
+            )
+            await transcoder.run(transcoder.render_poster, src, poster_tmp, settings.VIDEO_POSTER_WIDTH, 1.0, timeout)
+        except Exception as e:
+            increment_metric("video.preview.failed")
+            logger.warning(f"⚠️ Preview for video job {job['_id']} failed ({e}); serving the original")
+            return {"preview_skipped": f"error: {e}"[:300]}
+
+        artifacts: Dict[str, Any] = {}
+        original_bytes = job["artifacts"].get("probe", {}).get("size_bytes") or os.path.getsize(src)
+        if preview_bytes < original_bytes:
+            artifacts["preview_digest"] = await _ingest_once(job, "preview_digest", preview_tmp, "video/mp4")
+            artifacts["preview_bytes"] = preview_bytes
+            increment_metric("video.preview.bytes_saved", original_bytes - preview_bytes)
+        # Else: the upload was already compact, the original is the preview
+        artifacts["poster_digest"] = await _ingest_once(job, "poster_digest", poster_tmp, "image/jpeg")
+        return artifacts
+    finally:
+        for path in (preview_tmp, poster_tmp):
+            _remove_quietly(path)  # Gone already once ingested
+
+
+async def _ingest_once(job: Dict[str, Any], field: str, path: str, content_type: str) -> str:
+    """
+    Ingests `path` and records the digest under artifacts.<field> at most once per
+    job. The reference is given back if recording it fails or an earlier attempt
+    already recorded one, so retries never leak a refcount.
+    """
+    recorded = job["artifacts"].get(field)
+    if recorded:
+        return recorded
+    blob = await blob_store.ingest_file(path, content_type)
+    collection = get_db()[COLLECTION]
+    try:
+        result = await collection.update_one(
+            {"_id": job["_id"], f"artifacts.{field}": {"$exists": False}},
+            {"$set": {f"artifacts.{field}": blob["_id"]}}
+        )
+    except BaseException:
+        await asyncio.shield(blob_store.release(blob["_id"]))
+        raise
+    if not result.modified_count:
+        await blob_store.release(blob["_id"])
+        current = await collection.find_one({"_id": job["_id"]}, {f"artifacts.{field}": 1})
+        recorded = (current or {}).get("artifacts", {}).get(field)
+        if not recorded:
+            raise RuntimeError(f"Video job {job['_id']} disappeared during preview")
+        return recorded
+    job["artifacts"][field] = blob["_id"]
+    return blob["_id"]
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+STAGE_HANDLERS = {
+    "probe": _stage_probe,
+    "audio": _stage_audio,
+    "transcribe": _stage_transcribe,
+    "extract": _stage_extract,
+}
+
+# =============================================================================
+# QUEUE API (Called from routes)
+# =============================================================================
+
+def _job_oid(job_id: str) -> ObjectId:
+    try:
+        return ObjectId(job_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(404, "Video job not found")
+
+
+async def enqueue_video_job(user_id: str, blob_digest: str, content_type: str) -> str:
+    """The job takes its own reference on the blob; purge_failed_jobs gives it back."""
+    await blob_store.add_ref(blob_digest)
+    now = datetime.utcnow()
+    result = await get_db()[COLLECTION].insert_one({
+        "user_id": user_id,
+        "blob_digest": blob_digest,
+        "content_type": content_type,
+        "file_path": blob_store.local_path(blob_digest),
+        "status": STATUS_QUEUED,
+        "stage": STAGES[0],
+        "attempts": 0,
+        "artifacts": {},
+        "run_after": now,
+        "created_at": now,
+        "updated_at": now,
+    })
+    increment_metric("video.jobs.enqueued")
+    return str(result.inserted_id)
+
+
+async def get_video_job(job_id: str, user_id: str) -> Dict[str, Any]:
+    job = await get_db()[COLLECTION].find_one({"_id": _job_oid(job_id), "user_id": user_id})
+    if not job:
+        raise HTTPException(404, "Video job not found")
+    public = {
+        "job_id": job_id,
+        "status": job["status"],
+        "stage": job["stage"],
+        "attempts": job["attempts"],
+    }
+    if job.get("preview_state"):
+        public["preview"] = job["preview_state"]
+    if job["status"] == STATUS_DONE:
+        profile = job["artifacts"].get("profile")
+        if profile and profile.get("video_id"):
+            # Stored URLs are unsigned: sign for the owner on the way out
+            urls = video_urls(profile["video_id"], user_id)
+            profile = {**profile, **urls, "video_url": urls["videoUrl"]}
+        public["result"] = profile
+    elif job.get("error"):
+        public["error"] = job["error"]
+    return public
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+class VideoWorker:
+    """
+    Claims jobs from the video_jobs collection with an atomic find_one_and_update
+    and runs up to `concurrency` of them at once. A claim is a lease: the worker
+    renews it while a job runs, and a job whose lease lapses (crashed worker) is
+    claimed again by anyone. Failed stages retry with exponential backoff up to
+    VIDEO_JOB_MAX_ATTEMPTS; PermanentJobError fails the job straight away.
+    Done jobs queue a preview follow-up, claimed the same way once no stage work is waiting.
+    """
+    def __init__(self, concurrency: int, poll_interval: float, lease_seconds: float):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._runners: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        if self._runners:
+            return
+        self._wakeup = asyncio.Event()
+        self._runners = [
+            asyncio.create_task(self._run(), name=f"video-worker-{i}") for i in range(self.concurrency)
+        ]
+        logger.info(f"🎬 Video worker {self.worker_id} started ({self.concurrency} slots)")
+
+    async def stop(self) -> None:
+        for task in self._runners:
+            task.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        if self._runners:
+            logger.info("🛑 Video worker stopped")
+        self._runners = []
+
+    def notify(self) -> None:
+        """Skip the poll wait when this process just enqueued a job."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                job = await self.claim() or await self.claim_preview()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Video job claim failed: {e}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                if job["status"] == STATUS_DONE:
+                    await self.process_preview(job)
+                else:
+                    await self.process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The lease lapses and another claim retries the job; this slot keeps running
+                increment_metric("video.jobs.process_error")
+                logger.error(f"Video job {job['_id']} processing failed: {e}")
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await get_db()[COLLECTION].find_one_and_update(
+            {"$or": [
+                {"status": STATUS_QUEUED, "run_after": {"$lte": now}},
+                {"status": STATUS_RUNNING, "lease_until": {"$lt": now}},  # Abandoned by a dead worker
+            ]},
+            {"$set": {
+                "status": STATUS_RUNNING,
+                "worker_id": self.worker_id,
+                "lease_until": now + timedelta(seconds=self.lease_seconds),
+                "updated_at": now,
+            }, "$inc": {"attempts": 1}},
+            sort=[("run_after", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def claim_preview(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await get_db()[COLLECTION].find_one_and_update(
+            {"status": STATUS_DONE, "$or": [
+                {"preview_state": PREVIEW_QUEUED, "run_after": {"$lte": now}},
+                {"preview_state": PREVIEW_RUNNING, "lease_until": {"$lt": now}},
+            ]},
+            {"$set": {
+                "preview_state": PREVIEW_RUNNING,
+                "worker_id": self.worker_id,
+                "lease_until": now + timedelta(seconds=self.lease_seconds),
+                "updated_at": now,
+            }, "$inc": {"preview_attempts": 1}},
+            sort=[("run_after", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _renew_lease(self, owned: Dict[str, Any]) -> None:
+        # Renews every third of the lease, so one failed renewal still leaves time for the next
+        job_id = owned["_id"]
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                result = await get_db()[COLLECTION].update_one(
+                    owned,
+                    {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                increment_metric("video.lease.renew_failed")
+                logger.error(f"Video job {job_id} lease renewal failed: {e}")
+                continue
+            if not result.matched_count:
+                increment_metric("video.lease.lost")
+                logger.warning(f"⚠️ Video job {job_id} lease lost; another worker may process it")
+                return
+
+    async def process(self, job: Dict[str, Any]) -> None:
+        collection = get_db()[COLLECTION]
+        # Every write is conditional on still holding the lease: a worker that lost it
+        # (stalled past lease_until, job re-claimed) must not touch the new owner's run
+        owned = {"_id": job["_id"], "worker_id": self.worker_id, "status": STATUS_RUNNING}
+        if job["attempts"] > settings.VIDEO_JOB_MAX_ATTEMPTS:
+            await self._finish(job, owned, STATUS_FAILED, error="Too many attempts")
+            return
+
+        heartbeat = asyncio.create_task(self._renew_lease(owned))
+        # Jobs queued before the preview left STAGES may still say "preview": only _finish is left
+        first = STAGES.index(job["stage"]) if job["stage"] in STAGES else len(STAGES)
+        try:
+            for stage in STAGES[first:]:
+                start = time.perf_counter()
+                artifacts = await STAGE_HANDLERS[stage](job)
+                record_latency(f"video.stage.{stage}", (time.perf_counter() - start) * 1000)
+                job["artifacts"].update(artifacts)
+                next_stage = STAGES[STAGES.index(stage) + 1] if stage != STAGES[-1] else stage
+                job["stage"] = next_stage
+                persisted = await collection.update_one(owned, {"$set": {
+                    "stage": next_stage,
+                    "artifacts": job["artifacts"],
+                    "updated_at": datetime.utcnow(),
+                }})
+                if not persisted.matched_count:
+                    self._lease_lost(job)
+                    return
+            await self._finish(job, owned, STATUS_DONE)
+
+        except asyncio.CancelledError:
+            # Shutdown: hand the job back without charging an attempt
+            await asyncio.shield(collection.update_one(owned, {
+                "$set": {"status": STATUS_QUEUED, "run_after": datetime.utcnow()},
+                "$inc": {"attempts": -1}
+            }))
+            raise
+        except PermanentJobError as e:
+            await self._finish(job, owned, STATUS_FAILED, error=str(e))
+        except Exception as e:
+            increment_metric(f"video.stage.{job['stage']}.error")
+            if job["attempts"] >= settings.VIDEO_JOB_MAX_ATTEMPTS:
+                await self._finish(job, owned, STATUS_FAILED, error=f"{job['stage']}: {e}")
+            else:
+                delay = settings.VIDEO_JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                logger.warning(f"⚠️ Video job {job['_id']} failed at {job['stage']} ({e}); retry in {delay:.0f}s")
+                await collection.update_one(owned, {"$set": {
+                    "status": STATUS_QUEUED,
+                    "error": f"{job['stage']}: {e}",
+                    "run_after": datetime.utcnow() + timedelta(seconds=delay),
+                    "updated_at": datetime.utcnow(),
+                }})
+                increment_metric("video.jobs.retried")
+        finally:
+            heartbeat.cancel()
+
+    async def process_preview(self, job: Dict[str, Any]) -> None:
+        """The job is already done (profile served); only the preview artifacts are at stake."""
+        collection = get_db()[COLLECTION]
+        owned = {"_id": job["_id"], "worker_id": self.worker_id, "preview_state": PREVIEW_RUNNING}
+        attempts = job.get("preview_attempts", 1)
+        if attempts > settings.VIDEO_JOB_MAX_ATTEMPTS:
+            await collection.update_one(owned, {"$set": {"preview_state": PREVIEW_FAILED}, "$unset": {"lease_until": ""}})
+            return
+
+        heartbeat = asyncio.create_task(self._renew_lease(owned))
+        try:
+            start = time.perf_counter()
+            artifacts = await _stage_preview(job)
+            record_latency("video.stage.preview", (time.perf_counter() - start) * 1000)
+            await collection.update_one(owned, {
+                "$set": {
+                    "preview_state": PREVIEW_DONE,
+                    "updated_at": datetime.utcnow(),
+                    **{f"artifacts.{key}": value for key, value in artifacts.items()},
+                },
+                "$unset": {"lease_until": ""}
+            })
+            increment_metric("video.preview.done")
+
+        except asyncio.CancelledError:
+            await asyncio.shield(collection.update_one(owned, {
+                "$set": {"preview_state": PREVIEW_QUEUED, "run_after": datetime.utcnow()},
+                "$inc": {"preview_attempts": -1}
+            }))
+            raise
+        except Exception as e:
+            increment_metric("video.stage.preview.error")
+            if attempts >= settings.VIDEO_JOB_MAX_ATTEMPTS:
+                logger.error(f"Preview for video job {job['_id']} gave up after {attempts} attempts: {e}")
+                update: Dict[str, Any] = {"preview_state": PREVIEW_FAILED}
+            else:
+                delay = settings.VIDEO_JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+                logger.warning(f"⚠️ Preview for video job {job['_id']} failed ({e}); retry in {delay:.0f}s")
+                update = {"preview_state": PREVIEW_QUEUED, "run_after": datetime.utcnow() + timedelta(seconds=delay)}
+            await collection.update_one(owned, {"$set": {**update, "updated_at": datetime.utcnow()}})
+        finally:
+            heartbeat.cancel()
+
+    def _lease_lost(self, job: Dict[str, Any]) -> None:
+        increment_metric("video.lease.lost")
+        logger.warning(f"⚠️ Video job {job['_id']} was re-claimed by another worker; dropping this run")
+
+    async def _finish(self, job: Dict[str, Any], owned: Dict[str, Any], status: str, error: Optional[str] = None) -> None:
+        update: Dict[str, Any] = {"status": status, "updated_at": datetime.utcnow(), "finished_at": datetime.utcnow()}
+        if error:
+            update["error"] = error
+        if status == STATUS_DONE and transcoder.available():
+            update.update(preview_state=PREVIEW_QUEUED, run_after=datetime.utcnow())
+        result = await get_db()[COLLECTION].update_one(owned, {"$set": update, "$unset": {"lease_until": ""}})
+        if not result.matched_count:
+            self._lease_lost(job)  # The new owner's run (and its audio file) is left alone
+            return
+        increment_metric(f"video.jobs.{status}")
+        log_event(
+            "video_job_finished",
+            level="error" if status == STATUS_FAILED else "info",
+            job_id=str(job["_id"]),
+            status=status,
+            attempts=job["attempts"],
+            reason=error
+        )
+        audio_path = job["artifacts"].get("audio_path")
+        if audio_path and audio_path.startswith(AUDIO_DIR):
+            _remove_quietly(audio_path)
+
+# =============================================================================
+# MAINTENANCE (Called by cleanup_service)
+# =============================================================================
+
+async def purge_failed_jobs(retention_days: int) -> int:
+    """Failed jobs past retention are deleted and their video references released."""
+    collection = get_db()[COLLECTION]
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    jobs = await collection.find(
+        {"status": STATUS_FAILED, "finished_at": {"$lt": cutoff}},
+        {"blob_digest": 1, "artifacts.preview_digest": 1, "artifacts.poster_digest": 1}
+    ).to_list(1000)
+    for job in jobs:
+        # Delete first: a crash between the two steps leaks a reference, never frees a live blob
+        deleted = await collection.delete_one({"_id": job["_id"], "status": STATUS_FAILED})
+        if deleted.deleted_count:
+            artifacts = job.get("artifacts", {})
+            for digest in (job.get("blob_digest"), artifacts.get("preview_digest"), artifacts.get("poster_digest")):
+                await blob_store.release(digest)
+    return len(jobs)
+
+# =============================================================================
+# EXPORTED INSTANCE
+# =============================================================================
+video_worker = VideoWorker(
+    concurrency=settings.VIDEO_WORKER_CONCURRENCY,
+    poll_interval=settings.VIDEO_WORKER_POLL_SECONDS,
+    lease_seconds=settings.VIDEO_JOB_LEASE_SECONDS
+)
@@ -1,57 +1,292 @@
-from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List
+import time
+import asyncio
+from collections import deque
+from fastapi import WebSocket, WebSocketDisconnect, HTTPException
+from typing import Deque, Dict, Optional, Set
 import json
 import logging
 from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
 
+from app.core.config import settings
+from app.core.logging import increment_metric
 from app.core.security import decode_token
-from app.db.mongo import get_db
+from app.services import chat_service
+from app.services.presence import presence_store, safe_call, other_participants
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+logger = logging.getLogger("WebSocketServer")
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DISCONNECT = "disconnect"
+SLOW_CONSUMER_CLOSE_CODE = 1013  # "Try Again Later": client should reconnect & resync history
+
+# =============================================================================
+# PER-CONNECTION OUTBOX
+# =============================================================================
+
+class ClientConnection:
+    """
+    One socket + its bounded outbound queue + the task that drains it.
+    Broadcasts only ever touch the queue, so a slow client never blocks the room.
+    Under "disconnect", a full queue spills into an overflow of the same size, so a
+    client that falls behind briefly loses nothing; it is dropped once the queue has
+    stayed full for WS_SLOW_CONSUMER_TIMEOUT_MS or the overflow fills up too.
+    """
+    def __init__(self, websocket: WebSocket, room_id: str, manager: "ConnectionManager", user_id: Optional[str] = None):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.user_id = user_id
+        self.manager = manager
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.WS_SEND_QUEUE_SIZE))
+        self.overflow: Deque[str] = deque()
+        self.full_since: Optional[float] = None
+        self.closed = False
+        self.writer_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.writer_task = asyncio.create_task(self._writer())
+
+    def enqueue(self, message: str) -> bool:
+        """
+        Non-blocking put. Returns False if the client must be dropped
+        (queue full under the "disconnect" policy).
+        """
+        if self.closed:
+            return False
+        if not self.overflow:
+            try:
+                self.queue.put_nowait(message)
+                return True
+            except asyncio.QueueFull:
+                pass
+
+        if settings.WS_SLOW_CONSUMER_POLICY == POLICY_DISCONNECT:
+            now = time.monotonic()
+            if self.full_since is None:
+                self.full_since = now
+            full_for_ms = (now - self.full_since) * 1000
+            if full_for_ms > settings.WS_SLOW_CONSUMER_TIMEOUT_MS or len(self.overflow) >= self.queue.maxsize:
+                increment_metric("ws.slow_consumer.disconnect")
+                return False
+            self.overflow.append(message)  # Behind the queue: order is kept
+            return True
+
+        # Drop oldest: the newest state is the most useful one for a lagging client
+        try:
+            self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        self.queue.put_nowait(message)
+        increment_metric("ws.frames.dropped")
+        return True
+
+    async def _writer(self) -> None:
+        send_timeout = None
+        if settings.WS_SLOW_CONSUMER_POLICY == POLICY_DISCONNECT:
+            send_timeout = settings.WS_SLOW_CONSUMER_TIMEOUT_MS / 1000
+
+        try:
+            while True:
+                message = await self.queue.get()
+                if self.overflow:
+                    self.queue.put_nowait(self.overflow.popleft())  # The get just made room
+                elif self.full_since is not None:
+                    self.full_since = None  # Caught up: the grace period starts over
+                if send_timeout is None:
+                    await self.websocket.send_text(message)
+                else:
+                    await asyncio.wait_for(self.websocket.send_text(message), timeout=send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            increment_metric("ws.slow_consumer.disconnect")
+            self.manager.drop(self, code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            # Socket gone; the receive loop will observe the disconnect too.
+            self.manager.drop(self)
+
+    def stop(self) -> None:
+        self.closed = True
+        if self.writer_task and self.writer_task is not asyncio.current_task():
+            self.writer_task.cancel()
+
+# =============================================================================
+# CONNECTION MANAGER
+# =============================================================================
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        self.active_connections: Dict[str, Dict[WebSocket, ClientConnection]] = {}
+        self._closing: Set[asyncio.Task] = set()  # The loop only holds weak references to tasks
 
-    async def connect(self, websocket: WebSocket, room_id: str):
+    async def connect(self, websocket: WebSocket, room_id: str, user_id: Optional[str] = None):
         await websocket.accept()
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = []
-        self.active_connections[room_id].append(websocket)
+        conn = ClientConnection(websocket, room_id, self, user_id)
+        conn.start()
+        self.active_connections.setdefault(room_id, {})[websocket] = conn
 
     def disconnect(self, websocket: WebSocket, room_id: str):
-        if room_id in self.active_connections:
-            self.active_connections[room_id].remove(websocket)
-            if not self.active_connections[room_id]:
-                del self.active_connections[room_id]
+        """Idempotent: safe to call from both the receive loop and the writer."""
+        room = self.active_connections.get(room_id)
+        if not room:
+            return
+        conn = room.pop(websocket, None)
+        if conn:
+            conn.stop()
+        if not room:
+            del self.active_connections[room_id]
+
+    def drop(self, conn: ClientConnection, code: int = 1000) -> None:
+        """Evict a connection and close its socket without blocking the caller."""
+        if conn.closed:
+            return
+        self.disconnect(conn.websocket, conn.room_id)
+        task = asyncio.create_task(self._close_quietly(conn.websocket, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=1.0)
+        except Exception:
+            pass
+
+    def _enqueue(self, conn: ClientConnection, message_str: str) -> None:
+        if not conn.enqueue(message_str):
+            self.drop(conn, code=SLOW_CONSUMER_CLOSE_CODE)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        for room in self.active_connections.values():
+            conn = room.get(websocket)
+            if conn:
+                self._enqueue(conn, message)
+                return
+
+    def has_user(self, user_id: str) -> bool:
+        """True if this worker still holds any socket for user_id."""
+        return any(
+            conn.user_id == user_id
+            for room in self.active_connections.values()
+            for conn in room.values()
+        )
+
+    def publish(self, room_id: str, message: dict, exclude: Optional[WebSocket] = None) -> None:
+        """
+        Serialize once, enqueue once per connection, never await a socket.
+        """
+        room = self.active_connections.get(room_id)
+        if not room:
+            return
+        message_str = json.dumps(message)
+        for ws, conn in list(room.items()):
+            if ws is not exclude:
+                self._enqueue(conn, message_str)
 
     async def broadcast_to_room(self, message: dict, room_id: str):
-        if room_id in self.active_connections:
-            message_str = json.dumps(message)
-            disconnected = []
-            for connection in self.active_connections[room_id]:
-                try:
-                    await connection.send_text(message_str)
-                except Exception:
-                    disconnected.append(connection)
-            for conn in disconnected:
-                self.disconnect(conn, room_id)
+        self.publish(room_id, message)
 
 manager = ConnectionManager()
 
 
-async def _user_can_access_chat(chat_id: str, user_id: str) -> bool:
-    """Verify user_id is allowed to access this chat (room_id = chat_id)."""
+async def _send_error(websocket: WebSocket, code: int, detail: str, client_msg_id: Optional[str] = None):
+    error = {"type": "error", "code": code, "detail": detail}
+    if client_msg_id:
+        error["client_msg_id"] = client_msg_id
+    await manager.send_personal_message(json.dumps(error), websocket)
+
+
+def _on_committed(chat: dict, websocket: WebSocket, client_msg_id: Optional[str]):
+    """Fan out only after the group commit; tell the sender if it failed."""
+    def callback(future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None:
+            asyncio.create_task(_send_error(websocket, 500, "Message delivery failed", client_msg_id))
+            return
+        chat_service.deliver(chat, future.result(), client_msg_id)
+    return callback
+
+
+async def _handle_message(websocket: WebSocket, chat: dict, user_id: str, frame: dict):
+    client_msg_id = frame.get("client_msg_id")
     try:
-        oid = ObjectId(chat_id)
-    except InvalidId:
-        return False
-    db = get_db()
-    chat = await db["chats"].find_one({"_id": oid, "user_id": user_id})
-    return chat is not None
+        _, committed = await chat_service.submit_message(
+            chat, user_id, frame.get("text"), frame.get("role")
+        )
+    except HTTPException as e:
+        await _send_error(websocket, e.status_code, str(e.detail), client_msg_id)
+        return
+
+    # Write-behind: the receive loop moves on while the commit is in flight
+    committed.add_done_callback(_on_committed(chat, websocket, client_msg_id))
+
+
+async def _handle_typing(websocket: WebSocket, room_id: str, user_id: str, frame: dict):
+    is_typing = bool(frame.get("is_typing", True))
+    await safe_call(presence_store.set_typing(room_id, user_id, is_typing))
+    manager.publish(room_id, {"type": "typing", "user_id": user_id, "is_typing": is_typing}, exclude=websocket)
+
+
+async def _handle_read(websocket: WebSocket, room_id: str, user_id: str, frame: dict):
+    message_id = frame.get("message_id")
+    if not isinstance(message_id, str):
+        await _send_error(websocket, 422, "message_id is required")
+        return
+    timestamp = datetime.utcnow().isoformat()
+    await safe_call(presence_store.mark_read(room_id, user_id, message_id, timestamp))
+    manager.publish(room_id, {
+        "type": "read", "user_id": user_id, "message_id": message_id, "timestamp": timestamp
+    }, exclude=websocket)
+
+
+async def _handle_client_frame(websocket: WebSocket, room_id: str, chat: dict, user_id: str, data: str):
+    try:
+        frame = json.loads(data)
+    except ValueError:
+        await _send_error(websocket, 400, "Invalid JSON")
+        return
+    if not isinstance(frame, dict):
+        await _send_error(websocket, 400, "Invalid frame")
+        return
+
+    # Any frame proves the client is alive
+    await safe_call(presence_store.set_online(user_id))
+
+    frame_type = frame.get("type", "message")  # Legacy clients send bare {text}
+    if frame_type == "message":
+        await _handle_message(websocket, chat, user_id, frame)
+    elif frame_type == "typing":
+        await _handle_typing(websocket, room_id, user_id, frame)
+    elif frame_type == "read":
+        await _handle_read(websocket, room_id, user_id, frame)
+    elif frame_type == "ping":
+        await manager.send_personal_message('{"type":"pong"}', websocket)
+    else:
+        await _send_error(websocket, 400, f"Unknown frame type: {frame_type}")
+
+
+async def _announce_join(websocket: WebSocket, room_id: str, chat: dict, user_id: str):
+    await safe_call(presence_store.set_online(user_id))
+    manager.publish(room_id, {"type": "presence", "user_id": user_id, "online": True}, exclude=websocket)
+
+    # Snapshot for the newcomer so it never has to poll
+    peers = await safe_call(
+        presence_store.online_many(other_participants(chat, user_id)), default={}
+    )
+    for peer_id, online in peers.items():
+        await manager.send_personal_message(
+            json.dumps({"type": "presence", "user_id": peer_id, "online": online}), websocket
+        )
+
+
+async def _announce_leave(room_id: str, user_id: str):
+    if manager.has_user(user_id):
+        return  # Still connected elsewhere on this worker
+    await safe_call(presence_store.set_offline(user_id))
+    manager.publish(room_id, {"type": "presence", "user_id": user_id, "online": False})
 
 
 async def websocket_endpoint(websocket: WebSocket, room_id: str):
@@ -68,23 +303,26 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
     if not user_id:
         await websocket.close(code=4401)
         return
-    if not await _user_can_access_chat(room_id, user_id):
+    try:
+        chat_oid = ObjectId(room_id)
+    except InvalidId:
+        await websocket.close(code=4403)
+        return
+    chat = await chat_service.load_chat_for_participant(chat_oid, user_id)
+    if not chat:
         logging.info('{"event":"ws_access_denied","room_id":"%s"}', room_id[:8])
         await websocket.close(code=4403)
         return
 
-    await manager.connect(websocket, room_id)
+    await manager.connect(websocket, room_id, user_id)
     try:
+        await _announce_join(websocket, room_id, chat, user_id)
         while True:
             data = await websocket.receive_text()
-            message_data = json.loads(data)
-            await manager.broadcast_to_room({
-                "sender": message_data.get("sender", "user"),
-                "text": message_data.get("text", ""),
-                "timestamp": datetime.utcnow().isoformat()
-            }, room_id)
+            await _handle_client_frame(websocket, room_id, chat, user_id, data)
     except WebSocketDisconnect:
         manager.disconnect(websocket, room_id)
     except Exception as e:
         logging.error('{"event":"ws_error","error":"%s"}', str(e)[:100])
         manager.disconnect(websocket, room_id)
+    await _announce_leave(room_id, user_id)
@@ -0,0 +1,127 @@
+"""
+Load test: Lua sliding-window limiter vs the legacy INCR/EXPIRE/TTL fixed window,
+against a real Redis.
+
+Reports throughput, per-check latency, and Redis round trips per check, then
+checks correctness under concurrency: N parallel clients on one key must see
+exactly `limit` admissions.
+
+Usage (from backend/, with a local redis-server running):
+    python scripts/bench_rate_limiter.py
+    python scripts/bench_rate_limiter.py --url redis://localhost:6379/15 --checks 50000 --concurrency 200
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+import redis.asyncio as redis
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("SECRET_KEY", "bench-only-secret-key-not-used-for-anything")
+
+from app.services import rate_limiter  # noqa: E402
+
+# =============================================================================
+# LEGACY IMPLEMENTATION (for comparison)
+# =============================================================================
+
+async def legacy_check(client, key: str, max_requests: int, window_seconds: int):
+    count = await client.incr(key)
+    trips = 1
+    if count == 1:
+        await client.expire(key, window_seconds)
+        trips += 1
+    if count > max_requests:
+        await client.ttl(key)
+        trips += 1
+    return count <= max_requests, trips
+
+
+async def lua_check(client, key: str, max_requests: int, window_seconds: int):
+    state = await rate_limiter.acquire(key, max_requests, window_seconds, client=client)
+    return state.allowed, 1
+
+# =============================================================================
+# HARNESS
+# =============================================================================
+
+async def run(name, check, client, checks, concurrency, keys, limit, window):
+    latencies = []
+    trips = 0
+    admitted = 0
+    queue = iter(range(checks))
+
+    async def worker():
+        nonlocal trips, admitted
+        for i in queue:
+            start = time.perf_counter()
+            allowed, n = await check(client, f"bench:rl:{name}:{i % keys}", limit, window)
+            latencies.append(time.perf_counter() - start)
+            trips += n
+            admitted += allowed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"{name:>8}: {checks / elapsed:>9,.0f} checks/s | "
+        f"p50 {statistics.median(latencies) * 1000:6.2f} ms | "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:6.2f} ms | "
+        f"{trips / checks:.2f} round trips/check | admitted {admitted}/{checks}"
+    )
+
+
+async def verify_concurrency(client, limit: int, clients: int):
+    key = "bench:rl:race"
+    await client.delete(key)
+    results = await asyncio.gather(*(
+        rate_limiter.acquire(key, limit, 60, client=client) for _ in range(clients)
+    ))
+    admitted = sum(r.allowed for r in results)
+    lowest = min(r.remaining for r in results)
+    status = "OK" if admitted == limit and lowest == 0 else "FAIL"
+    print(f"concurrency: {clients} parallel checks, limit {limit} -> admitted {admitted}, min remaining {lowest} [{status}]")
+    await client.delete(key)
+    return status == "OK"
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.environ.get("REDIS_URL", "redis://localhost:6379/15"))
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--keys", type=int, default=1000, help="Distinct identifiers")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--window", type=int, default=60)
+    args = parser.parse_args()
+
+    # Blocking pool: the correctness check runs concurrency * 5 clients at once, and a plain
+    # pool raises "Too many connections" instead of waiting for a free one
+    pool = redis.BlockingConnectionPool.from_url(
+        args.url, decode_responses=True, max_connections=args.concurrency, timeout=None
+    )
+    client = redis.Redis(connection_pool=pool)
+    try:
+        await client.ping()
+        async for key in client.scan_iter("bench:rl:*"):
+            await client.delete(key)
+
+        await run("legacy", legacy_check, client, args.checks, args.concurrency, args.keys, args.limit, args.window)
+        await run("lua", lua_check, client, args.checks, args.concurrency, args.keys, args.limit, args.window)
+        ok = await verify_concurrency(client, args.limit, args.concurrency * 5)
+
+        async for key in client.scan_iter("bench:rl:*"):
+            await client.delete(key)
+    finally:
+        await client.close()
+        await pool.disconnect()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,203 @@
+"""
+Benchmark + regression check: single-pass rule extractor vs the legacy extractor
+it replaced (the real baseline), and vs the legacy approach stretched to the same
+vocabulary.
+
+Runs the regression table first (experience parsing against the old regex, plus
+the location rules); exits 1 on any mismatch.
+
+Usage (from backend/):
+    python scripts/bench_rule_extractor.py
+    python scripts/bench_rule_extractor.py --sizes 1000 10000 50000 --repeat 50
+"""
+import os
+import re
+import sys
+import random
+import argparse
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import rule_extractor  # noqa: E402
+
+# =============================================================================
+# LEGACY IMPLEMENTATION (verbatim, for comparison)
+# =============================================================================
+
+def legacy_extract(transcript):
+    text = transcript.lower()
+
+    role_map = {
+        "driver": ["driving", "truck", "vehicle", "license", "hmv", "lmv", "delivery"],
+        "developer": ["software", "code", "python", "java", "react", "programming"],
+        "mechanic": ["repair", "engine", "maintenance", "technician"],
+        "sales": ["selling", "customer", "retail", "marketing"],
+        "nurse": ["patient", "medical", "hospital", "care"]
+    }
+
+    detected_role = "Candidate"
+    max_matches = 0
+
+    for role, keywords in role_map.items():
+        matches = sum(1 for k in keywords if k in text)
+        if matches > max_matches:
+            max_matches = matches
+            detected_role = role.title()
+
+    exp_match = re.search(r'(\d+)\+?\s*(?:years?|yrs?)', text)
+    experience = float(exp_match.group(1)) if exp_match else 0.0
+
+    common_skills = [
+        "driving", "maintenance", "repair", "safety", "logistics",
+        "python", "javascript", "react", "sql", "aws", "docker",
+        "sales", "communication", "management", "excel"
+    ]
+
+    found_skills = [s.title() for s in common_skills if s in text]
+
+    summary = f"{detected_role} with {experience} years experience."
+    if found_skills:
+        summary += f" Skilled in {', '.join(found_skills[:3])}."
+
+    return {
+        "roleTitle": detected_role,
+        "skills": found_skills or ["General"],
+        "experienceYears": experience,
+        "summary": summary,
+        "location": "Unknown"
+    }
+
+def legacy_full_vocabulary(transcript):
+    """
+    The legacy approach (one `in` scan per keyword) stretched to the vocabulary the
+    new engine covers: every role keyword, skill and gazetteer alias. This is what
+    adding locations the old way would cost.
+    """
+    text = transcript.lower()
+    return [phrase for phrase in VOCABULARY if phrase in text]
+
+VOCABULARY = sorted(
+    {k for ks in rule_extractor.ROLE_KEYWORDS.values() for k in ks}
+    | set(rule_extractor.SKILLS)
+    | set(rule_extractor.LOCATIONS)
+)
+
+# =============================================================================
+# CORPUS
+# =============================================================================
+
+SENTENCES = [
+    "I have been driving heavy trucks for {n} years across {city}.",
+    "I know basic engine repair and vehicle maintenance.",
+    "I hold an HMV license and did delivery work in {city}.",
+    "I write Python and React code for a software company in {city}.",
+    "My customer handling and retail selling skills are strong.",
+    "I worked in a hospital taking care of patients for {n} yrs.",
+    "Safety and logistics matter a lot in my current role.",
+    "Good communication, Excel and team management experience.",
+    "Hello, thank you for the opportunity, I am looking for a stable job.",
+]
+CITIES = ["Hyderabad", "Bangalore", "Pune", "Chennai", "navi  mumbai", "Bengaluru"]
+
+# Small talk: few keyword hits, so every legacy `in` scan runs to the end of the text
+SMALL_TALK = [
+    "Hello, thank you for the opportunity, I am looking for a stable job.",
+    "I finished my schooling and I am ready to start immediately.",
+    "My family lives nearby and I can join from next month.",
+    "I can work night shifts and weekends if needed.",
+]
+
+# One candidate talks about one trade: a few keywords hit, most of the rest never appear
+DRIVER = SENTENCES[:3] + SMALL_TALK
+
+CORPORA = {"one role (typical)": DRIVER, "every role (dense)": SENTENCES, "small talk (sparse)": SMALL_TALK}
+
+def make_transcript(size: int, rng: random.Random, sentences=SENTENCES) -> str:
+    parts, length = [], 0
+    while length < size:
+        s = rng.choice(sentences).format(n=rng.randint(1, 15), city=rng.choice(CITIES))
+        parts.append(s)
+        length += len(s) + 1
+    return " ".join(parts)[:size]
+
+# =============================================================================
+# REGRESSION TABLE
+# =============================================================================
+# (transcript, expected experienceYears, expected location). Experience must match
+# the old regex wherever the old regex found a number; the rows marked "new" are
+# cases it could not parse.
+
+REGRESSION_CASES = [
+    ("I have 3 years.", 3.0, "Unknown"),
+    ("I have 3 years", 3.0, "Unknown"),
+    ("5yrs of driving", 5.0, "Unknown"),
+    ("8+ years, trucks", 8.0, "Unknown"),
+    ("10 yrs. Then 2 years more", 10.0, "Unknown"),
+    ("Driving for 4 year\nin Pune.", 4.0, "Pune"),
+    ("I drive trucks and live in Pune.", 0.0, "Pune"),
+    ("Worked in Hyderabad. Moved to Bengaluru. Bangalore since.", 0.0, "Bangalore"),
+    ("two years... in Navi   Mumbai.", 2.0, "Navi Mumbai"),                # new: number words
+    ("I have 2.5 years", 2.5, "Unknown"),                                   # new: old regex gave 5
+    ("My name is Anand, I drive trucks in Pune", 0.0, "Pune"),
+    ("I live in Salem, near Erode.", 0.0, "Salem"),
+    ("Erode trust? Never. Kota is my cousin.", 0.0, "Unknown"),
+    ("Remote area delivery, I can work from home", 0.0, "Remote"),
+    ("storyears 7", 0.0, "Unknown"),
+]
+
+def check_regressions() -> bool:
+    ok = True
+    print(f"{'transcript':<58} {'old exp':>7} {'exp':>5} {'location':<12} ok")
+    for text, years, location in REGRESSION_CASES:
+        old, new = legacy_extract(text), rule_extractor.extract(text)
+        passed = new["experienceYears"] == years and new["location"] == location
+        ok &= passed
+        print(f"{text[:58]!r:<58} {old['experienceYears']:>7} {new['experienceYears']:>5} "
+              f"{new['location']:<12} {'OK' if passed else 'FAIL (want ' + repr((years, location)) + ')'}")
+    return ok
+
+# =============================================================================
+# RUN
+# =============================================================================
+
+def bench(fn, text: str, repeat: int) -> float:
+    fn(text)  # Warm up
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        runs.append(time.perf_counter() - start)
+    return min(runs) * 1000  # Least disturbed run; medians swing on a shared machine
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    ok = check_regressions()
+
+    print(f"\nVocabulary: {len(VOCABULARY)} phrases (roles + skills + gazetteer)")
+    for corpus, sentences in CORPORA.items():
+        print(f"\n[{corpus}]")
+        print(f"{'chars':>8} {'legacy ms':>10} {'single-pass ms':>15} {'vs legacy':>10} {'legacy@vocab ms':>16}  location")
+        for size in args.sizes:
+            text = make_transcript(size, rng, sentences)
+            old_ms = bench(legacy_extract, text, args.repeat)
+            new_ms = bench(rule_extractor.extract, text, args.repeat)
+            wide_ms = bench(legacy_full_vocabulary, text, args.repeat)
+            print(f"{size:>8} {old_ms:>10.3f} {new_ms:>15.3f} {old_ms / new_ms:>9.2f}x {wide_ms:>16.3f}  "
+                  f"{rule_extractor.extract(text)['location']}")
+
+    print("\nlegacy: the extractor this replaced. ~30 substring scans + one regex: cheap when every keyword")
+    print("  is found early (dense), a full scan per missing keyword otherwise (typical, sparse). No locations,")
+    print("  matches inside words ('care' in 'scared'), '2.5 years' -> 5.")
+    print("single-pass: one tokenize + set intersection; cost tracks length, not vocabulary or content.")
+    print("legacy@vocab: the legacy approach covering what the new engine covers.")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+"""
+Synthetic dataset generator: seekers, employers, profiles, jobs, applications and
+chats, bulk-loaded straight into Mongo (insert_many from parallel worker processes).
+
+Reproducible: documents (including _ids and timestamps) depend only on --seed and
+--scale, never on --workers or --batch-size, so benchmark runs are comparable.
+The printed fingerprint is a hash over every generated document.
+
+Roles, companies and localities come from the Bangalore/Hyderabad templates used by
+seed_jobs.py and scripts/reality_engine_proving.py. Seekers apply to jobs of their
+own role family, so feeds, matching and applications look like real traffic.
+
+Usage (from backend/):
+    python scripts/generate_dataset.py --scale 10k --drop
+    python scripts/generate_dataset.py --scale 1m --workers 8 --db hire_bench --drop
+    python scripts/generate_dataset.py --scale 100k --dry-run     # Generate + fingerprint only
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import multiprocessing
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+import bson
+from bson import ObjectId
+from pymongo import MongoClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# =============================================================================
+# ROLE TEMPLATES (Bangalore / Hyderabad)
+# =============================================================================
+
+BANGALORE = ["Indiranagar", "Whitefield", "Hebbal", "Koramangala", "Electronic City", "Jayanagar",
+             "Brigade Road", "HSR Layout", "Bellandur", "Peenya", "Marathahalli", "Yelahanka"]
+HYDERABAD = ["Gachibowli", "Madhapur", "Hitech City", "Kukatpally", "Secunderabad", "Banjara Hills",
+             "Begumpet", "Uppal", "Kondapur", "LB Nagar"]
+LOCALITIES = [f"{area}, Bangalore" for area in BANGALORE] + [f"{area}, Hyderabad" for area in HYDERABAD]
+
+# title, companies, (min, max) monthly salary, required skills, extra skills, (min, max) years, remote, description
+ROLE_TEMPLATES: List[Dict[str, Any]] = [
+    {"title": "Delivery Driver (Bike)", "companies": ["Swiggy Instamart", "Zepto", "Blinkit", "Dunzo"],
+     "salary": (18000, 26000), "skills": ["Two-wheeler", "License", "Navigation"],
+     "extra": ["English", "Customer Service", "Night Shift", "Smartphone"], "years": (0, 3), "remote": False,
+     "description": "Deliver groceries within 10 mins. Must have own bike and DL. Shift: 6pm - 2am."},
+    {"title": "Warehouse Picker / Packer", "companies": ["Amazon FLX", "Flipkart", "BigBasket", "Meesho"],
+     "salary": (16000, 22000), "skills": ["Packing", "Heavy Lifting"],
+     "extra": ["Night Shift", "Inventory", "Forklift"], "years": (0, 2), "remote": False,
+     "description": "Pick and pack items for dispatch. Transport provided. Night shift allowance extra."},
+    {"title": "Heavy Vehicle Driver", "companies": ["Logistics Pro", "Porter", "VRL Logistics", "Delhivery"],
+     "salary": (25000, 35000), "skills": ["Driving", "Heavy License"],
+     "extra": ["Vehicle Maintenance", "Navigation", "Night Shift", "Loading"], "years": (3, 8), "remote": False,
+     "description": "Looking for experienced heavy vehicle driver. Night shifts required."},
+    {"title": "Construction Helper", "companies": ["L&T Construction", "Prestige Group", "Sobha", "My Home"],
+     "salary": (14000, 18000), "skills": ["Physical Labor", "Safety Awareness"],
+     "extra": ["Masonry", "Scaffolding", "Heavy Lifting"], "years": (0, 3), "remote": False,
+     "description": "Assist masons and move materials. Day shift only. Helmet provided."},
+    {"title": "Electrician", "companies": ["Urban Company", "Housejoy", "Local Contractor"],
+     "salary": (25000, 40000), "skills": ["Wiring", "Electrical Repair"],
+     "extra": ["Safety Certified", "Two-wheeler", "Solar Installation"], "years": (2, 10), "remote": False,
+     "description": "Visit customer homes for repairs. Must have own tools and bike."},
+    {"title": "Security Guard", "companies": ["SIS Security", "G4S", "Tops Security"],
+     "salary": (15000, 20000), "skills": ["Security", "Gate Management"],
+     "extra": ["Night Shift", "CCTV Monitoring", "First Aid"], "years": (0, 5), "remote": False,
+     "description": "Gate duty for IT park. 12 hour shift. Uniform provided."},
+    {"title": "Restaurant Cook (South Indian)", "companies": ["Rameshwaram Cafe", "Chutneys", "Paradise Biryani", "MTR"],
+     "salary": (22000, 35000), "skills": ["Cooking", "South Indian Cuisine"],
+     "extra": ["High Volume", "Hygiene", "Tandoor", "Biryani"], "years": (2, 10), "remote": False,
+     "description": "Head cook for dosa station. Must handle morning rush."},
+    {"title": "Retail Sales Associate", "companies": ["ZARA", "Reliance Trends", "Lifestyle", "DMart"],
+     "salary": (18000, 30000), "skills": ["Sales", "Customer Service"],
+     "extra": ["English", "Fashion", "Billing", "Telugu", "Kannada"], "years": (0, 4), "remote": False,
+     "description": "Assist customers and manage inventory. Good grooming mandatory."},
+    {"title": "Salon Worker (Unisex)", "companies": ["Looks Salon", "Naturals", "Green Trends"],
+     "salary": (18000, 28000), "skills": ["Hair Cutting", "Customer Service"],
+     "extra": ["Shaving", "Hair Coloring", "Facial"], "years": (1, 6), "remote": False,
+     "description": "Experienced barber/stylist needed. Commission on products extra."},
+    {"title": "Warehouse Manager", "companies": ["QuickCommerce", "Amazon", "Flipkart", "Udaan"],
+     "salary": (40000, 60000), "skills": ["Management", "Inventory Control"],
+     "extra": ["Team Leadership", "Excel", "SAP"], "years": (3, 10), "remote": False,
+     "description": "Manage inventory and staff. 3+ years experience required."},
+    {"title": "Operations Manager", "companies": ["Logistics Cohort", "Rapido", "Shadowfax"],
+     "salary": (45000, 70000), "skills": ["Logistics", "Team Management"],
+     "extra": ["Excel", "Kannada", "Telugu", "Reporting"], "years": (3, 10), "remote": False,
+     "description": "Manage fleet of 50 drivers. Must verify routes."},
+    {"title": "Graphic Designer", "companies": ["Creative Studio", "Pixel Works", "Brand Lab"],
+     "salary": (30000, 60000), "skills": ["Photoshop", "Illustrator"],
+     "extra": ["Social Media", "Figma", "Canva"], "years": (1, 5), "remote": True,
+     "description": "Design social media posts for brands. Portfolio required."},
+    {"title": "Video Editor", "companies": ["YouTuber Team", "Media House", "Content Factory"],
+     "salary": (30000, 50000), "skills": ["Premiere Pro", "After Effects"],
+     "extra": ["YouTube", "DaVinci Resolve", "Color Grading"], "years": (1, 5), "remote": True,
+     "description": "Edit 2 vlogs per week. Fast turnaround needed."},
+    {"title": "Backend Engineer", "companies": ["Tech Unicorn", "TechCorp", "Fintech Corp"],
+     "salary": (80000, 150000), "skills": ["Python", "FastAPI"],
+     "extra": ["MongoDB", "AWS", "PostgreSQL", "Docker", "Redis"], "years": (2, 8), "remote": True,
+     "description": "Building APIs with FastAPI/Django. Must have system design experience."},
+    {"title": "React Developer", "companies": ["TechCorp", "Startup Inc", "Product Labs"],
+     "salary": (50000, 100000), "skills": ["React", "JavaScript"],
+     "extra": ["TypeScript", "Redux", "Node", "CSS"], "years": (1, 6), "remote": True,
+     "description": "Need someone who knows React and TypeScript. Available during IST hours."},
+    {"title": "Data Analyst", "companies": ["Fintech Corp", "Analytics Co", "Retail Insights"],
+     "salary": (50000, 80000), "skills": ["SQL", "Excel"],
+     "extra": ["Tableau", "Python", "Power BI"], "years": (1, 5), "remote": False,
+     "description": "Analyze transaction data. Day shift."},
+]
+
+LEVELS = ["entry", "intermediate", "advanced", "expert"]
+CHAT_LINES = [
+    ("employee", "Hi, I applied for this role. Is it still open?"),
+    ("employer", "Yes! Can you come for a quick interview this week?"),
+    ("employee", "Sure, what time works?"),
+    ("employer", "Tomorrow 11am at our office. Bring your ID."),
+    ("employee", "Okay, I will be there."),
+    ("employer", "Great. Please share your current salary."),
+    ("employee", "Currently getting 20k per month."),
+    ("employer", "Noted. See you tomorrow."),
+]
+
+# =============================================================================
+# DATASET PLAN (Counts + Deterministic IDs)
+# =============================================================================
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+CHUNK = 5_000  # Entities per task; fixed so output doesn't depend on --workers
+
+# Kind byte inside generated ObjectIds: same entity => same _id on every run
+KIND_SEEKER, KIND_EMPLOYER, KIND_JOB, KIND_PROFILE, KIND_APPLICATION, KIND_CHAT, KIND_MESSAGE = range(1, 8)
+BASE_TIME = datetime(2026, 1, 1)
+EPOCH = datetime(1970, 1, 1)
+HISTORY_DAYS = 180
+
+
+def plan(scale: int, apps_per_seeker: int) -> Dict[str, int]:
+    return {
+        "seekers": scale,
+        "employers": max(1, scale // 20),
+        "jobs": scale,
+        "profiles": scale,
+        "applications": scale * apps_per_seeker,
+    }
+
+
+def oid(kind: int, index: int, at: datetime) -> ObjectId:
+    """Timestamp (like a real ObjectId) + kind + index: unique and reproducible."""
+    return ObjectId(f"{int((at - EPOCH).total_seconds()) & 0xFFFFFFFF:08x}{kind:02x}{index:014x}")
+
+
+def _mix(seed: int, index: int, salt: int) -> int:
+    """Cheap stable hash (Python's hash() is randomized per process)."""
+    x = (index * 0x9E3779B1 + seed * 0x85EBCA77 + salt * 0xC2B2AE3D) & 0xFFFFFFFF
+    x ^= x >> 15
+    x = (x * 0x2C1B3C6D) & 0xFFFFFFFF
+    return x ^ (x >> 12)
+
+
+def _at(seed: int, index: int, salt: int) -> datetime:
+    return BASE_TIME - timedelta(seconds=_mix(seed, index, salt) % (HISTORY_DAYS * 86400))
+
+
+def seeker_template(seed: int, seeker: int) -> int:
+    return _mix(seed, seeker, 1) % len(ROLE_TEMPLATES)
+
+
+def seeker_id(seed: int, i: int) -> ObjectId:
+    return oid(KIND_SEEKER, i, _at(seed, i, KIND_SEEKER))
+
+
+def employer_id(seed: int, i: int) -> ObjectId:
+    return oid(KIND_EMPLOYER, i, _at(seed, i, KIND_EMPLOYER))
+
+
+def job_id(seed: int, j: int) -> ObjectId:
+    return oid(KIND_JOB, j, _at(seed, j, KIND_JOB))
+
+# =============================================================================
+# GENERATORS (One Chunk of One Entity Type -> Documents per Collection)
+# =============================================================================
+
+def gen_users(seed: int, counts: Dict[str, int], start: int, end: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Indexes [0, seekers) are seekers; the rest are employers."""
+    for i in range(start, end):
+        if i < counts["seekers"]:
+            _id, identifier, role = seeker_id(seed, i), f"+9190{i:08d}", "employee"
+        else:
+            e = i - counts["seekers"]
+            _id, identifier, role = employer_id(seed, e), f"employer{e:07d}@seed.hire.test", "employer"
+        created = _id.generation_time.replace(tzinfo=None)
+        yield "users", {
+            "_id": _id,
+            "identifier": identifier,
+            "role": role,
+            "is_active": True,
+            "created_at": created.isoformat(),
+            "last_login": (created + timedelta(days=_mix(seed, i, 9) % 30)).isoformat(),
+            "seeded": True,
+        }
+
+
+def gen_jobs(seed: int, counts: Dict[str, int], start: int, end: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(f"{seed}:jobs:{start}")
+    for j in range(start, end):
+        template = ROLE_TEMPLATES[j % len(ROLE_TEMPLATES)]  # Job j belongs to role family j % T
+        low, high = template["salary"]
+        min_salary = int(rng.uniform(low, (low + high) / 2) // 500 * 500)
+        remote = template["remote"] and rng.random() < 0.6
+        _id = job_id(seed, j)
+        yield "jobs", {
+            "_id": _id,
+            "title": template["title"],
+            "company": rng.choice(template["companies"]),
+            "location": "Remote" if remote else rng.choice(LOCALITIES),
+            "minSalary": min_salary,
+            "maxSalary": int(rng.uniform(max(min_salary, (low + high) / 2), high) // 500 * 500),
+            "skills": template["skills"] + rng.sample(template["extra"], rng.randint(0, 2)),
+            "experience_required": rng.randint(*template["years"]),
+            "remote": remote,
+            "description": template["description"],
+            "status": "active" if rng.random() < 0.9 else "closed",
+            "employer_id": str(employer_id(seed, j % counts["employers"])),
+            "posted_at": _id.generation_time.replace(tzinfo=None),
+            "seeded": True,
+        }
+
+
+def gen_profiles(seed: int, counts: Dict[str, int], start: int, end: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(f"{seed}:profiles:{start}")
+    for i in range(start, end):
+        template = ROLE_TEMPLATES[seeker_template(seed, i)]
+        years = round(rng.uniform(template["years"][0], template["years"][1] + 2), 1)
+        skills = rng.sample(template["skills"], rng.randint(1, len(template["skills"])))
+        skills += rng.sample(template["extra"], rng.randint(0, min(3, len(template["extra"]))))
+        location = rng.choice(LOCALITIES)
+        created = _at(seed, i, KIND_PROFILE)
+        yield "profiles", {
+            "_id": oid(KIND_PROFILE, i, created),
+            "user_id": str(seeker_id(seed, i)),
+            "roleTitle": template["title"],
+            "target_role": template["title"],
+            "location": location,
+            "experienceYears": years,
+            "experience_detail": {"years": years, "type": rng.choice(["production", "production", "freelance"])},
+            "salary_expectations": str(int(rng.uniform(*template["salary"]) // 1000 * 1000)),
+            "skills": skills,
+            "skill_entries": [{"name": s, "level": rng.choice(LEVELS)} for s in skills],
+            "summary": f"Experienced {template['title']} in {location}.",
+            "remote_work_preference": template["remote"] and rng.random() < 0.5,
+            "video_id": None,
+            "source": "manual",
+            "active": True,
+            "isDefault": True,
+            "created_at": created,
+            "seeded": True,
+        }
+
+
+def gen_applications(seed: int, counts: Dict[str, int], start: int, end: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """start/end are seeker indexes: each seeker applies to jobs of its own role family."""
+    rng = random.Random(f"{seed}:applications:{start}")
+    families = len(ROLE_TEMPLATES)
+    per_seeker = counts["applications"] // counts["seekers"]
+    for i in range(start, end):
+        family = seeker_template(seed, i)
+        family_size = len(range(family, counts["jobs"], families))
+        if family_size == 0:
+            continue
+        user_id = str(seeker_id(seed, i))
+        for n, m in enumerate(rng.sample(range(family_size), min(per_seeker, family_size))):
+            j = family + m * families
+            a = i * per_seeker + n
+            posted = _at(seed, j, KIND_JOB)  # Applied some time after the job was posted
+            created = posted + timedelta(seconds=_mix(seed, a, KIND_APPLICATION) % max(1, int((BASE_TIME - posted).total_seconds())))
+            status = rng.choices(["requested", "accepted", "rejected"], weights=[60, 25, 15])[0]
+            application = {
+                "_id": oid(KIND_APPLICATION, a, created),
+                "job_id": str(job_id(seed, j)),
+                "user_id": user_id,
+                "employer_id": str(employer_id(seed, j % counts["employers"])),
+                "status": status,
+                "created_at": created,
+                "seeded": True,
+            }
+            if status != "requested":
+                application["updated_at"] = (created + timedelta(hours=rng.randint(1, 72))).isoformat()
+            if status == "accepted":
+                chat = _chat(rng, a, application)
+                application["chat_id"] = str(chat["_id"])
+                yield "chats", chat
+            yield "applications", application
+
+
+def _chat(rng: random.Random, a: int, application: Dict[str, Any]) -> Dict[str, Any]:
+    opened = datetime.fromisoformat(application["updated_at"])
+    messages = []
+    at = opened
+    for k in range(rng.randint(0, len(CHAT_LINES))):
+        role, text = CHAT_LINES[k]
+        at += timedelta(minutes=rng.randint(1, 240))
+        messages.append({
+            "id": str(oid(KIND_MESSAGE, a * 16 + k, at)),
+            "sender_id": application["user_id"] if role == "employee" else application["employer_id"],
+            "role": role,
+            "text": text,
+            "timestamp": at.isoformat(),
+        })
+    chat = {
+        "_id": oid(KIND_CHAT, a, opened),
+        "application_id": str(application["_id"]),
+        "job_id": application["job_id"],
+        "user_id": application["user_id"],
+        "employer_id": application["employer_id"],
+        "messages": messages,
+        "created_at": opened.isoformat(),
+        "updated_at": at.isoformat(),
+        "seeded": True,
+    }
+    if messages:
+        chat["last_message"] = messages[-1]["text"]
+    return chat
+
+
+GENERATORS = {
+    "users": (gen_users, lambda c: c["seekers"] + c["employers"]),
+    "jobs": (gen_jobs, lambda c: c["jobs"]),
+    "profiles": (gen_profiles, lambda c: c["profiles"]),
+    "applications": (gen_applications, lambda c: c["seekers"]),  # Also writes chats
+}
+COLLECTIONS = ["users", "jobs", "profiles", "applications", "chats"]
+
+# =============================================================================
+# WORKERS (One Mongo Client per Process, insert_many in Batches)
+# =============================================================================
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(mongo_url: str, db_name: str, batch_size: int, dry_run: bool) -> None:
+    _worker["db"] = None if dry_run else MongoClient(mongo_url, w=1)[db_name]
+    _worker["batch_size"] = batch_size
+
+
+def _run_chunk(task: Tuple[str, int, Dict[str, int], int, int]) -> Tuple[str, int, Dict[str, int], str]:
+    name, seed, counts, start, end = task
+    generator = GENERATORS[name][0]
+    db = _worker["db"]
+    batch_size = _worker["batch_size"]
+    buffers: Dict[str, List[Dict[str, Any]]] = {}
+    inserted: Dict[str, int] = {}
+    digest = hashlib.sha256()
+
+    def flush(collection: str) -> None:
+        docs = buffers.pop(collection, [])
+        if docs and db is not None:
+            db[collection].insert_many(docs, ordered=False, bypass_document_validation=True)
+
+    for collection, doc in generator(seed, counts, start, end):
+        digest.update(bson.encode(doc))
+        inserted[collection] = inserted.get(collection, 0) + 1
+        buffer = buffers.setdefault(collection, [])
+        buffer.append(doc)
+        if len(buffer) >= batch_size:
+            flush(collection)
+    for collection in list(buffers):
+        flush(collection)
+    return name, start, inserted, digest.hexdigest()
+
+
+def build_tasks(seed: int, counts: Dict[str, int]) -> List[Tuple[str, int, Dict[str, int], int, int]]:
+    tasks = []
+    for name, (_, total) in GENERATORS.items():
+        n = total(counts)
+        tasks.extend((name, seed, counts, start, min(start + CHUNK, n)) for start in range(0, n, CHUNK))
+    return tasks
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+async def create_app_indexes() -> None:
+    """The app's own index set, built once after the bulk load (cheaper than per insert)."""
+    from app.db.mongo import mongo_db
+    await mongo_db.connect()
+    mongo_db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k", help="Seekers and jobs (employers = scale/20)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--apps-per-seeker", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Processes; 1 = inline")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Documents per insert_many")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", "hire_app_db"))
+    parser.add_argument("--drop", action="store_true", help="Drop the target collections first")
+    parser.add_argument("--dry-run", action="store_true", help="Generate and fingerprint without writing")
+    args = parser.parse_args()
+
+    counts = plan(SCALES[args.scale], args.apps_per_seeker)
+    print(f"📦 Dataset {args.scale} (seed {args.seed}): " + ", ".join(f"{k}={v:,}" for k, v in counts.items()))
+
+    if not args.dry_run:
+        db = MongoClient(args.mongo_url)[args.db]
+        if args.drop:
+            for name in COLLECTIONS:
+                db[name].drop()
+            print(f"🔥 Dropped {', '.join(COLLECTIONS)} in {args.db}")
+        else:
+            occupied = [name for name in COLLECTIONS if db[name].estimated_document_count()]
+            if occupied:
+                sys.exit(f"❌ {', '.join(occupied)} not empty in {args.db}; use --drop or another --db")
+
+    tasks = build_tasks(args.seed, counts)
+    totals: Dict[str, int] = {}
+    digests: Dict[Tuple[str, int], str] = {}
+    started = time.perf_counter()
+
+    worker_args = (args.mongo_url, args.db, args.batch_size, args.dry_run)
+    if args.workers <= 1:
+        _init_worker(*worker_args)
+        results = map(_run_chunk, tasks)
+    else:
+        pool = multiprocessing.get_context("spawn").Pool(args.workers, _init_worker, worker_args)
+        results = pool.imap_unordered(_run_chunk, tasks)
+
+    done = 0
+    for name, start, inserted, digest in results:
+        digests[(name, start)] = digest
+        for collection, n in inserted.items():
+            totals[collection] = totals.get(collection, 0) + n
+        done += 1
+        if done % 20 == 0 or done == len(tasks):
+            elapsed = time.perf_counter() - started
+            print(f"   {done}/{len(tasks)} chunks | {sum(totals.values()):,} docs | "
+                  f"{sum(totals.values()) / elapsed:,.0f} docs/s")
+    if args.workers > 1:
+        pool.close()
+        pool.join()
+    load_seconds = time.perf_counter() - started
+
+    fingerprint = hashlib.sha256("".join(digests[k] for k in sorted(digests)).encode()).hexdigest()[:16]
+    print(f"✅ {'Generated' if args.dry_run else 'Loaded'} {sum(totals.values()):,} docs in {load_seconds:.1f}s "
+          f"({sum(totals.values()) / load_seconds:,.0f} docs/s) | fingerprint {fingerprint}")
+    for collection in COLLECTIONS:
+        print(f"   - {collection}: {totals.get(collection, 0):,}")
+
+    if not args.dry_run:
+        os.environ["MONGO_URL"], os.environ["DB_NAME"] = args.mongo_url, args.db
+        os.environ.setdefault("SECRET_KEY", "dataset-generator-only-secret-key-unused")
+        started = time.perf_counter()
+        asyncio.run(create_app_indexes())
+        print(f"🗂️ Indexes built in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
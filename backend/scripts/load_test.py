@@ -0,0 +1,463 @@
+"""
+Async load generator for the whole API: simulated seekers and employers running
+the real flows concurrently, driven by open-loop arrival rates.
+
+Flows
+    setup     employers log in (OTP) and post jobs from the dataset role templates
+    seeker    OTP login -> create profile -> job feed (miss, then hit) -> apply ->
+              poll applications until accepted -> chat over WebSocket (echo-acked)
+    employer  OTP login (pool account) -> list applications -> accept requested ones
+              -> first message over REST
+
+Open loop: sessions start on a Poisson (or fixed) schedule whatever the server's
+response times, so a slow server faces a growing backlog instead of a politely
+slowing client. Arrivals beyond --max-sessions are counted as dropped, never delayed.
+
+The report (JSON) has per-endpoint counts, status codes, error rates and latency
+percentiles, plus arrival lag and session outcomes.
+
+Server under test (local Mongo + Redis), from backend/:
+    DEBUG=true RATE_LIMIT_ENABLED=false LOAD_SHED_ENABLED=false uvicorn app.main:app --port 8000
+(DEBUG enables the 123456 OTP bypass; the limits would otherwise throttle one client IP.)
+Accounts are namespaced per run (lt-<run_id>-...@load.test); scripts/reset_db.py wipes them.
+
+Usage (from backend/):
+    python scripts/load_test.py --seeker-rate 20 --employer-rate 2 --duration 60
+    python scripts/load_test.py --seeker-rate 50 --duration 120 --report load_report.json --fail-on-error-rate 0.01
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+try:
+    import httpx
+    import websockets
+except ImportError as e:
+    sys.exit(f"❌ {e.name} is required: pip install httpx websockets")
+
+sys.path.append(os.path.dirname(__file__))
+
+from generate_dataset import ROLE_TEMPLATES, LOCALITIES  # noqa: E402
+
+OTP_BYPASS = "123456"
+
+# =============================================================================
+# RECORDER (Per-Endpoint Latency, Status Codes, Errors)
+# =============================================================================
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.failures: Counter = Counter()
+
+    def observe(self, label: str, seconds: float, status: Any, ok: bool, error: Optional[str] = None) -> None:
+        self.latencies[label].append(seconds)
+        self.statuses[label][str(status)] += 1
+        if not ok:
+            self.failures[label] += 1
+            if error:
+                self.errors[label][error[:120]] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        for label in sorted(self.latencies):
+            values = sorted(self.latencies[label])
+            count = len(values)
+            endpoints[label] = {
+                "count": count,
+                "rps": round(count / elapsed, 2) if elapsed else 0.0,
+                "errors": self.failures[label],
+                "error_rate": round(self.failures[label] / count, 4) if count else 0.0,
+                "status": dict(self.statuses[label]),
+                "latency_ms": {
+                    "mean": round(sum(values) / count * 1000, 2) if count else 0.0,
+                    "p50": round(percentile(values, 0.50) * 1000, 2),
+                    "p90": round(percentile(values, 0.90) * 1000, 2),
+                    "p95": round(percentile(values, 0.95) * 1000, 2),
+                    "p99": round(percentile(values, 0.99) * 1000, 2),
+                    "max": round(values[-1] * 1000, 2) if values else 0.0,
+                },
+                "top_errors": dict(self.errors[label].most_common(5)),
+            }
+        return endpoints
+
+    def totals(self):
+        """Requests and failed requests; whole-session timings aren't requests."""
+        labels = [label for label in self.latencies if not label.startswith("session ")]
+        return sum(len(self.latencies[label]) for label in labels), sum(self.failures[label] for label in labels)
+
+# =============================================================================
+# API CLIENT (One Pooled httpx Client, Every Call Timed)
+# =============================================================================
+
+class Api:
+    def __init__(self, base_url: str, ws_url: str, client: httpx.AsyncClient, recorder: Recorder, timeout: float):
+        self.base = base_url.rstrip("/")
+        self.ws_base = ws_url.rstrip("/")
+        self.client = client
+        self.recorder = recorder
+        self.timeout = timeout
+
+    async def call(self, label: str, method: str, path: str, token: Optional[str] = None,
+                   ok=(200,), **kwargs) -> Optional[Any]:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, f"{self.base}{path}", headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.observe(label, time.perf_counter() - start, type(e).__name__, False, repr(e))
+            return None
+        elapsed = time.perf_counter() - start
+        success = response.status_code in ok
+        self.recorder.observe(label, elapsed, response.status_code, success,
+                              None if success else f"{response.status_code}: {response.text[:100]}")
+        if not success:
+            return None
+        try:
+            return response.json() if response.content else {}
+        except ValueError:
+            return {}
+
+    async def login(self, identifier: str, role: str) -> Optional[Dict[str, Any]]:
+        sent = await self.call("POST /auth/send-otp", "POST", "/auth/send-otp", json={"identifier": identifier})
+        if sent is None:
+            return None
+        return await self.call("POST /auth/verify-otp", "POST", "/auth/verify-otp",
+                               json={"identifier": identifier, "otp": OTP_BYPASS, "role": role})
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+def job_payload(rng: random.Random, template: Dict[str, Any]) -> Dict[str, Any]:
+    low, high = template["salary"]
+    return {
+        "title": template["title"],
+        "company": rng.choice(template["companies"]),
+        "location": rng.choice(LOCALITIES),
+        "minSalary": low,
+        "maxSalary": high,
+        "skills": template["skills"] + template["extra"][:2],
+        "experience_required": template["years"][0],
+        "remote": template["remote"],
+        "description": template["description"],
+        "status": "active",
+    }
+
+
+def profile_payload(rng: random.Random, template: Dict[str, Any]) -> Dict[str, Any]:
+    location = rng.choice(LOCALITIES)
+    return {
+        "job_title": template["title"],
+        "location": location,
+        "experience_years": float(rng.randint(*template["years"]) + 1),
+        "salary_expectations": str(template["salary"][0]),
+        "skills": template["skills"] + rng.sample(template["extra"], min(2, len(template["extra"]))),
+        "summary": f"Experienced {template['title']} in {location}.",
+        "remote_work_preference": template["remote"],
+    }
+
+
+class LoadTest:
+    def __init__(self, api: Api, args, rng: random.Random):
+        self.api = api
+        self.args = args
+        self.rng = rng
+        self.run_id = uuid.uuid4().hex[:8]
+        self.employers: List[Dict[str, Any]] = []
+        self.sessions = Counter()
+        self.arrival_lag: List[float] = []
+        self.active = 0
+
+    # --- Setup ---
+
+    async def setup_employers(self) -> None:
+        semaphore = asyncio.Semaphore(20)
+
+        async def one(n: int):
+            async with semaphore:
+                auth = await self.api.login(f"lt-{self.run_id}-e{n}@load.test", "employer")
+                if not auth:
+                    return
+                token = auth["access_token"]
+                for k in range(self.args.jobs_per_employer):
+                    template = ROLE_TEMPLATES[(n * self.args.jobs_per_employer + k) % len(ROLE_TEMPLATES)]
+                    await self.api.call("POST /jobs/", "POST", "/jobs/", token, json=job_payload(self.rng, template))
+                self.employers.append({"n": n, "identifier": f"lt-{self.run_id}-e{n}@load.test", "token": token})
+
+        await asyncio.gather(*(one(n) for n in range(self.args.employers)))
+
+    # --- Seeker ---
+
+    async def seeker(self, n: int) -> bool:
+        api = self.api
+        auth = await api.login(f"lt-{self.run_id}-s{n}@load.test", "employee")
+        if not auth:
+            return False
+        token = auth["access_token"]
+
+        template = ROLE_TEMPLATES[n % len(ROLE_TEMPLATES)]
+        profile = await api.call("POST /profiles/", "POST", "/profiles/", token, json=profile_payload(self.rng, template))
+        if profile is None:
+            return False
+
+        feed = await api.call("GET /jobs/ (feed)", "GET", "/jobs/", token)
+        if feed is None:
+            return False
+        await api.call("GET /jobs/ (feed, cached)", "GET", "/jobs/", token)
+
+        for job in feed[:self.args.applies_per_seeker]:
+            await api.call("POST /jobs/{id}/apply", "POST", f"/jobs/{job['id']}/apply", token)
+
+        chat_id = await self._wait_for_chat(token)
+        if chat_id:
+            await self._chat_over_websocket(token, chat_id)
+        return True
+
+    async def _wait_for_chat(self, token: str) -> Optional[str]:
+        deadline = time.monotonic() + self.args.chat_wait
+        while time.monotonic() < deadline:
+            apps = await self.api.call("GET /applications/", "GET", "/applications/", token)
+            for application in apps or []:
+                if application.get("chatId"):
+                    return application["chatId"]
+            await asyncio.sleep(self.args.poll_interval)
+        return None
+
+    async def _chat_over_websocket(self, token: str, chat_id: str) -> None:
+        recorder = self.api.recorder
+        url = f"{self.api.ws_base}/ws/{chat_id}?token={token}"
+        start = time.perf_counter()
+        try:
+            socket = await asyncio.wait_for(websockets.connect(url), self.api.timeout)
+        except Exception as e:
+            recorder.observe("WS connect", time.perf_counter() - start, type(e).__name__, False, repr(e))
+            return
+        recorder.observe("WS connect", time.perf_counter() - start, 101, True)
+
+        try:
+            for k in range(self.args.ws_messages):
+                client_msg_id = uuid.uuid4().hex
+                sent = time.perf_counter()
+                await socket.send(json.dumps({
+                    "type": "message", "text": f"Load test message {k}", "role": "employee",
+                    "client_msg_id": client_msg_id
+                }))
+                try:
+                    # Acked when the committed message comes back through the room fan-out
+                    await asyncio.wait_for(self._await_echo(socket, client_msg_id), self.api.timeout)
+                    recorder.observe("WS message (commit + echo)", time.perf_counter() - sent, "ack", True)
+                except Exception as e:
+                    recorder.observe("WS message (commit + echo)", time.perf_counter() - sent,
+                                     type(e).__name__, False, repr(e))
+                    return
+        finally:
+            await socket.close()
+
+    @staticmethod
+    async def _await_echo(socket, client_msg_id: str) -> None:
+        while True:
+            frame = json.loads(await socket.recv())
+            if frame.get("client_msg_id") == client_msg_id:
+                if frame.get("type") == "error":
+                    raise RuntimeError(f"{frame.get('code')}: {frame.get('detail')}")
+                return
+
+    # --- Employer ---
+
+    async def employer(self, n: int) -> bool:
+        if not self.employers:
+            return False
+        account = self.rng.choice(self.employers)
+        api = self.api
+        # A fresh login per session, like a returning user on a new device
+        auth = await api.login(account["identifier"], "employer")
+        if not auth:
+            return False
+        token = auth["access_token"]
+
+        apps = await api.call("GET /applications/", "GET", "/applications/", token)
+        if apps is None:
+            return False
+        # The list mixes both sides; as an employer ours are the ones with someone else's candidateId
+        requested = [a for a in apps if a.get("status") == "requested" and a.get("candidateId") != auth["user_id"]]
+        for application in requested[:self.args.accepts_per_employer]:
+            result = await api.call("PATCH /applications/{id}/status", "PATCH", f"/applications/{application['id']}/status",
+                                    token, json={"status": "accepted"})
+            if result and result.get("chat_id"):
+                await api.call("POST /chats/{id}/messages", "POST", f"/chats/{result['chat_id']}/messages", token,
+                               json={"text": "Thanks for applying! When can you come in?", "role": "employer"})
+        return True
+
+    # --- Open-loop driver ---
+
+    async def arrivals(self, name: str, rate: float, scenario) -> None:
+        if rate <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        offset = 0.0
+        n = 0
+        tasks = set()
+        while True:
+            offset += self.rng.expovariate(rate) if self.args.arrival == "poisson" else 1.0 / rate
+            if offset >= self.args.duration:
+                break
+            await asyncio.sleep(max(0.0, started + offset - loop.time()))
+            self.arrival_lag.append(loop.time() - (started + offset))
+            self.sessions[f"{name}.scheduled"] += 1
+            if self.active >= self.args.max_sessions:
+                self.sessions[f"{name}.dropped"] += 1  # Never delay an arrival: that would close the loop
+                continue
+            task = asyncio.create_task(self._session(name, n, scenario))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            n += 1
+
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.args.drain)
+            for task in pending:
+                task.cancel()
+                self.sessions[f"{name}.cancelled"] += 1
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _session(self, name: str, n: int, scenario) -> None:
+        self.active += 1
+        start = time.perf_counter()
+        try:
+            ok = await scenario(n)
+            self.sessions[f"{name}.{'completed' if ok else 'failed'}"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.sessions[f"{name}.failed"] += 1
+            self.api.recorder.observe(f"session {name}", time.perf_counter() - start, "exception", False, repr(e))
+            return
+        finally:
+            self.active -= 1
+        self.api.recorder.observe(f"session {name}", time.perf_counter() - start, "done", ok)
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+async def run(args, out=sys.stdout) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        setup_recorder = Recorder()
+        api = Api(args.base_url, args.ws_url, client, setup_recorder, args.timeout)
+        test = LoadTest(api, args, rng)
+
+        print(f"🏗️ Setup: {args.employers} employers x {args.jobs_per_employer} jobs", file=out)
+        setup_started = time.perf_counter()
+        await test.setup_employers()
+        setup_elapsed = time.perf_counter() - setup_started
+        if not test.employers:
+            sys.exit("❌ No employer could log in; is the server up with DEBUG=true?")
+
+        api.recorder = Recorder()
+        print(f"🚀 Load: seekers {args.seeker_rate}/s + employers {args.employer_rate}/s "
+              f"for {args.duration}s ({args.arrival} arrivals)", file=out)
+        started_at = datetime.now(timezone.utc).isoformat()
+        started = time.perf_counter()
+        await asyncio.gather(
+            test.arrivals("seeker", args.seeker_rate, test.seeker),
+            test.arrivals("employer", args.employer_rate, test.employer),
+        )
+        elapsed = time.perf_counter() - started
+
+    lag = sorted(test.arrival_lag)
+    requests, errors = api.recorder.totals()
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("report",)},
+        "run_id": test.run_id,
+        "started_at": started_at,
+        "elapsed_seconds": round(elapsed, 2),
+        "totals": {
+            "requests": requests,
+            "errors": errors,
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        },
+        "sessions": dict(test.sessions),
+        "arrival_lag_ms": {
+            "p50": round(percentile(lag, 0.50) * 1000, 2),
+            "p99": round(percentile(lag, 0.99) * 1000, 2),
+            "max": round(lag[-1] * 1000, 2) if lag else 0.0,
+        },
+        "endpoints": api.recorder.report(elapsed),
+        "setup": {"elapsed_seconds": round(setup_elapsed, 2), "endpoints": setup_recorder.report(setup_elapsed)},
+    }
+
+
+def print_summary(report: Dict[str, Any], out=sys.stdout) -> None:
+    print(f"\n{'endpoint':<34} {'count':>7} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)", file=out)
+    for label, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(f"{label:<34} {stats['count']:>7} {stats['error_rate'] * 100:>5.1f}% "
+              f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} {latency['max']:>8.1f}", file=out)
+    totals = report["totals"]
+    print(f"\n{totals['requests']:,} requests | {totals['rps']:,.1f} req/s | error rate {totals['error_rate'] * 100:.2f}% "
+          f"| arrival lag p99 {report['arrival_lag_ms']['p99']} ms", file=out)
+    print("sessions: " + ", ".join(f"{k}={v}" for k, v in sorted(report["sessions"].items())), file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    parser.add_argument("--ws-url", default="ws://127.0.0.1:8000")
+    parser.add_argument("--seeker-rate", type=float, default=10.0, help="Seeker session arrivals per second")
+    parser.add_argument("--employer-rate", type=float, default=1.0, help="Employer session arrivals per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of arrivals")
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--max-sessions", type=int, default=2000, help="In-flight cap; arrivals past it are dropped")
+    parser.add_argument("--drain", type=float, default=30.0, help="Seconds to let sessions finish after arrivals stop")
+    parser.add_argument("--employers", type=int, default=20)
+    parser.add_argument("--jobs-per-employer", type=int, default=5)
+    parser.add_argument("--applies-per-seeker", type=int, default=3)
+    parser.add_argument("--accepts-per-employer", type=int, default=5)
+    parser.add_argument("--chat-wait", type=float, default=10.0, help="Seconds a seeker polls for an accepted application")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--ws-messages", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--report", default="load_report.json", help="JSON report path ('-' for stdout)")
+    parser.add_argument("--fail-on-error-rate", type=float, default=None, help="Exit 1 above this error rate")
+    args = parser.parse_args()
+
+    # With the JSON on stdout, the human-readable output goes to stderr
+    out = sys.stderr if args.report == "-" else sys.stdout
+    report = asyncio.run(run(args, out))
+    print_summary(report, out)
+    if args.report == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.report}")
+
+    if args.fail_on_error_rate is not None and report["totals"]["error_rate"] > args.fail_on_error_rate:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
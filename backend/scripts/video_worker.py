@@ -0,0 +1,47 @@
+"""
+Standalone video processing worker (probe -> audio -> transcribe -> extract, then the preview).
+Run as many as needed; jobs are claimed atomically from Mongo. Set
+VIDEO_WORKER_IN_PROCESS=false on the API servers when running these.
+
+Usage (from backend/):
+    python scripts/video_worker.py
+    VIDEO_WORKER_CONCURRENCY=4 VIDEO_TRANSCRIBER=whisper python scripts/video_worker.py
+"""
+import os
+import sys
+import signal
+import asyncio
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.mongo import mongo_db  # noqa: E402
+from app.services.extraction_pool import extraction_pool  # noqa: E402
+from app.services.video_queue import video_worker  # noqa: E402
+from app.services import transcoder  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await mongo_db.connect()
+    extraction_pool.start()
+    video_worker.start()
+    try:
+        await stop.wait()
+    finally:
+        await video_worker.stop()  # Running jobs are handed back to the queue
+        transcoder.shutdown()
+        await extraction_pool.stop()
+        mongo_db.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
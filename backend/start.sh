@@ -1,4 +1,7 @@
 #!/bin/bash
 cd "$(dirname "$0")"
 source venv/bin/activate
-python3 -m uvicorn app.main:app --host 0.0.0.0 --port 8000
+# Behind a load balancer, set FORWARDED_ALLOW_IPS to its address(es) so X-Forwarded-For
+# becomes the client address: per-IP limits (OTP routes) otherwise see one shared client
+python3 -m uvicorn app.main:app --host 0.0.0.0 --port 8000 \
+    --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}"
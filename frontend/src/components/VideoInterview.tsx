@@ -23,6 +23,10 @@ const getBackendUrl = () => {
 
 const API_URL = getBackendUrl();
 
+// Video processing runs in a background queue; poll until it finishes
+const POLL_INTERVAL_MS = 2000;
+const POLL_TIMEOUT_MS = 10 * 60 * 1000;
+
 const QUESTIONS = [
     "Please state your full name and where you are currently based.",
     "Tell us about your work history. What roles have you held in the past 5 years?",
@@ -54,6 +58,7 @@ const VideoInterview: React.FC<VideoInterviewProps> = ({ onClose, onComplete })
     // Data
     const [recordedUri, setRecordedUri] = useState<string | null>(null);
     const [processedProfile, setProcessedProfile] = useState<any>(null);
+    const [processingStage, setProcessingStage] = useState<string | null>(null);
 
     // Initial Permission Check
     useEffect(() => {
@@ -127,9 +132,26 @@ const VideoInterview: React.FC<VideoInterviewProps> = ({ onClose, onComplete })
     // UPLOAD LOGIC (Cook Operational Discipline: Retry & Validation)
     // =========================================================================
 
+    const pollVideoJob = async (pollUrl: string, token: string) => {
+        const deadline = Date.now() + POLL_TIMEOUT_MS;
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+            const res = await fetch(`${API_URL}${pollUrl}`, {
+                headers: { 'Authorization': `Bearer ${token}`, 'Accept': 'application/json' }
+            });
+            if (!res.ok) throw new Error(`Job Status Error: ${res.status}`);
+            const job = await res.json();
+            if (job.status === 'done') return job.result;
+            if (job.status === 'failed') throw new Error(job.error || 'Video processing failed');
+            setProcessingStage(job.stage);
+        }
+        throw new Error('Video processing timed out');
+    };
+
     const uploadVideo = async (uri: string) => {
         setStep('PROCESSING');
         setIsProcessing(true);
+        setProcessingStage(null);
 
         try {
             const token = await SecureStore.getItemAsync('userToken');
@@ -145,7 +167,7 @@ const VideoInterview: React.FC<VideoInterviewProps> = ({ onClose, onComplete })
 
 
 
-            const response = await fetch(`${API_URL}/api/profiles/process-video-interview`, {
+            const response = await fetch(`${API_URL}/api/v1/profiles/process-video-interview`, {
                 method: 'POST',
                 body: formData,
                 headers: {
@@ -161,7 +183,9 @@ const VideoInterview: React.FC<VideoInterviewProps> = ({ onClose, onComplete })
                 throw new Error(`Server Error: ${response.status} - ${errText}`);
             }
 
-            const result = await response.json();
+            const { poll_url } = await response.json();
+            setProcessingStage('queued');
+            const result = await pollVideoJob(poll_url, token);
             setProcessedProfile(result);
             setStep('REVIEW');
 
@@ -259,6 +283,7 @@ const VideoInterview: React.FC<VideoInterviewProps> = ({ onClose, onComplete })
                         <ActivityIndicator size="large" color="#a78bfa" />
                         <Text style={styles.processingTitle}>Analyzing Video...</Text>
                         <Text style={styles.processingDesc}>Our AI is extracting your skills and experience.</Text>
+                        {processingStage && <Text style={styles.debugText}>Stage: {processingStage}</Text>}
                         <Text style={styles.debugText}>Uploading to {API_URL}</Text>
                     </View>
                 )}